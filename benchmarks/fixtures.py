@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Synthetic ``pw-dump`` graphs for benchmarks.
+
+The generated graph has the shape real ``pw-dump`` output has: a core, a
+``default`` metadata object, sound cards (devices) with ``EnumProfile`` lists,
+sink/source nodes with multi-channel ``Props``, application streams, and the
+clients, ports and links that make up most of a busy graph.
+
+Run directly to write a fixture: ``benchmarks/fixtures.py --objects 1000 > dump.json``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+NODE = "PipeWire:Interface:Node"
+DEVICE = "PipeWire:Interface:Device"
+METADATA = "PipeWire:Interface:Metadata"
+
+CHANNEL_POSITIONS = ["FL", "FR", "FC", "LFE", "RL", "RR", "SL", "SR"]
+
+# Named scales used by the benchmark suite.
+SCALES: Dict[str, Dict[str, int]] = {
+    "10": {"objects": 10, "sinks": 2, "profiles": 4, "channels": 2},
+    "1k": {"objects": 1_000, "sinks": 40, "profiles": 120, "channels": 6},
+    "10k": {"objects": 10_000, "sinks": 200, "profiles": 400, "channels": 8},
+}
+
+_ENUM_FORMAT = [
+    {
+        "mediaType": "audio",
+        "mediaSubtype": "raw",
+        "format": {"default": "S32LE", "alternatives": ["S16LE", "S24LE", "S32LE", "F32LE"]},
+        "rate": {"default": 48000, "min": 1, "max": 384000},
+        "channels": 2,
+        "position": ["FL", "FR"],
+    }
+]
+
+
+def _profile(index: int, channels: int) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "name": f"output:analog-surround-{channels}{index}+input:analog-stereo",
+        "description": f"Analog Surround {channels}.{index} Output + Analog Stereo Input",
+        "priority": 10_000 - index,
+        "available": "yes" if index % 3 else "no",
+        "classes": ["Spa:Pod:Object:Param:Profile", 2],
+        "save": False,
+    }
+
+
+def _device(obj_id: int, profiles: int, channels: int) -> Dict[str, Any]:
+    enum_profile = [_profile(index, channels) for index in range(profiles)]
+    active = enum_profile[min(1, profiles - 1)]
+    return {
+        "id": obj_id,
+        "type": DEVICE,
+        "version": 3,
+        "permissions": ["r", "w", "x", "m"],
+        "info": {
+            "change-mask": ["props", "params"],
+            "props": {
+                "device.api": "alsa",
+                "device.name": f"alsa_card.pci-{obj_id:04x}",
+                "device.description": f"Sound Card {obj_id}",
+                "media.class": "Audio/Device",
+                "object.id": obj_id,
+            },
+            "params": {
+                "EnumProfile": enum_profile,
+                "Profile": [dict(active)],
+                "EnumRoute": [{"index": 0, "direction": "Output", "name": "analog-output"}],
+                "Route": [],
+            },
+        },
+    }
+
+
+def _volume_props(rng: random.Random, channels: int, mute: bool) -> Dict[str, Any]:
+    return {
+        "volume": 1.0,
+        "mute": mute,
+        "channelVolumes": [round(rng.uniform(0.0, 1.0) ** 3, 6) for _ in range(channels)],
+        "volumeBase": 1.0,
+        "volumeStep": 1.0 / 65536,
+        "channelMap": [CHANNEL_POSITIONS[index % len(CHANNEL_POSITIONS)] for index in range(channels)],
+        "softMute": False,
+        "softVolumes": [1.0] * channels,
+    }
+
+
+def _node(
+    rng: random.Random,
+    obj_id: int,
+    name: str,
+    media_class: str,
+    channels: int,
+    device_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    props: Dict[str, Any] = {
+        "node.name": name,
+        "node.description": name.replace("_", " ").title(),
+        "media.class": media_class,
+        "object.id": obj_id,
+        "audio.channels": channels,
+    }
+    if device_id is not None:
+        props["device.id"] = device_id
+    if media_class.startswith("Stream"):
+        props["application.name"] = f"App {obj_id}"
+        props["media.name"] = f"Playback {obj_id}"
+    return {
+        "id": obj_id,
+        "type": NODE,
+        "version": 3,
+        "permissions": ["r", "w", "x", "m"],
+        "info": {
+            "max-input-ports": channels,
+            "max-output-ports": 0,
+            "state": rng.choice(["running", "idle", "suspended"]),
+            "error": None,
+            "props": props,
+            "params": {
+                "EnumFormat": _ENUM_FORMAT,
+                "PropInfo": [{"id": "volume", "description": "Volume", "type": {"default": 1.0, "min": 0.0, "max": 10.0}}],
+                "Props": [_volume_props(rng, channels, mute=rng.random() < 0.2)],
+                "Format": [],
+                "Latency": [{"direction": "Input", "minQuantum": 0.0, "maxQuantum": 0.0}],
+            },
+        },
+    }
+
+
+def _filler(obj_id: int, kind: int) -> Dict[str, Any]:
+    if kind == 0:
+        return {
+            "id": obj_id,
+            "type": "PipeWire:Interface:Port",
+            "version": 3,
+            "permissions": ["r", "x", "m"],
+            "info": {
+                "direction": "output",
+                "props": {"port.name": f"output_{obj_id}", "format.dsp": "32 bit float mono audio"},
+                "params": {"EnumFormat": _ENUM_FORMAT, "Meta": [{"type": "Header", "size": 32}], "IO": [], "Format": []},
+            },
+        }
+    if kind == 1:
+        return {
+            "id": obj_id,
+            "type": "PipeWire:Interface:Link",
+            "version": 3,
+            "permissions": ["r", "x", "m"],
+            "info": {"output-node-id": obj_id - 2, "input-node-id": obj_id - 1, "state": "active", "props": {}},
+        }
+    return {
+        "id": obj_id,
+        "type": "PipeWire:Interface:Client",
+        "version": 3,
+        "permissions": ["r", "x", "m"],
+        "info": {"props": {"application.name": f"client-{obj_id}", "pipewire.protocol": "protocol-native"}},
+    }
+
+
+def make_dump(
+    objects: int = 1_000,
+    sinks: int = 40,
+    profiles: int = 120,
+    channels: int = 6,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Return a graph of roughly ``objects`` objects, reproducible for ``seed``."""
+    rng = random.Random(seed)
+    dump: List[Dict[str, Any]] = [{"id": 0, "type": "PipeWire:Interface:Core", "version": 4, "info": {"props": {}}}]
+    next_id = 30
+
+    devices = max(1, sinks // 4)
+    device_ids = list(range(next_id, next_id + devices))
+    dump.extend(_device(obj_id, profiles, channels) for obj_id in device_ids)
+    next_id += devices
+
+    sink_names: List[str] = []
+    for index in range(sinks):
+        name = f"alsa_output.card{index}.analog-surround"
+        sink_names.append(name)
+        dump.append(_node(rng, next_id, name, "Audio/Sink", channels, device_ids[index % devices]))
+        next_id += 1
+    for index in range(max(1, sinks // 2)):
+        dump.append(_node(rng, next_id, f"alsa_input.card{index}", "Audio/Source", 2, device_ids[index % devices]))
+        next_id += 1
+    for _index in range(max(1, sinks // 2)):
+        dump.append(_node(rng, next_id, f"stream_{next_id}", "Stream/Output/Audio", 2))
+        next_id += 1
+
+    default_sink = sink_names[len(sink_names) // 2] if sink_names else None
+    dump.append(
+        {
+            "id": next_id,
+            "type": METADATA,
+            "version": 3,
+            "permissions": ["r", "w", "x", "m"],
+            "props": {"metadata.name": "default"},
+            "metadata": [
+                {"subject": 0, "key": "default.audio.sink", "type": "Spa:String:JSON", "value": {"name": default_sink}},
+                {
+                    "subject": 0,
+                    "key": "default.configured.audio.sink",
+                    "type": "Spa:String:JSON",
+                    "value": {"name": default_sink},
+                },
+            ],
+        }
+    )
+    next_id += 1
+
+    kind = 0
+    while len(dump) < objects:
+        dump.append(_filler(next_id, kind))
+        next_id += 1
+        kind = (kind + 1) % 3
+    return dump
+
+
+def make_scale(name: str, seed: int = 0) -> List[Dict[str, Any]]:
+    """Return the fixture for one of the named :data:`SCALES`."""
+    return make_dump(seed=seed, **SCALES[name])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic pw-dump graph to stdout")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="Use one of the named scales")
+    parser.add_argument("--objects", type=int, default=1_000)
+    parser.add_argument("--sinks", type=int, default=40)
+    parser.add_argument("--profiles", type=int, default=120)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.scale:
+        dump = make_scale(args.scale, args.seed)
+    else:
+        dump = make_dump(args.objects, args.sinks, args.profiles, args.channels, args.seed)
+    json.dump(dump, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
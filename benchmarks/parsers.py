@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Time and memory benchmarks for the ``pw-dump`` parsers.
+
+Each parser entry point runs against the synthetic graphs from
+:mod:`fixtures` at every requested scale. The median wall-clock time and the
+peak traced allocation are printed, appended to a JSON-lines results file and
+compared with the previous run at the same scale.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from dump_decoder import iter_objects, prune_params  # noqa: E402
+from fixtures import SCALES, make_scale  # noqa: E402
+from gui.snapshot import PipewireSnapshot  # noqa: E402
+from pipewire_parsers import (  # noqa: E402
+    PARSED_PARAMS,
+    PARSED_TYPES,
+    extract,
+    get_current_profile,
+    get_current_sink,
+    parse_card,
+    parse_profile_items,
+    parse_profiles,
+    parse_sink_items,
+    parse_sinks,
+)
+
+DEFAULT_RESULTS = ROOT / "benchmarks" / "results.jsonl"
+
+
+class FixtureSnapshot(PipewireSnapshot):
+    """A snapshot whose ``fetch`` returns a fixed graph instead of running ``pw-dump``."""
+
+    def __init__(self, dump: List[Dict[str, Any]]) -> None:
+        self._dump = dump
+        super().__init__()
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        return self._dump
+
+
+def _cases(dump: List[Dict[str, Any]]) -> Dict[str, Callable[[], Any]]:
+    text = json.dumps(dump, indent=2)
+    # iter_objects reads a pipe line by line, so it never holds the whole text.
+    lines = text.splitlines(keepends=True)
+    device_ids = [obj["id"] for obj in dump if obj["type"] == "PipeWire:Interface:Device"]
+    card_id = device_ids[len(device_ids) // 2]
+    card = parse_card(dump, card_id)
+    snapshot = FixtureSnapshot(dump)
+
+    return {
+        "decode.json_loads": lambda: json.loads(text),
+        "decode.json_loads_filtered": lambda: [
+            prune_params(obj, PARSED_PARAMS) for obj in json.loads(text) if obj.get("type") in PARSED_TYPES
+        ],
+        "decode.iter_objects": lambda: list(iter_objects(lines, PARSED_TYPES, PARSED_PARAMS)),
+        "parse_sinks": lambda: parse_sinks(dump),
+        "parse_sink_items": lambda: parse_sink_items(dump),
+        "extract": lambda: extract(dump),
+        "get_current_sink": lambda: get_current_sink(dump),
+        "parse_card": lambda: parse_card(dump, card_id),
+        "parse_profiles": lambda: parse_profiles(card),
+        "parse_profile_items": lambda: parse_profile_items(card["params"].get("EnumProfile") or []),
+        "get_current_profile": lambda: get_current_profile(card),
+        "PipewireSnapshot.refresh": snapshot.refresh,
+        "PipewireSnapshot.get_profiles": lambda: [snapshot.get_profiles(sink.id) for sink in snapshot.sinks],
+    }
+
+
+def _time(func: Callable[[], Any], repeat: int, budget: float) -> float:
+    """Median seconds per call; stops early once ``budget`` seconds are spent."""
+    samples: List[float] = []
+    spent = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        samples.append(elapsed)
+        spent += elapsed
+        if spent > budget and len(samples) >= 3:
+            break
+    return statistics.median(samples)
+
+
+def _peak_memory(func: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        process = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return process.stdout.strip() or None
+
+
+def _previous(results_path: Path, scale: str) -> Optional[Dict[str, Any]]:
+    if not results_path.exists():
+        return None
+    previous = None
+    with results_path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("scale") == scale:
+                previous = record
+    return previous
+
+
+def _change(current: float, before: Optional[float]) -> str:
+    if not before:
+        return ""
+    return f"{(current - before) / before * 100:+6.1f}%"
+
+
+def run_scale(scale: str, repeat: int, budget: float, results_path: Path, save: bool) -> Dict[str, Any]:
+    dump = make_scale(scale)
+    previous = _previous(results_path, scale)
+    before = previous.get("results", {}) if previous else {}
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"\nscale {scale}: {len(dump)} objects")
+    print(f"  {'entry point':<31}{'median':>12}{'change':>9}{'peak mem':>12}{'change':>9}")
+    for name, func in _cases(dump).items():
+        median_ms = _time(func, repeat, budget) * 1000
+        peak_kib = _peak_memory(func) / 1024
+        results[name] = {"median_ms": round(median_ms, 4), "peak_kib": round(peak_kib, 1)}
+        old = before.get(name, {})
+        print(
+            f"  {name:<31}{median_ms:>9.3f} ms{_change(median_ms, old.get('median_ms')):>9}"
+            f"{peak_kib:>8.0f} KiB{_change(peak_kib, old.get('peak_kib')):>9}"
+        )
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "scale": scale,
+        "objects": len(dump),
+        "results": results,
+    }
+    if previous:
+        print(f"  compared with {previous.get('revision') or '?'} at {previous.get('timestamp')}")
+    if save:
+        with results_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
+    return record
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="Scale to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=20, help="Maximum timed calls per entry point")
+    parser.add_argument("--budget", type=float, default=2.0, help="Seconds to spend timing each entry point")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON-lines file to append to")
+    parser.add_argument("--no-save", action="store_true", help="Compare without recording this run")
+    args = parser.parse_args(argv)
+
+    for scale in args.scale or list(SCALES):
+        run_scale(scale, args.repeat, args.budget, args.results, not args.no_save)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Multi-remote refresh benchmark for :class:`PipewireSnapshot`.
+
+Each fake remote serves a synthetic graph from :mod:`fixtures` after
+sleeping for its latency, the way ``pw-dump`` against a slow or distant
+instance would. The median refresh over all remotes is compared with the
+slowest single remote; the run fails if reading them one after another
+would have been as fast, i.e. if the remotes were not read concurrently.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from backends import Backend  # noqa: E402
+from fixtures import make_scale  # noqa: E402
+from gui.snapshot import PipewireSnapshot  # noqa: E402
+
+
+class FakeRemoteBackend(Backend):
+    """Serves a fixed graph per remote, ``latencies[remote]`` seconds after each call; writes are ignored."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latencies: Dict[Optional[str], float],
+        dump: List[Dict[str, Any]],
+        remote: Optional[str] = None,
+    ) -> None:
+        self.latencies = latencies
+        self.dump = dump
+        self.remote = remote
+
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        time.sleep(self.latencies[self.remote])
+        return self.dump
+
+    def set_default_sink(self, sink_id: int) -> None:
+        pass
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        pass
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        pass
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        pass
+
+    def for_remote(self, remote: Optional[str]) -> Backend:
+        return FakeRemoteBackend(self.latencies, self.dump, remote)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--remotes", type=int, default=4, help="Number of fake remotes")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of the fastest remote")
+    parser.add_argument("--step-ms", type=float, default=25.0, help="Extra latency of each further remote")
+    parser.add_argument("--scale", default="1k", help="Fixture scale served by every remote")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    latencies: Dict[Optional[str], float] = {
+        f"remote-{n}": (args.latency_ms + n * args.step_ms) / 1000 for n in range(args.remotes)
+    }
+    backend = FakeRemoteBackend(latencies, make_scale(args.scale))
+    snapshot = PipewireSnapshot(backend=backend, remotes=list(latencies), load=False)
+    try:
+        snapshot.refresh()  # start the reader threads
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            snapshot.refresh()
+            timings.append(time.perf_counter() - started)
+    finally:
+        snapshot.close()
+
+    median_ms = statistics.median(timings) * 1000
+    slowest_ms = max(latencies.values()) * 1000
+    sequential_ms = sum(latencies.values()) * 1000
+    print(
+        f"{args.remotes} remotes, {len(snapshot.sinks)} sinks: median refresh {median_ms:.1f} ms "
+        f"(slowest remote {slowest_ms:.0f} ms, all in sequence {sequential_ms:.0f} ms)"
+    )
+    if args.remotes > 1 and median_ms >= sequential_ms:
+        print("FAIL: remotes were not read concurrently")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
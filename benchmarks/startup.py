@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for CLI mode.
+
+Runs ``src/main.py --mode cli`` (answering ``0`` to exit at the first menu)
+several times and fails if the median wall-clock time exceeds the budget or
+if any GUI module was imported. One extra run uses ``-X importtime`` to
+report the slowest imports.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+MAIN = Path(__file__).resolve().parent.parent / "src" / "main.py"
+FORBIDDEN_PACKAGES = ("gi",)
+FORBIDDEN_MODULES = ("gui.app", "gui.window")
+
+
+def _run(extra_flags: Sequence[str] = ()) -> Tuple[float, str]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *extra_flags, str(MAIN), "--mode", "cli"],
+        input="0\n",
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    elapsed = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"CLI exited with {process.returncode}: {process.stderr.strip()}")
+    return elapsed, process.stderr
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[int, str]]:
+    """Return ``(cumulative_us, module)`` for every import line."""
+    imports: List[Tuple[int, str]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            imports.append((int(parts[1]), parts[2].strip()))
+        except ValueError:
+            continue
+    return imports
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Median cold-start budget")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    args = parser.parse_args(argv)
+
+    _run()  # warm the OS page cache so runs are comparable
+    timings = [_run()[0] for _ in range(args.runs)]
+    median_ms = statistics.median(timings) * 1000
+
+    _elapsed, stderr = _run(["-X", "importtime"])
+    imports = _parse_importtime(stderr)
+    forbidden = sorted({
+        module
+        for _us, module in imports
+        if module.split(".")[0] in FORBIDDEN_PACKAGES or module in FORBIDDEN_MODULES
+    })
+
+    print(f"CLI cold start: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative):")
+    for cumulative, module in sorted(imports, reverse=True)[: args.top]:
+        print(f"  {cumulative / 1000:8.2f} ms  {module}")
+
+    failed = False
+    if forbidden:
+        print(f"FAIL: CLI mode imported GUI modules: {', '.join(forbidden)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: median cold start {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
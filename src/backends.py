@@ -0,0 +1,464 @@
+"""Interchangeable sources of PipeWire state.
+
+Everything that reads or changes PipeWire goes through a :class:`Backend`:
+
+* ``cli`` runs ``pw-dump`` and ``wpctl`` (the default),
+* ``native`` speaks the PipeWire protocol directly (see :mod:`pw_native`),
+* ``replay`` serves a file written by :class:`RecordingBackend`, so the
+  parsers and UI can be exercised on a machine without an audio stack.
+
+Any backend can be wrapped in a :class:`RecordingBackend` that appends every
+call, its timing and its result to a JSON-lines file.
+
+The ``cli`` and ``native`` backends can target another PipeWire instance
+than the default one (a ``remote``, named like ``PIPEWIRE_REMOTE``).
+
+:func:`get_backend` picks the backend from ``PWQS_BACKEND``, ``PWQS_RECORD``,
+``PWQS_REPLAY``, ``PWQS_REPLAY_LATENCY`` and ``PWQS_REMOTES``, which
+``main.py`` sets from its command-line options.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+import pw_client
+from dump_decoder import prune_params
+from pw_client import Command, CommandChannel, PipewireMonitor
+from tracing import traced
+
+
+BACKEND_ENV = "PWQS_BACKEND"
+RECORD_ENV = "PWQS_RECORD"
+REPLAY_ENV = "PWQS_REPLAY"
+REPLAY_LATENCY_ENV = "PWQS_REPLAY_LATENCY"
+# Comma-separated remote names; the shared backend uses the first one.
+REMOTES_ENV = "PWQS_REMOTES"
+
+BACKEND_NAMES = ("cli", "native", "replay")
+LATENCY_MODES = ("real", "zero")
+WRITE_COMMANDS = ("set_default_sink", "set_profile", "set_volume", "set_mute")
+
+
+def _filter_dump(
+    dump: List[Dict[str, Any]],
+    types: Optional[Collection[str]],
+    params: Optional[Collection[str]],
+) -> List[Dict[str, Any]]:
+    if types is not None:
+        dump = [obj for obj in dump if obj.get("type") in types]
+    if params is not None:
+        # Replayed dumps are served again on later calls, so prune copies.
+        dump = [prune_params(obj, params, copy=True) for obj in dump]
+    return dump
+
+
+class Backend(ABC):
+    """Reads the PipeWire graph and applies changes to it."""
+
+    name = "base"
+    # The PipeWire instance this backend talks to; ``None`` is the default one.
+    remote: Optional[str] = None
+
+    @abstractmethod
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the graph in ``pw-dump`` shape, optionally filtered."""
+
+    @abstractmethod
+    def set_default_sink(self, sink_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        ...
+
+    @abstractmethod
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        ...
+
+    @abstractmethod
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        ...
+
+    def run_commands(self, commands: List[Command]) -> List[Optional[str]]:
+        """Apply ``(name, args)`` writes in order; return an error (or ``None``) per command.
+
+        Backends that can pipeline writes override this to send them in one
+        round-trip; see :func:`batch`.
+        """
+        errors: List[Optional[str]] = []
+        for name, args in commands:
+            if name not in WRITE_COMMANDS:
+                errors.append(f"Unknown command {name!r}")
+                continue
+            try:
+                getattr(self, name)(*args)
+            except (OSError, RuntimeError, ValueError) as exc:
+                errors.append(str(exc))
+            else:
+                errors.append(None)
+        return errors
+
+    def monitor(self) -> Optional[PipewireMonitor]:
+        """Return a live change monitor, or ``None`` if callers should poll ``pw_dump``."""
+        return None
+
+    def for_remote(self, remote: Optional[str]) -> "Backend":
+        """Return a backend of the same kind talking to ``remote``."""
+        if remote == self.remote:
+            return self
+        raise ValueError(f"The {self.name} backend cannot connect to remote '{remote}'")
+
+    def close(self) -> None:
+        pass
+
+
+class CliBackend(Backend):
+    """``pw-dump`` for reads and ``wpctl`` for writes."""
+
+    name = "cli"
+
+    def __init__(self, remote: Optional[str] = None) -> None:
+        self.remote = remote
+        # The default instance shares pw_client's monitor; other remotes get their own.
+        self._monitor: Optional[PipewireMonitor] = None
+        self._channel: Optional[CommandChannel] = None
+
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        return pw_client.pw_dump(types, params, self.remote)
+
+    def set_default_sink(self, sink_id: int) -> None:
+        pw_client.set_default_sink(sink_id, self.remote)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        pw_client.set_profile(card_id, profile_index, self.remote)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        pw_client.set_volume(sink_id, volume, self.remote)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        pw_client.set_mute(sink_id, mute, self.remote)
+
+    def run_commands(self, commands: List[Command]) -> List[Optional[str]]:
+        unknown = [name for name, _args in commands if name not in WRITE_COMMANDS]
+        if unknown:
+            return super().run_commands(commands)
+        if self._channel is None:
+            self._channel = CommandChannel(self.remote)
+        return self._channel.run(commands)
+
+    def monitor(self) -> Optional[PipewireMonitor]:
+        try:
+            if self.remote is None:
+                return pw_client.get_monitor()
+            if self._monitor is None:
+                self._monitor = PipewireMonitor(remote=self.remote)
+            self._monitor.start()
+            return self._monitor
+        except OSError as exc:
+            print(f"PipeWire monitor unavailable, falling back to pw-dump: {exc}", file=sys.stderr)
+            return None
+
+    def for_remote(self, remote: Optional[str]) -> Backend:
+        if remote == self.remote:
+            return self
+        return type(self)(remote)
+
+    def close(self) -> None:
+        if self._monitor is not None:
+            self._monitor.stop()
+        if self._channel is not None:
+            self._channel.close()
+
+
+class NativeBackend(CliBackend):
+    """Talks the PipeWire native protocol; the monitor still uses ``pw-dump``."""
+
+    name = "native"
+
+    def __init__(self, remote: Optional[str] = None) -> None:
+        from pw_native import NativeClient
+
+        super().__init__(remote)
+        self.client = NativeClient(remote)
+
+    @traced(cat="pw_native")
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        return _filter_dump(self.client.pw_dump(), types, params)
+
+    @traced(cat="pw_native")
+    def set_default_sink(self, sink_id: int) -> None:
+        self.client.set_default_sink(sink_id)
+
+    @traced(cat="pw_native")
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self.client.set_profile(card_id, profile_index)
+
+    @traced(cat="pw_native")
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self.client.set_volume(sink_id, volume)
+
+    @traced(cat="pw_native")
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self.client.set_mute(sink_id, mute)
+
+    @traced(cat="pw_native")
+    def run_commands(self, commands: List[Command]) -> List[Optional[str]]:
+        from pw_native import PipelineInterrupted
+
+        try:
+            return self.client.pipeline(commands)
+        except PipelineInterrupted as exc:
+            return [
+                f"Not sent: {exc}" if error is None and position >= exc.sent else error
+                for position, error in enumerate(exc.results)
+            ]
+
+    def close(self) -> None:
+        self.client.close()
+        super().close()
+
+
+class RecordingBackend(Backend):
+    """Forwards to ``inner`` and appends each call to ``path``.
+
+    Every line is ``{"time", "duration", "call", "args", "result"}``, with
+    ``time`` in seconds since the recording started. There is no monitor, so
+    every state change the caller sees is captured as a ``pw_dump`` call.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: Backend, path: str) -> None:
+        self.inner = inner
+        self.remote = inner.remote
+        self.path = path
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _record(self, call: str, args: List[Any], result: Any, started: float) -> None:
+        entry = {
+            "time": round(started - self._started, 6),
+            "duration": round(time.monotonic() - started, 6),
+            "call": call,
+            "args": args,
+            "result": result,
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        started = time.monotonic()
+        result = self.inner.pw_dump(types, params)
+        filters = [sorted(types) if types is not None else None, sorted(params) if params is not None else None]
+        self._record("pw_dump", filters, result, started)
+        return result
+
+    def _write(self, call: str, *args: Any) -> None:
+        started = time.monotonic()
+        getattr(self.inner, call)(*args)
+        self._record(call, list(args), None, started)
+
+    def set_default_sink(self, sink_id: int) -> None:
+        self._write("set_default_sink", sink_id)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self._write("set_profile", card_id, profile_index)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self._write("set_volume", sink_id, volume)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self._write("set_mute", sink_id, mute)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self.inner.close()
+
+
+class ReplayBackend(Backend):
+    """Serves the dumps of a recording in order and accepts writes.
+
+    Each ``pw_dump`` call returns the next recorded dump, repeating the last
+    one once the recording is exhausted; callers must not modify it. With
+    ``latency="real"`` every call sleeps for the duration it took when it was
+    recorded, with ``"zero"`` it returns at once. Writes do not change the
+    served graph; they are appended to :attr:`calls` for inspection.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, latency: str = "real") -> None:
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown replay latency '{latency}'")
+        self.path = path
+        self.latency = latency
+        self.calls: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._dumps: List[Tuple[float, List[Dict[str, Any]]]] = []
+        self._write_durations: Dict[str, List[float]] = {}
+        self._position = 0
+        self._lock = threading.Lock()
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("call") == "pw_dump":
+                    self._dumps.append((float(entry.get("duration", 0.0)), entry.get("result") or []))
+                else:
+                    self._write_durations.setdefault(entry.get("call"), []).append(float(entry.get("duration", 0.0)))
+        if not self._dumps:
+            raise ValueError(f"Recording {path} contains no pw_dump calls")
+
+    def _wait(self, duration: float) -> None:
+        if self.latency == "real" and duration > 0:
+            time.sleep(duration)
+
+    def pw_dump(
+        self,
+        types: Optional[Collection[str]] = None,
+        params: Optional[Collection[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            duration, dump = self._dumps[min(self._position, len(self._dumps) - 1)]
+            self._position += 1
+        self._wait(duration)
+        return _filter_dump(dump, types, params)
+
+    def _write(self, call: str, *args: Any) -> None:
+        with self._lock:
+            self.calls.append((call, args))
+            durations = self._write_durations.get(call) or [0.0]
+            duration = sum(durations) / len(durations)
+        self._wait(duration)
+
+    def set_default_sink(self, sink_id: int) -> None:
+        self._write("set_default_sink", sink_id)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self._write("set_profile", card_id, profile_index)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self._write("set_volume", sink_id, volume)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self._write("set_mute", sink_id, mute)
+
+
+class CommandBatch:
+    """Writes collected inside :func:`batch`; ``errors`` is filled in on exit."""
+
+    def __init__(self) -> None:
+        self.commands: List[Command] = []
+        self.errors: List[Optional[str]] = []
+
+    def add(self, name: str, *args: Any) -> None:
+        self.commands.append((name, args))
+
+    def set_default_sink(self, sink_id: int) -> None:
+        self.add("set_default_sink", sink_id)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self.add("set_profile", card_id, profile_index)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self.add("set_volume", sink_id, volume)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self.add("set_mute", sink_id, mute)
+
+
+@contextmanager
+def batch(backend: Optional[Backend] = None) -> Iterator[CommandBatch]:
+    """Collect the writes made on the yielded batch and apply them together on exit.
+
+    They go through ``backend`` (the shared one by default), so recording and
+    replay see them; the ``cli`` and ``native`` backends pipeline them on one
+    connection. Nothing is sent if the block raises.
+    """
+    pending = CommandBatch()
+    yield pending
+    pending.errors = (backend or get_backend()).run_commands(pending.commands)
+    for (name, args), error in zip(pending.commands, pending.errors):
+        if error is not None:
+            print(f"{name}{args} failed: {error}")
+
+
+def create_backend(
+    name: Optional[str] = None,
+    record: Optional[str] = None,
+    replay: Optional[str] = None,
+    latency: Optional[str] = None,
+    remote: Optional[str] = None,
+) -> Backend:
+    """Build a backend; unset arguments are taken from the environment."""
+    replay = replay or os.environ.get(REPLAY_ENV) or None
+    name = name or os.environ.get(BACKEND_ENV) or ("replay" if replay else "cli")
+    record = record or os.environ.get(RECORD_ENV) or None
+    latency = latency or os.environ.get(REPLAY_LATENCY_ENV) or "real"
+    remote = remote or next(iter(configured_remotes()), None)
+
+    backend: Backend
+    if name == "cli":
+        backend = CliBackend(remote)
+    elif name == "native":
+        backend = NativeBackend(remote)
+    elif name == "replay":
+        if not replay:
+            raise ValueError(f"The replay backend needs a recording; set {REPLAY_ENV}")
+        backend = ReplayBackend(replay, latency)
+    else:
+        raise ValueError(f"Unknown backend '{name}'")
+    if record:
+        backend = RecordingBackend(backend, record)
+    return backend
+
+
+def configured_remotes() -> List[str]:
+    """The remotes named in ``PWQS_REMOTES``, in order; empty for the default instance."""
+    return [remote.strip() for remote in os.environ.get(REMOTES_ENV, "").split(",") if remote.strip()]
+
+
+_BACKEND: Optional[Backend] = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def get_backend() -> Backend:
+    """Return the shared backend, creating it from the environment on first use."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            _BACKEND = create_backend()
+        return _BACKEND
+
+
+def set_backend(backend: Optional[Backend]) -> None:
+    """Replace the shared backend, e.g. with a :class:`ReplayBackend` in a benchmark."""
+    global _BACKEND
+    with _BACKEND_LOCK:
+        _BACKEND = backend
@@ -5,26 +5,30 @@ import builtins
 from typing import Any, Dict, List
 
 from .util import table, select_option
-from .cli import change_sink, change_profile, change_volume, change_mute
 
 
-def cli():
+def menu():
     options = [
         { "id": 0, "description": "Exit" },
         { "id": 1, "description": "Set default sink" },
         { "id": 2, "description": "Change sink profile" },
         { "id": 4, "description": "Set sink volume" },
         { "id": 5, "description": "Mute / unmute sink" },
+        { "id": 6, "description": "Application stream volume / mute" },
+        { "id": 7, "description": "Fade sink volume" },
     ]
     
     table("Pipewire Quick Settings CLI", options)
     
     option = select_option("Select option")
+    if option == 0:
+        return False
+
+    # Loading the cli submodule binds it as this package's ``cli`` attribute,
+    # which is why the menu function is not called ``cli``.
+    from .cli import change_sink, change_profile, change_volume, change_mute, change_stream, fade_volume
     
     match option:
-        case 0:
-            return False
-        
         case 1: 
             change_sink()
             
@@ -36,6 +40,12 @@ def cli():
 
         case 5:
             change_mute()
+
+        case 6:
+            change_stream()
+
+        case 7:
+            fade_volume()
         
         case _:
             print("Invalid option")
@@ -44,5 +54,7 @@ def cli():
     
 
 def cli_loop() -> None:
-    while cli():
+    # Each action loads its own state: the daemon's when one is running,
+    # otherwise a one-shot pw-dump, so the CLI never keeps a monitor alive.
+    while menu():
         continue
@@ -1,174 +1,283 @@
 """CLI flows."""
 
-from pw_client import pw_dump, set_default_sink, set_profile, set_volume, set_mute
+from pwqs_daemon import load_state
 from .util import table, select_option
-from pipewire_parsers import (
-    get_current_profile,
-    get_current_sink,
-    parse_card,
-    parse_profiles,
-    parse_sinks,
-)
+from pipewire_parsers import get_current_profile, parse_profiles
+from volume_ramp import DEFAULT_DURATION, VolumeRamp
+from volume_writer import VolumeWriter
 
 
 def change_sink() -> None:
-    dump = pw_dump()
-    sinks = parse_sinks(dump)
-    current_sink = get_current_sink(dump)
+    with load_state() as state:
+        sinks = state.sinks()
+        current_sink = state.current_sink()
 
-    if current_sink:
-        print(
-            f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
-        )
-    else:
-        print("Current default sink: unknown")
+        if current_sink:
+            print(
+                f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
+            )
+        else:
+            print("Current default sink: unknown")
 
-    table("Output Sinks", sinks)
-    chosen_sink = select_option("Select sink")
+        table("Output Sinks", sinks)
+        chosen_sink = select_option("Select sink")
 
-    set_default_sink(chosen_sink)
+        state.set_default_sink(chosen_sink)
 
 
 def change_profile() -> None:
-    dump = pw_dump()
-    sinks = parse_sinks(dump)
-    current_sink = get_current_sink(dump)
-
-    if current_sink:
-        print(
-            f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
-        )
-    else:
-        print("Current default sink: unknown")
-
-    table("Output Sinks", sinks)
-    chosen_sink = select_option("Select sink")
+    with load_state() as state:
+        sinks = state.sinks()
+        current_sink = state.current_sink()
+
+        if current_sink:
+            print(
+                f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
+            )
+        else:
+            print("Current default sink: unknown")
+
+        table("Output Sinks", sinks)
+        chosen_sink = select_option("Select sink")
     
-    try:
-        sink = next(s for s in sinks if s["id"] == chosen_sink)
-    except StopIteration as exc:
-        raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
+        try:
+            sink = next(s for s in sinks if s["id"] == chosen_sink)
+        except StopIteration as exc:
+            raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
 
-    card_id = sink.get("device.id")
+        card_id = sink.get("device.id")
 
-    card = parse_card(dump, card_id)
+        card = state.card(card_id)
     
-    if card is None:
-        raise RuntimeError(f"No card found for id {card_id}")
-
-    profiles = parse_profiles(card)
-    current_profile = get_current_profile(card)
-
-    if current_profile:
-        description = current_profile.get("description") or current_profile.get("name")
-        print(
-            f"Current profile: {description} (index {current_profile.get('index')})"
-        )
-    else:
-        print(f"Current profile: {card.get('profile')}")
+        if card is None:
+            raise RuntimeError(f"No card found for id {card_id}")
+
+        profiles = parse_profiles(card)
+        current_profile = get_current_profile(card)
+
+        if current_profile:
+            description = current_profile.get("description") or current_profile.get("name")
+            print(
+                f"Current profile: {description} (index {current_profile.get('index')})"
+            )
+        else:
+            print(f"Current profile: {card.get('profile')}")
     
-    table(f"Profiles for Card {card_id}", profiles)
-    chosen_profile = select_option("Select profile")
+        table(f"Profiles for Card {card_id}", profiles)
+        chosen_profile = select_option("Select profile")
 
-    set_profile(card_id, chosen_profile)
+        state.set_profile(card_id, chosen_profile)
 
 
 def change_volume() -> None:
-    dump = pw_dump()
-    sinks = parse_sinks(dump)
-    current_sink = get_current_sink(dump)
+    with load_state() as state:
+        sinks = state.sinks()
+        current_sink = state.current_sink()
 
-    if current_sink:
-        print(
-            f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
-        )
-    else:
-        print("Current default sink: unknown")
+        if current_sink:
+            print(
+                f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
+            )
+        else:
+            print("Current default sink: unknown")
 
-    table("Output Sinks", sinks)
-    chosen_sink = select_option("Select sink")
+        table("Output Sinks", sinks)
+        chosen_sink = select_option("Select sink")
 
-    try:
-        sink = next(s for s in sinks if s["id"] == chosen_sink)
-    except StopIteration as exc:
-        raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
+        try:
+            sink = next(s for s in sinks if s["id"] == chosen_sink)
+        except StopIteration as exc:
+            raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
 
-    volume = sink.get("volume")
-    volume_linear = sink.get("volume_linear")
-    if isinstance(volume, (int, float)):
-        print(f"Current volume: {float(volume):.2f} (~{float(volume) * 100:.0f}%)")
-        if isinstance(volume_linear, (int, float)):
-            print(f"Raw PipeWire volume: {float(volume_linear):.3f}")
-    elif volume is not None:
-        print(f"Current volume: {volume}")
-    else:
-        print("Current volume: unknown")
+        volume = sink.get("volume")
+        volume_linear = sink.get("volume_linear")
+        if isinstance(volume, (int, float)):
+            print(f"Current volume: {float(volume):.2f} (~{float(volume) * 100:.0f}%)")
+            if isinstance(volume_linear, (int, float)):
+                print(f"Raw PipeWire volume: {float(volume_linear):.3f}")
+        elif volume is not None:
+            print(f"Current volume: {volume}")
+        else:
+            print("Current volume: unknown")
 
-    mute_state = sink.get("mute")
-    if mute_state is not None:
-        print(f"Muted: {'yes' if mute_state else 'no'}")
+        mute_state = sink.get("mute")
+        if mute_state is not None:
+            print(f"Muted: {'yes' if mute_state else 'no'}")
 
-    raw_volume = input("Enter volume (e.g. 0.5 or 50%) > ").strip()
+        raw_volume = input("Enter volume (e.g. 0.5 or 50%) > ").strip()
 
-    if not raw_volume:
-        print("Volume unchanged: no value entered")
-        return
+        if not raw_volume:
+            print("Volume unchanged: no value entered")
+            return
+
+        state.set_volume(chosen_sink, _volume_arg(raw_volume))
+
+
+def change_mute() -> None:
+    with load_state() as state:
+        sinks = state.sinks()
+        current_sink = state.current_sink()
+
+        if current_sink:
+            print(
+                f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
+            )
+        else:
+            print("Current default sink: unknown")
+
+        table("Output Sinks", sinks)
+        chosen_sink = select_option("Select sink")
 
-    volume_arg = raw_volume
-    if raw_volume.endswith("%"):
         try:
-            float(raw_volume[:-1])
-        except ValueError as exc:
-            raise RuntimeError(f"Invalid percentage volume '{raw_volume}'") from exc
-    else:
+            sink = next(s for s in sinks if s["id"] == chosen_sink)
+        except StopIteration as exc:
+            raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
+
+        mute_state = sink.get("mute")
+        if mute_state is None:
+            print("Current mute state: unknown")
+        else:
+            print(f"Current mute state: {'muted' if mute_state else 'unmuted'}")
+
+        choice = input("Enter mute state (mute/unmute/toggle) > ").strip().lower()
+
+        if not choice:
+            print("Mute state unchanged: no value entered")
+            return
+
+        mute = _mute_arg(choice)
+        if mute is None:
+            raise RuntimeError(f"Unrecognized mute option '{choice}'")
+        state.set_mute(chosen_sink, mute)
+
+
+def change_stream() -> None:
+    with load_state() as state:
+        streams = state.streams()
+
+        if not streams:
+            print("No application streams are playing")
+            return
+
+        table("Application Streams", streams)
+        chosen_stream = select_option("Select stream")
+
         try:
-            volume_value = float(raw_volume)
-        except ValueError as exc:
-            raise RuntimeError(f"Invalid volume '{raw_volume}'") from exc
-        if volume_value < 0:
-            raise RuntimeError("Volume must be non-negative")
-        volume_arg = f"{volume_value}"
+            stream = next(s for s in streams if s["id"] == chosen_stream)
+        except StopIteration as exc:
+            raise RuntimeError(f"Selected stream {chosen_stream} not found") from exc
 
-    set_volume(chosen_sink, volume_arg)
+        volume = stream.get("volume")
+        if isinstance(volume, (int, float)):
+            print(f"Current volume: {float(volume):.2f} (~{float(volume) * 100:.0f}%)")
+        else:
+            print("Current volume: unknown")
 
+        mute_state = stream.get("mute")
+        if mute_state is not None:
+            print(f"Muted: {'yes' if mute_state else 'no'}")
 
-def change_mute() -> None:
-    dump = pw_dump()
-    sinks = parse_sinks(dump)
-    current_sink = get_current_sink(dump)
+        choice = input("Enter volume (e.g. 0.5 or 50%) or mute/unmute/toggle > ").strip().lower()
 
-    if current_sink:
-        print(
-            f"Current default sink: {current_sink.get('description')} (id {current_sink.get('id')})"
-        )
-    else:
-        print("Current default sink: unknown")
+        if not choice:
+            print("Stream unchanged: no value entered")
+            return
 
-    table("Output Sinks", sinks)
-    chosen_sink = select_option("Select sink")
+        # Only mute words count here: "1" and "0" are volumes, not mute states.
+        mute = _STREAM_MUTES.get(choice)
+        if mute is not None:
+            state.set_mute(chosen_stream, mute)
+        else:
+            state.set_volume(chosen_stream, _volume_arg(choice))
 
-    try:
-        sink = next(s for s in sinks if s["id"] == chosen_sink)
-    except StopIteration as exc:
-        raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
 
-    mute_state = sink.get("mute")
-    if mute_state is None:
-        print("Current mute state: unknown")
-    else:
-        print(f"Current mute state: {'muted' if mute_state else 'unmuted'}")
+def fade_volume() -> None:
+    with load_state() as state:
+        sinks = state.sinks()
+
+        table("Output Sinks", sinks)
+        chosen_sink = select_option("Select sink")
+
+        try:
+            sink = next(s for s in sinks if s["id"] == chosen_sink)
+        except StopIteration as exc:
+            raise RuntimeError(f"Selected sink {chosen_sink} not found") from exc
+
+        volume = sink.get("volume")
+        if not isinstance(volume, (int, float)):
+            raise RuntimeError(f"Volume of sink {chosen_sink} is unknown; cannot fade")
+        print(f"Current volume: {float(volume):.2f} (~{float(volume) * 100:.0f}%)")
+
+        raw_target = input("Fade to volume (e.g. 0.5 or 50%) > ").strip()
+        if not raw_target:
+            print("Volume unchanged: no value entered")
+            return
+        target = _volume_value(raw_target)
+
+        raw_duration = input(f"Fade duration in ms [{DEFAULT_DURATION * 1000:.0f}] > ").strip()
+        try:
+            duration = float(raw_duration) / 1000 if raw_duration else DEFAULT_DURATION
+        except ValueError as exc:
+            raise RuntimeError(f"Invalid duration '{raw_duration}'") from exc
+
+        writer = VolumeWriter(run_commands=state.run_commands)
+        ramp = VolumeRamp(writer, mute=state.set_mute)
+        try:
+            ramp.ramp(chosen_sink, float(volume), target, duration)
+            ramp.wait()
+            writer.flush()
+        finally:
+            ramp.close()
+            writer.close()
+
+
+def _volume_value(raw_volume: str) -> float:
+    """Parse a volume typed by the user, where ``50%`` means ``0.5``."""
+    try:
+        value = float(_volume_arg(raw_volume).rstrip("%"))
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid volume '{raw_volume}'") from exc
+    if raw_volume.endswith("%"):
+        value /= 100
+    if value < 0:
+        raise RuntimeError("Volume must be non-negative")
+    return value
 
-    choice = input("Enter mute state (mute/unmute/toggle) > ").strip().lower()
 
-    if not choice:
-        print("Mute state unchanged: no value entered")
-        return
+def _volume_arg(raw_volume: str) -> str:
+    """Validate a volume typed by the user and return it in ``wpctl`` form."""
+    if raw_volume.endswith("%"):
+        try:
+            float(raw_volume[:-1])
+        except ValueError as exc:
+            raise RuntimeError(f"Invalid percentage volume '{raw_volume}'") from exc
+        return raw_volume
 
+    try:
+        volume_value = float(raw_volume)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid volume '{raw_volume}'") from exc
+    if volume_value < 0:
+        raise RuntimeError("Volume must be non-negative")
+    return f"{volume_value}"
+
+
+_STREAM_MUTES: dict[str, bool | str] = {
+    "mute": True,
+    "m": True,
+    "unmute": False,
+    "u": False,
+    "toggle": "toggle",
+    "t": "toggle",
+}
+
+
+def _mute_arg(choice: str) -> bool | str | None:
+    """Map a mute choice to the ``set_mute`` argument, or ``None`` if unrecognized."""
     if choice in {"mute", "m", "on", "yes", "1"}:
-        set_mute(chosen_sink, True)
-    elif choice in {"unmute", "u", "off", "no", "0"}:
-        set_mute(chosen_sink, False)
-    elif choice in {"toggle", "t"}:
-        set_mute(chosen_sink, "toggle")
-    else:
-        raise RuntimeError(f"Unrecognized mute option '{choice}'")
+        return True
+    if choice in {"unmute", "u", "off", "no", "0"}:
+        return False
+    if choice in {"toggle", "t"}:
+        return "toggle"
+    return None
@@ -0,0 +1,197 @@
+"""Incremental, filtering decoder for ``pw-dump`` output.
+
+``pw-dump`` prints one top-level JSON array of objects. Instead of decoding
+the whole document, :func:`iter_objects` tracks bracket depth line by line,
+skips objects whose ``type`` is not wanted before decoding them, and drops
+the text of unwanted ``info.params`` entries (``EnumFormat``, ``PropInfo``,
+...) as it streams past. Only one object is held in memory at a time.
+
+Skipped objects and params, and the bodies of wanted params, are stepped
+over by looking for the closing bracket at the indentation of the opening
+line, as ``pw-dump`` pretty-prints its output.
+Objects that are not laid out that way are tokenized in full, and compact
+ones are decoded first and filtered afterwards.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional
+
+
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+_BRACKETS = re.compile(r"[{}\[\]]")
+_TYPE = re.compile(r'^\s*"type"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_KEY = re.compile(r'^\s*"((?:[^"\\]|\\.)*)"\s*:')
+_OPENING_KEY = re.compile(r'^(\s*)"((?:[^"\\]|\\.)*)"\s*:\s*([\[{])\s*$')
+_CLOSING = {"[": "]", "{": "}"}
+
+# Depth (counting the enclosing array) at which the fields of a top-level
+# object, its ``info`` dictionary and the ``info.params`` entries live.
+_OBJECT_DEPTH = 2
+_INFO_DEPTH = 3
+_PARAMS_DEPTH = 4
+
+
+def prune_params(obj: Dict[str, Any], params: Optional[Collection[str]], copy: bool = False) -> Dict[str, Any]:
+    """Drop ``info.params`` entries not named in ``params`` (``None`` keeps all).
+
+    ``obj`` is changed in place, unless ``copy`` is set: then a pruned copy
+    is returned and ``obj`` is left alone, e.g. when it is shared.
+    """
+    if params is None:
+        return obj
+    info = obj.get("info")
+    if isinstance(info, dict) and isinstance(info.get("params"), dict):
+        kept = {key: value for key, value in info["params"].items() if key in params}
+        if copy:
+            return {**obj, "info": {**info, "params": kept}}
+        info["params"] = kept
+    return obj
+
+
+class _ObjectReader:
+    """Accumulates the text of the top-level object currently being read."""
+
+    def __init__(
+        self,
+        types: Optional[Collection[str]],
+        params: Optional[Collection[str]],
+        indent: Optional[str],
+    ) -> None:
+        self.types = types
+        self.params = params
+        # Leading whitespace of the line holding the opening brace, or None
+        # when other text precedes it on that line.
+        self.indent = indent
+        self.parts: List[str] = []
+        self.type_known = False
+        self.discard = False
+        self.in_params = False
+        # Set while the lines of a wanted param are copied without tokenizing.
+        self.copying = False
+        self.skipped_param: Optional[str] = None
+
+    def feed_line(self, text: str, depth: int) -> Optional[str]:
+        """Record ``text``, a whole line starting at ``depth``.
+
+        Returns a line prefix when the lines up to the next one starting with
+        that prefix can be skipped, or copied, without tokenizing them.
+        """
+        if self.discard:
+            return None
+        if not self.type_known and self.types is not None and depth == _OBJECT_DEPTH:
+            match = _TYPE.match(text)
+            if match is not None:
+                self.type_known = True
+                if match.group(1) not in self.types:
+                    self.discard = True
+                    self.parts.clear()
+                    return None if self.indent is None else self.indent + "}"
+        if depth == _INFO_DEPTH:
+            key = _KEY.match(text)
+            self.in_params = key is not None and key.group(1) == "params"
+        elif depth == _PARAMS_DEPTH and self.in_params:
+            key = _OPENING_KEY.match(text)
+            if key is not None:
+                if self.params is not None and key.group(2) not in self.params:
+                    self.skipped_param = key.group(2)
+                else:
+                    self.parts.append(text)
+                    self.copying = True
+                return key.group(1) + _CLOSING[key.group(3)]
+        self.parts.append(text)
+        return None
+
+    def end_skip(self, closing_line: str) -> None:
+        """Finish skipping a param; keep its key so the commas stay valid."""
+        comma = "," if closing_line.rstrip().endswith(",") else ""
+        self.parts.append(f"{json.dumps(self.skipped_param)}: null{comma}\n")
+        self.skipped_param = None
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        if self.discard:
+            return None
+        obj = json.loads("".join(self.parts))
+        if not isinstance(obj, dict):
+            return None
+        if self.types is not None and obj.get("type") not in self.types:
+            return None
+        return prune_params(obj, self.params)
+
+
+def _skip(lines: Iterator[str], until: str, reader: _ObjectReader) -> int:
+    """Consume lines up to one starting with ``until``; return the depth after it."""
+    closing = ""
+    if reader.copying:
+        append = reader.parts.append
+        for closing in lines:
+            append(closing)
+            if closing.startswith(until):
+                break
+        reader.copying = False
+        return _PARAMS_DEPTH
+    for closing in lines:
+        if closing.startswith(until):
+            break
+    if reader.skipped_param is not None:
+        reader.end_skip(closing)
+        return _PARAMS_DEPTH
+    return _OBJECT_DEPTH - 1
+
+
+def iter_objects(
+    lines: Iterable[str],
+    types: Optional[Collection[str]] = None,
+    params: Optional[Collection[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the top-level objects of a ``pw-dump`` document read from ``lines``.
+
+    Objects whose ``type`` is not in ``types`` are skipped and only the
+    ``info.params`` keys in ``params`` are kept; ``None`` disables either
+    filter.
+    """
+    depth = 0
+    reader: Optional[_ObjectReader] = None
+    lines = iter(lines)
+    for line in lines:
+        line_depth = depth
+        if reader is None or _BRACKETS.search(line):
+            # Offset in ``line`` where the current object's text starts, and
+            # whether that object opened on this line (so it is not line-aligned).
+            start = 0
+            opened_here = False
+            for match in _TOKEN.finditer(line):
+                token = match.group()
+                if token[0] == '"':
+                    continue
+                if token in "{[":
+                    depth += 1
+                    if depth == _OBJECT_DEPTH and token == "{":
+                        prefix = line[: match.start()]
+                        indent = prefix if not prefix.strip() else None
+                        reader = _ObjectReader(types, params, indent)
+                        start = match.start()
+                        opened_here = True
+                    continue
+                depth -= 1
+                if depth == _OBJECT_DEPTH - 1 and token == "}" and reader is not None:
+                    if opened_here:
+                        reader.parts.append(line[start : match.end()])
+                    else:
+                        reader.feed_line(line[: match.end()], line_depth)
+                    obj = reader.finish()
+                    reader = None
+                    if obj is not None:
+                        yield obj
+            if reader is None:
+                continue
+            if opened_here:
+                reader.parts.append(line[start:])
+                continue
+
+        until = reader.feed_line(line, line_depth)
+        if until is not None:
+            depth = _skip(lines, until, reader)
+            if depth < _OBJECT_DEPTH:
+                reader = None
@@ -1,6 +1,51 @@
 """GUI package for PipeWire quick settings."""
 from __future__ import annotations
 
-from .app import run_gui
+import time
 
-__all__ = ["run_gui"]
+__all__ = ["APPLICATION_ID", "run_gui"]
+
+APPLICATION_ID = "dev.pipewire.quicksettings"
+
+
+def _activate_running(timeout_ms: int = 500) -> bool:
+    """Ask a running instance to toggle its window; return whether one answered.
+
+    This calls ``org.freedesktop.Application.Activate`` with Gio alone, so a
+    launch that hands off never initializes Gtk.
+    """
+    try:
+        from gi.repository import Gio, GLib
+    except ImportError:
+        return False
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        bus.call_sync(
+            APPLICATION_ID,
+            "/" + APPLICATION_ID.replace(".", "/"),
+            "org.freedesktop.Application",
+            "Activate",
+            GLib.Variant("(a{sv})", ({},)),
+            None,
+            Gio.DBusCallFlags.NO_AUTO_START,
+            timeout_ms,
+            None,
+        )
+    except GLib.Error:
+        return False
+    return True
+
+
+def run_gui(resident: bool = False) -> None:
+    """Start the Gtk application; Gtk is only imported once the GUI is chosen.
+
+    With ``resident`` the application keeps running hidden when its window
+    is closed, and later ``resident`` launches only toggle that window.
+    """
+    # Startup timings are measured from here, so they include importing Gtk.
+    started_ns = time.perf_counter_ns()
+    if resident and _activate_running():
+        return
+    from .app import run_gui as _run_gui
+
+    _run_gui(started_ns, resident)
@@ -1,28 +1,48 @@
 """Gtk application entry point for PipeWire quick settings."""
 from __future__ import annotations
 
+from typing import Optional
+
 import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gio, Gtk
 
+from . import APPLICATION_ID
 from .window import QuickSettingsWindow
 
 
 class QuickSettingsApplication(Gtk.Application):
-    """Gtk application wrapper that presents the PipeWire snapshot."""
+    """Gtk application wrapper that presents the PipeWire snapshot.
+
+    Gtk makes the first instance the primary one and turns later launches
+    into ``activate`` calls on it. A ``resident`` application holds itself
+    open with its window hidden, and each activation toggles the window.
+    """
+
+    def __init__(self, started_ns: Optional[int] = None, resident: bool = False) -> None:
+        super().__init__(application_id=APPLICATION_ID, flags=Gio.ApplicationFlags.FLAGS_NONE)
+        self.started_ns = started_ns
+        self.resident = resident
 
-    def __init__(self) -> None:
-        super().__init__(application_id="dev.pipewire.quicksettings", flags=Gio.ApplicationFlags.FLAGS_NONE)
+    def do_startup(self) -> None:  # type: ignore[override]
+        Gtk.Application.do_startup(self)
+        if self.resident:
+            self.hold()
 
     def do_activate(self) -> None:  # type: ignore[override]
-        window = self.props.active_window
+        windows = self.get_windows()
+        window = windows[0] if windows else None
         if window is None:
-            window = QuickSettingsWindow(self)
-        window.present()
+            window = QuickSettingsWindow(self, started_ns=self.started_ns, resident=self.resident)
+            window.present()
+        elif self.resident and window.get_visible():
+            window.set_visible(False)
+        else:
+            window.show_fresh()
 
 
-def run_gui() -> None:
+def run_gui(started_ns: Optional[int] = None, resident: bool = False) -> None:
     """Start the Gtk application using live PipeWire data."""
-    app = QuickSettingsApplication()
+    app = QuickSettingsApplication(started_ns, resident)
     app.run()
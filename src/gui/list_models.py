@@ -0,0 +1,137 @@
+"""GObject rows and incremental ``Gio.ListStore`` updates for the dropdowns and lists."""
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, List, Protocol, Sequence
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gio, GObject
+
+from tracing import traced
+
+from .models import ProfileItem, SinkItem, StreamItem
+
+
+class _ItemRow(GObject.Object):
+    """List model row wrapping a snapshot item; ``label`` is bindable."""
+
+    label = GObject.Property(type=str, default="")
+
+    # Every row class provides this as a staticmethod. GObject's metaclass
+    # does not combine with ABCMeta, so :class:`RowType` states the contract.
+    key_for: Callable[[Any], Hashable]
+
+    def __init__(self, item: Any) -> None:
+        super().__init__()
+        self.item = item
+        self.label = item.display_name
+
+    @property
+    def key(self) -> Hashable:
+        return self.key_for(self.item)
+
+    def update(self, item: Any) -> None:
+        """Replace the wrapped item, notifying only the properties that changed."""
+        if item == self.item:
+            return
+        self.item = item
+        self._update_properties(item)
+
+    def _update_properties(self, item: Any) -> None:
+        label = item.display_name
+        if self.label != label:
+            self.label = label
+
+
+class RowType(Protocol):
+    """A row class :func:`sync_store` can build and match rows with."""
+
+    @staticmethod
+    def key_for(item: Any) -> Hashable:
+        ...
+
+    def __call__(self, item: Any) -> _ItemRow:
+        ...
+
+
+class SinkRow(_ItemRow):
+    item: SinkItem
+
+    @staticmethod
+    def key_for(item: SinkItem) -> Hashable:
+        return item.id
+
+
+class ProfileRow(_ItemRow):
+    item: ProfileItem
+
+    @staticmethod
+    def key_for(item: ProfileItem) -> Hashable:
+        return item.index
+
+
+class StreamRow(_ItemRow):
+    """Mixer row; ``volume``, ``adjustable``, ``muted`` and ``detail`` are bindable too."""
+
+    item: StreamItem
+
+    volume = GObject.Property(type=float, default=0.0)
+    adjustable = GObject.Property(type=bool, default=False)
+    muted = GObject.Property(type=bool, default=False)
+    detail = GObject.Property(type=str, default="")
+
+    def __init__(self, item: StreamItem) -> None:
+        super().__init__(item)
+        self._update_properties(item)
+
+    @staticmethod
+    def key_for(item: StreamItem) -> Hashable:
+        return item.id
+
+    def _update_properties(self, item: StreamItem) -> None:
+        super()._update_properties(item)
+        volume = item.volume if item.volume is not None else 0.0
+        if self.volume != volume:
+            self.volume = volume
+        adjustable = item.volume is not None
+        if self.adjustable != adjustable:
+            self.adjustable = adjustable
+        muted = bool(item.mute)
+        if self.muted != muted:
+            self.muted = muted
+        detail = item.description or ""
+        if self.detail != detail:
+            self.detail = detail
+
+
+@traced(cat="gui")
+def sync_store(store: Gio.ListStore, items: Sequence[Any], row_type: RowType) -> bool:
+    """Make ``store`` mirror ``items`` with at most one ``splice``.
+
+    Rows whose key is unchanged are kept (and updated in place) across the
+    common prefix and suffix, so bound widgets and the selection survive.
+    Returns whether the structure of the store changed.
+    """
+    old_rows: List[_ItemRow] = [store.get_item(pos) for pos in range(store.get_n_items())]
+    keys = [row_type.key_for(item) for item in items]
+    old_len = len(old_rows)
+    new_len = len(items)
+
+    start = 0
+    while start < old_len and start < new_len and old_rows[start].key == keys[start]:
+        old_rows[start].update(items[start])
+        start += 1
+
+    old_end = old_len
+    new_end = new_len
+    while old_end > start and new_end > start and old_rows[old_end - 1].key == keys[new_end - 1]:
+        old_rows[old_end - 1].update(items[new_end - 1])
+        old_end -= 1
+        new_end -= 1
+
+    if old_end == start and new_end == start:
+        return False
+
+    store.splice(start, old_end - start, [row_type(item) for item in items[start:new_end]])
+    return True
@@ -0,0 +1,17 @@
+"""Bridges background futures onto the GLib main loop."""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from gi.repository import GLib
+
+
+def call_on_main_loop(future: "Future[Any]", callback: Callable[["Future[Any]"], None]) -> None:
+    """Invoke ``callback(future)`` from the GLib main loop once ``future`` is done."""
+
+    def _deliver() -> bool:
+        callback(future)
+        return GLib.SOURCE_REMOVE
+
+    future.add_done_callback(lambda _future: GLib.idle_add(_deliver))
@@ -0,0 +1,109 @@
+"""Merging, rate-limited snapshot refreshes for the GUI."""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Optional
+
+from gi.repository import GLib
+
+
+# Both kinds re-read the whole graph. A details refresh follows the user's
+# own change to the selected sink and updates only its controls and the
+# stream mixer, unless the graph it read changed the sink list; a full
+# refresh always rebuilds the sink list too.
+DETAILS = "details"
+FULL = "full"
+
+_RANK = {DETAILS: 0, FULL: 1}
+
+RunRefresh = Callable[[str, Optional[int], Callable[[], None]], None]
+
+
+class RefreshScheduler:
+    """Merges refresh requests and runs them one at a time on the main loop.
+
+    Requests made while a refresh is queued or running fold into one
+    pending refresh: a full request absorbs details requests, and the most
+    recent preferred sink wins. At most one refresh is in flight and they
+    start at least ``min_interval`` seconds apart. ``run(kind,
+    preferred_sink_id, done)`` performs a refresh and must call ``done`` on
+    the main loop when it has finished. While ``can_run()`` is false, the
+    pending refresh waits for :meth:`resume`.
+    """
+
+    def __init__(
+        self,
+        run: RunRefresh,
+        min_interval: float = 0.1,
+        can_run: Callable[[], bool] = lambda: True,
+    ) -> None:
+        self._run = run
+        self.min_interval = min_interval
+        self._can_run = can_run
+        self._pending: Optional[str] = None
+        self._preferred_sink_id: Optional[int] = None
+        self._in_flight = False
+        self._source: Optional[int] = None
+        self._last_started = float("-inf")
+        self.requested = 0
+        self.merged = 0
+        self.runs: Dict[str, int] = {DETAILS: 0, FULL: 0}
+
+    @property
+    def pending(self) -> Optional[str]:
+        return self._pending
+
+    def request(self, kind: str = FULL, preferred_sink_id: Optional[int] = None) -> None:
+        """Ask for a refresh of ``kind``, merging it into one already waiting."""
+        self.requested += 1
+        if self._pending is None:
+            self._pending = kind
+        else:
+            self.merged += 1
+            if _RANK[kind] > _RANK[self._pending]:
+                self._pending = kind
+        if preferred_sink_id is not None:
+            self._preferred_sink_id = preferred_sink_id
+        self._schedule()
+
+    def resume(self) -> None:
+        """Start the pending refresh if ``can_run`` held it back."""
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Drop the pending refresh and its timer, e.g. when the window is destroyed."""
+        self._pending = None
+        if self._source is not None:
+            GLib.source_remove(self._source)
+            self._source = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"requested": self.requested, "merged": self.merged, **self.runs}
+
+    def _schedule(self) -> None:
+        if self._pending is None or self._in_flight or self._source is not None:
+            return
+        if not self._can_run():
+            return
+        delay = self._last_started + self.min_interval - time.monotonic()
+        if delay > 0:
+            self._source = GLib.timeout_add(max(1, int(delay * 1000)), self._start)
+        else:
+            self._source = GLib.idle_add(self._start)
+
+    def _start(self) -> bool:
+        self._source = None
+        kind = self._pending
+        if kind is None or not self._can_run():
+            return GLib.SOURCE_REMOVE
+        self._pending = None
+        self._in_flight = True
+        self._last_started = time.monotonic()
+        self.runs[kind] += 1
+        preferred_sink_id, self._preferred_sink_id = self._preferred_sink_id, None
+        self._run(kind, preferred_sink_id, self._finished)
+        return GLib.SOURCE_REMOVE
+
+    def _finished(self) -> None:
+        self._in_flight = False
+        self._schedule()
@@ -1,133 +1,361 @@
 """Provides a snapshot of PipeWire state for the GUI."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 from pipewire_parsers import (
-    get_current_profile,
-    get_current_sink,
-    parse_card,
-    parse_profiles,
-    parse_sinks,
+    DEVICE_TYPE,
+    PARSED_PARAMS,
+    PARSED_TYPES,
+    DumpIndex,
+    extract,
+    get_current_sink_id,
+    parse_profile_items,
 )
-from pw_client import pw_dump
+from backends import Backend, get_backend
+from pw_client import PipewireMonitor
+from snapshot_diff import (
+    DefaultSinkChanged,
+    DeviceKey,
+    Fingerprint,
+    ProfileChanged,
+    ProfileListChanged,
+    SinkAdded,
+    SinkKey,
+    SinkRemoved,
+    SnapshotChange,
+    StreamAdded,
+    StreamChanged,
+    StreamKey,
+    StreamRemoved,
+    diff_sink,
+    sink_fingerprint,
+)
+from tracing import span, traced
+
+from .models import ProfileItem, SinkItem, SourceItem, StreamItem
+
+
+# Entity kinds read in the single extraction pass of :meth:`PipewireSnapshot.apply`.
+SNAPSHOT_KINDS = ("sinks", "sources", "streams")
+
+Dump = List[Dict[str, Any]]
+# What :meth:`PipewireSnapshot.fetch` returns: one graph, or one per remote.
+Graph = Union[Dump, Dict[Optional[str], Dump]]
+
+
+# The ``EnumProfile`` fields that end up in a :class:`ProfileItem`, per profile.
+ProfilesKey = Tuple[Tuple[Any, Any, Any, Any], ...]
+
+
+class _DeviceProfiles:
+    """The converted profiles of one device and its active profile index.
+
+    ``source`` is the ``EnumProfile`` list the items were built from and
+    ``key`` its fields that matter. The next refresh reuses ``items`` when it
+    sees the same list object (a device the monitor did not update) or a list
+    with an equal key (a fresh ``pw-dump``).
+    """
 
-from .models import ProfileItem, SinkItem
+    __slots__ = ("source", "key", "items", "active")
+
+    def __init__(self, source: List[Any], key: ProfilesKey, items: List[ProfileItem], active: Optional[int]) -> None:
+        self.source = source
+        self.key = key
+        self.items = items
+        self.active = active
+
+
+def _profiles_key(enum_profile: List[Any]) -> ProfilesKey:
+    return tuple(
+        (profile.get("index"), profile.get("name"), profile.get("description"), profile.get("available"))
+        for profile in enum_profile
+        if isinstance(profile, dict)
+    )
 
 
 class PipewireSnapshot:
-    """Captures the PipeWire state needed for the GUI."""
+    """Captures the PipeWire state needed for the GUI.
+
+    Only the sink, source and stream items and the profiles of the devices
+    behind the sinks are kept; the dump itself is dropped once :meth:`apply` has converted it,
+    unless ``keep_index`` asks for its :class:`DumpIndex` to stay available
+    as :attr:`index`. With ``load=False`` the snapshot starts empty, so the
+    caller can run :meth:`fetch` off the main thread and :meth:`apply` it.
+
+    With several ``remotes`` every PipeWire instance is read at the same
+    time and the items of all of them are merged, each tagged with its
+    ``remote``. Object ids are only unique within one instance:
+    :attr:`sink_by_id`, :attr:`default_sink_id` and :attr:`index` describe
+    the first remote, :attr:`sink_by_key` holds every sink by
+    ``(remote, id)``, and writes must go through :meth:`backend_for`.
 
-    def __init__(self) -> None:
-        self.dump: List[Dict[str, Any]] = []
+    Every :meth:`apply` returns what changed since the previous one as
+    :mod:`snapshot_diff` events. Unchanged sinks and streams keep their
+    previous items, so callers may compare items by identity.
+    """
+
+    def __init__(
+        self,
+        monitor: Optional[PipewireMonitor] = None,
+        timeout: float = 2.0,
+        backend: Optional[Backend] = None,
+        keep_index: bool = False,
+        load: bool = True,
+        remotes: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        self.monitor = monitor
+        # Monitors by the remote they watch; the others are read with pw_dump.
+        self.monitors: Dict[Optional[str], PipewireMonitor] = {}
+        if monitor is not None:
+            self.monitors[monitor.remote] = monitor
+        backend = backend or get_backend()
+        self.remotes: List[Optional[str]] = list(remotes) if remotes else [backend.remote]
+        self.backends: Dict[Optional[str], Backend] = {remote: backend.for_remote(remote) for remote in self.remotes}
+        self.backend = self.backends[self.remotes[0]]
+        self._owned_backends = [b for b in self.backends.values() if b is not backend]
+        self.remote_errors: Dict[Optional[str], str] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.keep_index = keep_index
+        self.profile_cache_hits = 0
+        self.profile_cache_misses = 0
+        self.timeout = timeout
+        self.index: Optional[DumpIndex] = None
         self.sinks: List[SinkItem] = []
         self.sink_by_id: Dict[int, SinkItem] = {}
+        self.sink_by_key: Dict[SinkKey, SinkItem] = {}
+        self._fingerprints: Dict[SinkKey, Fingerprint] = {}
         self.default_sink_id: Optional[int] = None
-        self.refresh()
+        self.default_sink_by_remote: Dict[Optional[str], Optional[int]] = {}
+        self.sources: List[SourceItem] = []
+        self.streams: List[StreamItem] = []
+        self._devices: Dict[DeviceKey, _DeviceProfiles] = {}
+        self._stream_by_key: Dict[StreamKey, StreamItem] = {}
+        self.loaded = False
+        if load:
+            self.refresh()
+
+    @traced(cat="snapshot")
+    def refresh(self) -> List[SnapshotChange]:
+        return self.apply(self.fetch())
 
-    def refresh(self) -> None:
-        data = pw_dump()
-        self.dump = data
-        raw_sinks = parse_sinks(data)
+    @traced(cat="snapshot")
+    def fetch(self) -> Graph:
+        """Return the raw graph, or a graph per remote; safe to call from a worker thread."""
+        if len(self.remotes) == 1:
+            return self._load_dump(self.remotes[0])
+        return self._fetch_remotes()
 
+    def _fetch_remotes(self) -> Dict[Optional[str], Dump]:
+        """Read every remote at once, so a refresh takes as long as the slowest one."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=len(self.remotes), thread_name_prefix="pw-snapshot-remote")
+        futures = {remote: self._pool.submit(self._load_dump, remote) for remote in self.remotes}
+        dumps: Dict[Optional[str], Dump] = {}
+        errors: Dict[Optional[str], str] = {}
+        for remote, future in futures.items():
+            try:
+                dumps[remote] = future.result()
+            except Exception as exc:  # one unreachable remote must not hide the others
+                errors[remote] = str(exc)
+        self.remote_errors = errors
+        return dumps
+
+    @traced(cat="snapshot")
+    def apply(self, data: Graph) -> List[SnapshotChange]:
+        """Rebuild the snapshot from a graph returned by :meth:`fetch`; return what changed."""
+        parts = list(data.items()) if isinstance(data, dict) else [(self.remotes[0], data)]
         sinks: List[SinkItem] = []
-        lookup: Dict[int, SinkItem] = {}
-        for raw in raw_sinks:
-            sink = self._to_sink_item(raw)
-            if sink is None:
-                continue
-            sinks.append(sink)
-            lookup[sink.id] = sink
+        sources: List[SourceItem] = []
+        streams: List[StreamItem] = []
+        defaults: Dict[Optional[str], Optional[int]] = {}
+        devices: Dict[DeviceKey, _DeviceProfiles] = {}
+        primary: Optional[DumpIndex] = None
+        for remote, dump in parts:
+            index = DumpIndex(dump)
+            extracted = extract(index, SNAPSHOT_KINDS)
+            remote_sinks: List[SinkItem] = extracted["sinks"]
+            for item in (*remote_sinks, *extracted["sources"], *extracted["streams"]):
+                item.remote = remote
+            sinks.extend(remote_sinks)
+            sources.extend(extracted["sources"])
+            streams.extend(extracted["streams"])
+
+            default_sink_id = get_current_sink_id(index)
+            if default_sink_id is None and remote_sinks:
+                default_sink_id = remote_sinks[0].id
+            defaults[remote] = default_sink_id
+            devices.update(self._device_profiles(index, remote_sinks, remote))
+            if remote == self.remotes[0]:
+                primary = index
+
+        with span("diff", "snapshot"):
+            changes, sinks, fingerprints = self._diff_sinks(sinks)
+            for remote in {**self.default_sink_by_remote, **defaults}:
+                old_default = self.default_sink_by_remote.get(remote)
+                if defaults.get(remote) != old_default:
+                    changes.append(DefaultSinkChanged(remote, old_default, defaults.get(remote)))
+            changes.extend(self._diff_devices(devices))
+            stream_changes, streams = self._diff_streams(streams)
+            changes.extend(stream_changes)
 
         self.sinks = sinks
-        self.sink_by_id = lookup
+        self.sources = sources
+        self.streams = streams
+        self._stream_by_key = {(stream.remote, stream.id): stream for stream in streams}
+        self.sink_by_key = {(sink.remote, sink.id): sink for sink in sinks}
+        self._fingerprints = fingerprints
+        self.sink_by_id = {}
+        for sink in sinks:
+            self.sink_by_id.setdefault(sink.id, sink)
+        self.default_sink_by_remote = defaults
+        self.default_sink_id = defaults.get(self.remotes[0])
+        self._devices = devices
+        self.index = primary if self.keep_index else None
+        self.loaded = True
+        return changes
 
-        current = get_current_sink(data)
-        if current is not None:
-            try:
-                self.default_sink_id = int(current["id"])
-            except (KeyError, TypeError, ValueError):
-                self.default_sink_id = None
-        elif sinks:
-            self.default_sink_id = sinks[0].id
-        else:
-            self.default_sink_id = None
-
-    def _to_sink_item(self, raw: Dict[str, Any]) -> Optional[SinkItem]:
-        sink_id = raw.get("id")
-        if sink_id is None:
-            return None
-        try:
-            sink_id_int = int(sink_id)
-        except (TypeError, ValueError):
-            return None
-
-        description = raw.get("description") or raw.get("name") or f"Sink {sink_id_int}"
-
-        device_raw = raw.get("device.id")
-        device_id: Optional[int] = None
-        if device_raw is not None:
-            try:
-                device_id = int(device_raw)
-            except (TypeError, ValueError):
-                device_id = None
-
-        volume = raw.get("volume") if isinstance(raw.get("volume"), (int, float)) else None
-        volume_linear = raw.get("volume_linear") if isinstance(raw.get("volume_linear"), (int, float)) else None
-
-        mute_raw = raw.get("mute")
-        if isinstance(mute_raw, bool):
-            mute = mute_raw
-        elif mute_raw is None:
-            mute = None
-        else:
-            mute = bool(mute_raw)
-
-        return SinkItem(
-            id=sink_id_int,
-            description=str(description),
-            device_id=device_id,
-            volume=float(volume) if volume is not None else None,
-            volume_linear=float(volume_linear) if volume_linear is not None else None,
-            mute=mute,
-            name=raw.get("name"),
-        )
-
-    def get_profiles(self, sink_id: int) -> Tuple[List[ProfileItem], Optional[int]]:
-        sink = self.sink_by_id.get(sink_id)
-        if sink is None or sink.device_id is None:
-            return [], None
+    def _diff_sinks(
+        self,
+        sinks: List[SinkItem],
+    ) -> Tuple[List[SnapshotChange], List[SinkItem], Dict[SinkKey, Fingerprint]]:
+        """Compare ``sinks`` with the current ones; unchanged sinks keep their old item."""
+        previous = self._fingerprints
+        changes: List[SnapshotChange] = []
+        kept: List[SinkItem] = []
+        fingerprints: Dict[SinkKey, Fingerprint] = {}
+        for sink in sinks:
+            key = (sink.remote, sink.id)
+            fingerprint = sink_fingerprint(sink)
+            fingerprints[key] = fingerprint
+            old_fingerprint = previous.get(key)
+            if old_fingerprint is None:
+                changes.append(SinkAdded(sink))
+            elif old_fingerprint == fingerprint:
+                sink = self.sink_by_key[key]
+            else:
+                changes.extend(diff_sink(self.sink_by_key[key], sink))
+            kept.append(sink)
+        for key, sink in self.sink_by_key.items():
+            if key not in fingerprints:
+                changes.append(SinkRemoved(sink))
+        return changes, kept, fingerprints
 
-        card = parse_card(self.dump, sink.device_id)
-        if card is None:
-            return [], None
+    def _diff_streams(self, streams: List[StreamItem]) -> Tuple[List[SnapshotChange], List[StreamItem]]:
+        """Compare ``streams`` with the current ones; unchanged streams keep their old item."""
+        previous = self._stream_by_key
+        changes: List[SnapshotChange] = []
+        kept: List[StreamItem] = []
+        seen: Set[StreamKey] = set()
+        for stream in streams:
+            key = (stream.remote, stream.id)
+            seen.add(key)
+            old = previous.get(key)
+            if old is None:
+                changes.append(StreamAdded(stream))
+            elif old == stream:
+                stream = old
+            else:
+                changes.append(StreamChanged(old, stream))
+            kept.append(stream)
+        for key, stream in previous.items():
+            if key not in seen:
+                changes.append(StreamRemoved(stream))
+        return changes, kept
 
-        profile_items: List[ProfileItem] = []
-        for profile in parse_profiles(card):
-            index = profile.get("index")
-            if index is None:
+    def _diff_devices(self, devices: Dict[DeviceKey, _DeviceProfiles]) -> List[SnapshotChange]:
+        """Profile changes of devices that were already known; new devices arrive with their sinks."""
+        changes: List[SnapshotChange] = []
+        for (remote, device_id), device in devices.items():
+            old = self._devices.get((remote, device_id))
+            if old is None:
                 continue
-            try:
-                index_int = int(index)
-            except (TypeError, ValueError):
-                continue
-            profile_items.append(
-                ProfileItem(
-                    index=index_int,
-                    name=profile.get("name"),
-                    description=profile.get("description"),
-                    available=profile.get("available"),
-                )
-            )
-
-        active = get_current_profile(card)
-        active_index: Optional[int] = None
-        if active is not None:
-            idx = active.get("index")
-            if idx is not None:
+            # Unchanged profile lists are reused by _device_profiles.
+            if device.items is not old.items:
+                changes.append(ProfileListChanged(remote, device_id, device.items))
+            if device.active != old.active:
+                changes.append(ProfileChanged(remote, device_id, old.active, device.active))
+        return changes
+
+    def backend_for(self, remote: Optional[str]) -> Backend:
+        """The backend that writes to the instance an item's ``remote`` names."""
+        return self.backends[remote]
+
+    def close(self) -> None:
+        """Stop the remote reader threads and close the backends made for other remotes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        for backend in self._owned_backends:
+            backend.close()
+        self._owned_backends = []
+
+    def add_monitor(self, monitor: PipewireMonitor) -> None:
+        """Read ``monitor.remote`` from ``monitor``'s store instead of running ``pw_dump``."""
+        self.monitors[monitor.remote] = monitor
+
+    def _load_dump(self, remote: Optional[str]) -> Dump:
+        """Read the graph from the remote's monitor, or from its backend without one."""
+        monitor = self.monitors.get(remote)
+        if (
+            monitor is not None
+            and monitor.running
+            and monitor.wait_ready(self.timeout)
+        ):
+            return monitor.dump()
+        with span("pw_dump", "snapshot", remote=remote):
+            return self.backends[remote].pw_dump(PARSED_TYPES, PARSED_PARAMS)
+
+    def _device_profiles(
+        self,
+        index: DumpIndex,
+        sinks: List[SinkItem],
+        remote: Optional[str],
+    ) -> Dict[DeviceKey, _DeviceProfiles]:
+        """Convert the profiles of every device with a sink, reusing unchanged ones."""
+        previous = self._devices
+        devices: Dict[DeviceKey, _DeviceProfiles] = {}
+        with span("_device_profiles", "snapshot"):
+            for sink in sinks:
+                device_id = sink.device_id
+                if device_id is None or (remote, device_id) in devices:
+                    continue
+                device = index.get(device_id, DEVICE_TYPE)
+                if device is None:
+                    continue
+                params = (device.get("info") or {}).get("params") or {}
+                enum_profile = params.get("EnumProfile") or []
+                old = previous.get((remote, device_id))
+                if old is not None and old.source is enum_profile:
+                    key, items = old.key, old.items
+                    self.profile_cache_hits += 1
+                else:
+                    key = _profiles_key(enum_profile)
+                    if old is not None and old.key == key:
+                        items = old.items
+                        self.profile_cache_hits += 1
+                    else:
+                        items = parse_profile_items(enum_profile)
+                        self.profile_cache_misses += 1
+
+                current = params.get("Profile") or [{}]
+                active = current[0].get("index") if isinstance(current[0], dict) else None
                 try:
-                    active_index = int(idx)
+                    active_index = int(active) if active is not None else None
                 except (TypeError, ValueError):
                     active_index = None
+                if active_index is not None and not any(item.index == active_index for item in items):
+                    active_index = None
+                devices[(remote, device_id)] = _DeviceProfiles(enum_profile, key, items, active_index)
+        return devices
 
-        return profile_items, active_index
+    @traced(cat="snapshot")
+    def get_profiles(self, sink_id: int, remote: Optional[str] = None) -> Tuple[List[ProfileItem], Optional[int]]:
+        sink = self.sink_by_id.get(sink_id) if remote is None else self.sink_by_key.get((remote, sink_id))
+        if sink is None or sink.device_id is None:
+            return [], None
+        device = self._devices.get((sink.remote, sink.device_id))
+        if device is None:
+            return [], None
+        return device.items, device.active
@@ -1,16 +1,29 @@
 """Gtk window for the PipeWire quick settings UI."""
 from __future__ import annotations
 
-from typing import List, Optional, cast
+from typing import Any, Callable, Dict, List, Optional, cast
 
 import subprocess
+import sys
+import time
 
 import gi
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gio, GLib, Gtk, Gdk, Pango
-
-from pw_client import set_default_sink, set_mute, set_profile, set_volume
+from gi.repository import Gio, GLib, GObject, Gtk, Gdk, Pango
+
+from concurrent.futures import Future
+
+from backends import Backend, get_backend
+from pw_client import PipewireMonitor, run_async, write_async
+from snapshot_diff import SINK_LIST_CHANGES, STREAM_CHANGES
+import tracing
+from tracing import traced
+from volume_ramp import DEFAULT_DURATION, VolumeRamp
+from volume_writer import VolumeWriter
+from .mainloop import call_on_main_loop
+from .list_models import ProfileRow, SinkRow, StreamRow, sync_store
+from .refresh import DETAILS, FULL, RefreshScheduler
 from .models import ProfileItem
 from .snapshot import PipewireSnapshot
 
@@ -58,16 +71,29 @@ def _configure_dropdown(dropdown: Gtk.DropDown, max_width_chars: int = 36) -> No
             label.set_text("")
             return
 
-        if hasattr(item, "get_string"):
+        if isinstance(item, GObject.Object) and item.find_property("label") is not None:
+            # Rows update their label in place; keep the widget bound to it.
+            label._row_binding = item.bind_property(  # type: ignore[attr-defined]
+                "label", label, "label", GObject.BindingFlags.SYNC_CREATE
+            )
+        elif hasattr(item, "get_string"):
             label.set_text(item.get_string())
         else:
             label.set_text(str(item))
 
+    def _unbind_label(_factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        label = list_item.get_child()
+        binding = getattr(label, "_row_binding", None)
+        if binding is not None:
+            binding.unbind()
+            label._row_binding = None  # type: ignore[union-attr]
+
     def _bind_display(_factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
         _bind_label(list_item)
 
     display_factory.connect("setup", _setup_display)
     display_factory.connect("bind", _bind_display)
+    display_factory.connect("unbind", _unbind_label)
     dropdown.set_factory(display_factory)
 
     list_factory = Gtk.SignalListItemFactory()
@@ -83,21 +109,43 @@ def _configure_dropdown(dropdown: Gtk.DropDown, max_width_chars: int = 36) -> No
 
     list_factory.connect("setup", _setup_list)
     list_factory.connect("bind", _bind_list)
+    list_factory.connect("unbind", _unbind_label)
     dropdown.set_list_factory(list_factory)
 
 
 class QuickSettingsWindow(Gtk.ApplicationWindow):
     """Main application window bound to PipeWire state."""
 
-    def __init__(self, app: Gtk.Application) -> None:
+    def __init__(
+        self,
+        app: Gtk.Application,
+        volume_writes_per_second: float = 20.0,
+        backend: Optional[Backend] = None,
+        started_ns: Optional[int] = None,
+        resident: bool = False,
+        min_refresh_interval: float = 0.1,
+        ramp_duration: float = DEFAULT_DURATION,
+    ) -> None:
         super().__init__(application=app, title="Pipewire Quick Settings")
+        # Origin of the startup timings; see :meth:`_mark_startup`.
+        self.started_ns = started_ns if started_ns is not None else time.perf_counter_ns()
+        self.timings: Dict[str, float] = {}
+        self._first_paint_handler: Optional[int] = None
         self.add_css_class("fixed-quick-settings")
         _ensure_fixed_width_css(self)
 
         self.set_default_size(400, 160)
         self.set_resizable(False)
+        # A resident window is hidden rather than destroyed, keeping its
+        # widgets, monitor and snapshot warm for the next activation.
+        self.resident = resident
+        self.set_hide_on_close(resident)
+
+        self.backend = backend or get_backend()
+        self.monitor: Optional[PipewireMonitor] = self.backend.monitor()
 
-        self.snapshot = PipewireSnapshot()
+        # The first snapshot is fetched in the background once the window is up.
+        self.snapshot = PipewireSnapshot(self.monitor, backend=self.backend, load=False)
         self.sink_ids: List[int] = []
         self.profile_items: List[ProfileItem] = []
         self.active_sink_id: Optional[int] = None
@@ -106,7 +154,28 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         self._ignore_volume_signal = False
         self._ignore_mute_signal = False
         self._ignore_profile_signal = False
-        self._refresh_source_id: Optional[int] = None
+        self._ignore_stream_signal = False
+        self._volume_dragging = False
+        self._stale = False
+        self.volume_writer = VolumeWriter(
+            max_writes_per_second=volume_writes_per_second,
+            run_commands=self.backend.run_commands,
+            on_written=self._on_volume_written,
+        )
+        # Slider changes and mute toggles fade through the writer instead of jumping.
+        self.ramp_duration = ramp_duration
+        self.volume_ramp = VolumeRamp(
+            self.volume_writer,
+            frame_rate=volume_writes_per_second,
+            mute=self.backend.set_mute,
+        )
+        # Refreshing while a volume write is pending would move the slider
+        # under the user's pointer; the scheduler holds refreshes until then.
+        self.refresh_scheduler = RefreshScheduler(
+            self._run_refresh,
+            min_interval=min_refresh_interval,
+            can_run=lambda: not self._volume_write_active(),
+        )
 
         root = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
         root.set_margin_top(12)
@@ -148,6 +217,11 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         self.volume_scale.set_draw_value(False)
         self.volume_scale.set_sensitive(False)
         self.volume_scale.connect("value-changed", self.on_volume_changed)
+        drag_gesture = Gtk.GestureDrag()
+        drag_gesture.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        drag_gesture.connect("drag-begin", self.on_volume_drag_begin)
+        drag_gesture.connect("drag-end", self.on_volume_drag_end)
+        self.volume_scale.add_controller(drag_gesture)
         slider_row.append(self.volume_scale)
 
         dropdown_row = Gtk.Grid(column_spacing=8)
@@ -155,7 +229,7 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         dropdown_row.set_hexpand(True)
         root.append(dropdown_row)
 
-        self.sink_model = Gtk.StringList.new([])  # type: ignore[arg-type]
+        self.sink_model = Gio.ListStore(item_type=SinkRow)
         self.sink_dropdown = Gtk.DropDown(model=self.sink_model)
         self.sink_dropdown.set_hexpand(True)
         self.sink_dropdown.set_halign(Gtk.Align.FILL)
@@ -163,7 +237,7 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         self.sink_dropdown.connect("notify::selected", self.on_sink_selected)
         dropdown_row.attach(self.sink_dropdown, 0, 0, 3, 1)
 
-        self.profile_model = Gtk.StringList.new([])  # type: ignore[arg-type]
+        self.profile_model = Gio.ListStore(item_type=ProfileRow)
         self.profile_dropdown = Gtk.DropDown(model=self.profile_model)
         self.profile_dropdown.set_hexpand(True)
         self.profile_dropdown.set_halign(Gtk.Align.FILL)
@@ -171,7 +245,95 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         self.profile_dropdown.connect("notify::selected", self.on_profile_selected)
         dropdown_row.attach(self.profile_dropdown, 4, 0, 2, 1)
 
-        self.populate_from_snapshot()
+        self.stream_section = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        self.stream_section.set_visible(False)
+        root.append(self.stream_section)
+
+        streams_title = Gtk.Label(label="Applications", xalign=0.0)
+        streams_title.get_style_context().add_class("heading")
+        self.stream_section.append(streams_title)
+
+        # A ListView only creates widgets for the visible rows and rebinds
+        # them while scrolling, so hundreds of streams stay cheap.
+        self.stream_model = Gio.ListStore(item_type=StreamRow)
+        stream_list = Gtk.ListView(model=Gtk.NoSelection(model=self.stream_model), factory=self._stream_factory())
+        stream_scroller = Gtk.ScrolledWindow()
+        stream_scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        stream_scroller.set_max_content_height(240)
+        stream_scroller.set_propagate_natural_height(True)
+        stream_scroller.set_child(stream_list)
+        self.stream_section.append(stream_scroller)
+
+        self._show_loading()
+        self.connect("realize", self._on_realize)
+        self.refresh_snapshot(None)
+
+        if self.monitor is not None:
+            self.monitor.add_listener(self._on_monitor_update)
+        self.connect("notify::visible", self._on_visible_changed)
+        self.connect("destroy", self._on_destroy)
+
+    def _show_loading(self) -> None:
+        """Leave every control insensitive until the first snapshot arrives."""
+        for widget in (self.sink_dropdown, self.profile_dropdown, self.volume_scale, self.mute_toggle):
+            widget.set_sensitive(False)
+            widget.set_tooltip_text("Loading PipeWire state…")
+
+    def _on_realize(self, _window: Gtk.Window) -> None:
+        clock = self.get_frame_clock()
+        if clock is not None:
+            self._first_paint_handler = clock.connect("after-paint", self._on_first_paint)
+
+    def _on_first_paint(self, clock: Gdk.FrameClock) -> None:
+        if self._first_paint_handler is not None:
+            clock.disconnect(self._first_paint_handler)
+            self._first_paint_handler = None
+        self._mark_startup("first frame")
+
+    def _mark_startup(self, name: str) -> None:
+        """Record the time from startup to ``name``; reported when tracing is on."""
+        if name in self.timings:
+            return
+        self.timings[name] = (time.perf_counter_ns() - self.started_ns) / 1e6
+        tracing.record(f"time to {name}", self.started_ns, "startup")
+        if tracing.enabled():
+            print(f"Time to {name}: {self.timings[name]:.1f} ms", file=sys.stderr)
+
+    def _on_monitor_update(self) -> None:
+        """Called on the monitor thread; hand the refresh over to the main loop."""
+        GLib.idle_add(self._refresh_from_monitor)
+
+    def _refresh_from_monitor(self) -> bool:
+        if not self.get_visible():
+            # Nobody is looking; catch up once in show_fresh instead.
+            self._stale = True
+            return GLib.SOURCE_REMOVE
+        self.refresh_snapshot(self.active_sink_id)
+        return GLib.SOURCE_REMOVE
+
+    def show_fresh(self) -> None:
+        """Present the window, refreshing if PipeWire changed while it was hidden."""
+        if self._stale or self.monitor is None:
+            self._stale = False
+            self.refresh_snapshot(self.active_sink_id)
+        self.present()
+
+    def _print_refresh_stats(self) -> None:
+        if tracing.enabled():
+            print(f"Refreshes: {self.refresh_scheduler.stats()}", file=sys.stderr)
+
+    def _on_visible_changed(self, _window: Gtk.Window, _param: Gio.ParamSpec) -> None:
+        # A resident window is only ever hidden, so report when it goes away.
+        if self.resident and not self.get_visible():
+            self._print_refresh_stats()
+
+    def _on_destroy(self, _window: Gtk.Window) -> None:
+        self.refresh_scheduler.cancel()
+        self._print_refresh_stats()
+        self.volume_ramp.close()
+        self.volume_writer.close()
+        if self.monitor is not None:
+            self.monitor.remove_listener(self._on_monitor_update)
 
     def on_more_clicked(self, _button: Gtk.Button) -> None:
         """Launch the full control app and close the quick settings window."""
@@ -181,20 +343,103 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
             print(f"Failed to launch pwvucontrol: {exc}")
 
         app = self.get_application()
-        if app is not None:
+        if self.resident:
+            self.set_visible(False)
+        elif app is not None:
             app.quit()
         else:
             self.close()
 
+    def _stream_factory(self) -> Gtk.SignalListItemFactory:
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_stream_row)
+        factory.connect("bind", self._bind_stream_row)
+        factory.connect("unbind", self._unbind_stream_row)
+        return factory
+
+    def _setup_stream_row(self, _factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        """Build the widgets of one recycled mixer row; signals are connected only here."""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+
+        label = Gtk.Label(xalign=0.0)
+        label.set_single_line_mode(True)
+        label.set_ellipsize(Pango.EllipsizeMode.END)
+        box.append(label)
+
+        controls = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        box.append(controls)
+
+        mute = Gtk.ToggleButton(label="M")
+        mute.connect("toggled", self.on_stream_mute_toggled, list_item)
+        controls.append(mute)
+
+        adjustment = Gtk.Adjustment(lower=0.0, upper=1.5, step_increment=0.01, page_increment=0.1, value=0.0)
+        scale = Gtk.Scale(orientation=Gtk.Orientation.HORIZONTAL, adjustment=adjustment)
+        scale.set_hexpand(True)
+        scale.set_draw_value(False)
+        scale.connect("value-changed", self.on_stream_volume_changed, list_item)
+        drag_gesture = Gtk.GestureDrag()
+        drag_gesture.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        drag_gesture.connect("drag-begin", self.on_volume_drag_begin)
+        drag_gesture.connect("drag-end", self.on_volume_drag_end)
+        scale.add_controller(drag_gesture)
+        controls.append(scale)
+
+        box._widgets = (label, mute, scale)  # type: ignore[attr-defined]
+        box._bindings = []  # type: ignore[attr-defined]
+        list_item.set_child(box)
+
+    def _bind_stream_row(self, _factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        row = cast(StreamRow, list_item.get_item())
+        box = list_item.get_child()
+        label, mute, scale = box._widgets  # type: ignore[union-attr]
+        flags = GObject.BindingFlags.SYNC_CREATE
+        self._ignore_stream_signal = True
+        box._bindings = [  # type: ignore[union-attr]
+            row.bind_property("label", label, "label", flags),
+            row.bind_property("detail", box, "tooltip-text", flags),
+            row.bind_property("volume", scale.get_adjustment(), "value", flags),
+            row.bind_property("adjustable", scale, "sensitive", flags),
+            row.bind_property("muted", mute, "active", flags),
+        ]
+        self._ignore_stream_signal = False
+
+    def _unbind_stream_row(self, _factory: Gtk.SignalListItemFactory, list_item: Gtk.ListItem) -> None:
+        box = list_item.get_child()
+        for binding in getattr(box, "_bindings", []):
+            binding.unbind()
+        box._bindings = []  # type: ignore[union-attr]
+
+    def on_stream_volume_changed(self, scale: Gtk.Scale, list_item: Gtk.ListItem) -> None:
+        if self._ignore_stream_signal:
+            return
+        row = list_item.get_item()
+        if row is None or not row.adjustable:
+            return
+        self.volume_writer.submit(row.item.id, scale.get_value())
+
+    def on_stream_mute_toggled(self, button: Gtk.ToggleButton, list_item: Gtk.ListItem) -> None:
+        if self._ignore_stream_signal:
+            return
+        row = list_item.get_item()
+        if row is None or bool(button.get_active()) == row.muted:
+            return
+        stream_id = row.item.id
+        self._write_then_refresh(
+            write_async(self.backend.set_mute, stream_id, bool(button.get_active())), self.active_sink_id, DETAILS
+        )
+
+    @traced(cat="gui")
     def populate_from_snapshot(self, preferred_sink_id: Optional[int] = None) -> None:
-        sink_labels = [sink.display_name for sink in self.snapshot.sinks]
-        self.sink_ids = [sink.id for sink in self.snapshot.sinks]
+        self._populate_streams()
 
-        sink_model = Gtk.StringList.new(sink_labels)  # type: ignore[arg-type]
-        self.sink_model = sink_model
+        self.sink_ids = [sink.id for sink in self.snapshot.sinks]
 
         self._ignore_sink_signal = True
-        self.sink_dropdown.set_model(sink_model)
+        sync_store(self.sink_model, self.snapshot.sinks, SinkRow)
+        self.sink_dropdown.set_sensitive(bool(self.sink_ids))
+        self.sink_dropdown.set_tooltip_text(None if self.sink_ids else "No sinks found")
+        self.profile_dropdown.set_tooltip_text(None)
 
         if not self.sink_ids:
             self.sink_dropdown.set_selected(Gtk.INVALID_LIST_POSITION)
@@ -209,11 +454,27 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         if selected_index is None:
             selected_index = 0
 
-        self.sink_dropdown.set_selected(selected_index)
+        if self.sink_dropdown.get_selected() != selected_index:
+            self.sink_dropdown.set_selected(selected_index)
         self._ignore_sink_signal = False
 
         self.update_details_for_sink(self.sink_ids[selected_index])
 
+    @traced(cat="gui")
+    def populate_details(self, streams: bool = True) -> None:
+        """Update the selected sink's controls, and the stream mixer unless ``streams`` is false."""
+        if streams:
+            self._populate_streams()
+        if self.active_sink_id is not None:
+            self.update_details_for_sink(self.active_sink_id)
+
+    def _populate_streams(self) -> None:
+        # Row updates reach the bound scales and toggles; they are not user input.
+        self._ignore_stream_signal = True
+        sync_store(self.stream_model, self.snapshot.streams, StreamRow)
+        self._ignore_stream_signal = False
+        self.stream_section.set_visible(bool(self.snapshot.streams))
+
     def _index_for_sink(self, sink_id: Optional[int]) -> Optional[int]:
         if sink_id is None:
             return None
@@ -235,9 +496,9 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
             return
 
         sink_id = self.sink_ids[index]
-        set_default_sink(sink_id)
-        self.refresh_snapshot(sink_id)
+        self._write_then_refresh(write_async(self.backend.set_default_sink, sink_id), sink_id)
 
+    @traced(cat="gui")
     def update_details_for_sink(self, sink_id: int) -> None:
         self.active_sink_id = sink_id
         sink = self.snapshot.sink_by_id.get(sink_id)
@@ -274,12 +535,9 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
 
         profiles, active_index = self.snapshot.get_profiles(sink_id)
         self.profile_items = profiles
-        profile_labels = [profile.display_name for profile in profiles]
-        profile_model = Gtk.StringList.new(profile_labels)  # type: ignore[arg-type]
-        self.profile_model = profile_model
 
         self._ignore_profile_signal = True
-        self.profile_dropdown.set_model(profile_model)
+        sync_store(self.profile_model, profiles, ProfileRow)
 
         if not profiles:
             self.profile_dropdown.set_selected(Gtk.INVALID_LIST_POSITION)
@@ -291,7 +549,8 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         if selected_profile is None:
             selected_profile = 0
 
-        self.profile_dropdown.set_selected(selected_profile)
+        if self.profile_dropdown.get_selected() != selected_profile:
+            self.profile_dropdown.set_selected(selected_profile)
         self.profile_dropdown.set_sensitive(True)
         self._ignore_profile_signal = False
 
@@ -302,8 +561,35 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
             return
 
         value = scale.get_value()
-        set_volume(self.active_sink_id, f"{value:.4f}")
-        self.refresh_snapshot(self.active_sink_id)
+        self.volume_scale.set_tooltip_text(f"Volume: {int(value * 100)}%")
+        sink_id = self.active_sink_id
+        start = self.volume_ramp.current(sink_id)
+        if start is None:
+            sink = self.snapshot.sink_by_id.get(sink_id)
+            start = sink.volume if sink is not None and sink.volume is not None else value
+        # A new value retargets a running ramp from wherever it has reached.
+        self.volume_ramp.ramp(sink_id, start, value, self.ramp_duration)
+
+    def on_volume_drag_begin(self, _gesture: Gtk.GestureDrag, *_args: object) -> None:
+        self._volume_dragging = True
+
+    def on_volume_drag_end(self, _gesture: Gtk.GestureDrag, *_args: object) -> None:
+        if not self._volume_dragging:
+            return
+        self._volume_dragging = False
+        self.refresh_scheduler.resume()
+
+    def _on_volume_written(self, _sink_id: int, _volume: float) -> None:
+        """Called on the writer thread after each ``wpctl`` write."""
+        GLib.idle_add(self._after_volume_written)
+
+    def _after_volume_written(self) -> bool:
+        self.refresh_snapshot(self.active_sink_id, DETAILS)
+        self.refresh_scheduler.resume()
+        return GLib.SOURCE_REMOVE
+
+    def _volume_write_active(self) -> bool:
+        return self._volume_dragging or self.volume_ramp.busy() or self.volume_writer.busy()
 
     def on_mute_toggled(self, button: Gtk.ToggleButton) -> None:
         if self._ignore_mute_signal or self.active_sink_id is None:
@@ -311,8 +597,19 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         if not self.mute_toggle.get_sensitive():
             return
 
-        set_mute(self.active_sink_id, bool(button.get_active()))
-        self.refresh_snapshot(self.active_sink_id)
+        sink_id = self.active_sink_id
+        mute = bool(button.get_active())
+        sink = self.snapshot.sink_by_id.get(sink_id)
+        if sink is None or sink.volume is None or self.ramp_duration <= 0:
+            self._write_then_refresh(write_async(self.backend.set_mute, sink_id, mute), sink_id, DETAILS)
+            return
+        self.volume_ramp.fade_mute(
+            sink_id,
+            mute,
+            sink.volume,
+            self.ramp_duration,
+            on_done=lambda: GLib.idle_add(self._after_volume_written),
+        )
 
     def on_profile_selected(self, dropdown: Gtk.DropDown, _param: Gio.ParamSpec) -> None:
         if self._ignore_profile_signal or self.active_sink_id is None:
@@ -329,8 +626,24 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
             return
 
         profile = self.profile_items[index]
-        set_profile(sink.device_id, profile.index)
-        self.refresh_snapshot(self.active_sink_id)
+        sink_id = self.active_sink_id
+        self._write_then_refresh(write_async(self.backend.set_profile, sink.device_id, profile.index), sink_id)
+
+    def _write_then_refresh(
+        self,
+        future: "Future[None]",
+        preferred_sink_id: Optional[int],
+        kind: str = FULL,
+    ) -> None:
+        """Refresh once a background ``wpctl`` write has finished."""
+
+        def _done(done: "Future[None]") -> None:
+            exc = done.exception()
+            if exc is not None:
+                print(f"PipeWire write failed: {exc}")
+            self.refresh_snapshot(preferred_sink_id, kind)
+
+        call_on_main_loop(future, _done)
 
     def _index_for_profile(self, profile_index: Optional[int]) -> Optional[int]:
         if profile_index is None:
@@ -356,27 +669,42 @@ class QuickSettingsWindow(Gtk.ApplicationWindow):
         self.mute_toggle.set_tooltip_text("Mute state unavailable")
 
         self.profile_items = []
-        empty_model = Gtk.StringList.new([])  # type: ignore[arg-type]
-        self.profile_model = empty_model
 
         self._ignore_profile_signal = True
-        self.profile_dropdown.set_model(empty_model)
+        self.profile_model.remove_all()
         self.profile_dropdown.set_selected(Gtk.INVALID_LIST_POSITION)
         self._ignore_profile_signal = False
         self.profile_dropdown.set_sensitive(False)
 
-    def refresh_snapshot(self, preferred_sink_id: Optional[int]) -> None:
-        if self._refresh_source_id is not None:
-            GLib.source_remove(self._refresh_source_id)
+    def refresh_snapshot(self, preferred_sink_id: Optional[int], kind: str = FULL) -> None:
+        """Queue a refresh; requests are merged and rate limited by :attr:`refresh_scheduler`."""
+        self.refresh_scheduler.request(kind, preferred_sink_id)
 
-        def _do_refresh() -> bool:
+    def _run_refresh(self, kind: str, preferred_sink_id: Optional[int], done: Callable[[], None]) -> None:
+        """Fetch the graph off the main loop, then update the widgets ``kind`` covers."""
+
+        def _fetched(future: "Future[Any]") -> None:
             try:
-                self.snapshot.refresh()
-                self.populate_from_snapshot(preferred_sink_id)
+                if self._volume_write_active():
+                    # A write started while fetching; retry once it is done.
+                    self.refresh_scheduler.request(kind, preferred_sink_id)
+                    return
+                changes = self.snapshot.apply(future.result())
+                # Whatever was asked for, a changed sink list must reach the
+                # dropdown and sink_ids; otherwise the details are enough.
+                details_only = not any(isinstance(change, SINK_LIST_CHANGES) for change in changes) and (
+                    kind == DETAILS or preferred_sink_id in (None, self.active_sink_id)
+                )
+                if details_only and self.snapshot.loaded and self.sink_ids:
+                    self.populate_details(streams=any(isinstance(change, STREAM_CHANGES) for change in changes))
+                else:
+                    self.populate_from_snapshot(preferred_sink_id)
+                self._mark_startup("interactive")
             except Exception as exc:  # pragma: no cover - surface unexpected issues
                 print(f"Failed to refresh PipeWire snapshot: {exc}")
+                if not self.snapshot.loaded:
+                    self.sink_dropdown.set_tooltip_text("PipeWire state unavailable")
             finally:
-                self._refresh_source_id = None
-            return GLib.SOURCE_REMOVE
+                done()
 
-        self._refresh_source_id = GLib.idle_add(_do_refresh)
+        call_on_main_loop(run_async(self.snapshot.fetch), _fetched)
@@ -3,19 +3,52 @@
 from __future__ import annotations
 
 import argparse
+import os
+import sys
 from typing import Sequence
 
-from cli import cli_loop
-from gui import run_gui
-
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="PipeWire quick settings")
     parser.add_argument(
         "--mode",
-        choices=("cli", "gui"),
+        choices=("cli", "tui", "gui", "daemon", "waybar"),
         default="cli",
-        help="Start in CLI or GUI mode",
+        help="Start in CLI, full-screen terminal or GUI mode, as a resident daemon serving the CLI, or as a waybar status module",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket of the daemon (default: $XDG_RUNTIME_DIR/pipewire-quick-settings.sock)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("cli", "native", "replay"),
+        help="How to talk to PipeWire: pw-dump/wpctl (default), the native protocol, or a recording",
+    )
+    parser.add_argument(
+        "--remote",
+        action="append",
+        metavar="NAME",
+        help="PipeWire instance to control instead of the default one (a socket name or path, like PIPEWIRE_REMOTE); "
+        "repeat it in TUI mode to control several at once",
+    )
+    parser.add_argument(
+        "--resident",
+        action="store_true",
+        help="GUI mode: keep running hidden when the window closes; later --resident launches toggle the window",
+    )
+    parser.add_argument(
+        "--stream-dump",
+        action="store_true",
+        help="Decode pw-dump output as it is read: slower, but about half the peak memory on large graphs",
+    )
+    parser.add_argument("--trace", metavar="FILE", help="Write timing spans to FILE in Chrome trace format")
+    parser.add_argument("--record", metavar="FILE", help="Append every dump and write command to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="Serve state from a recording instead of PipeWire")
+    parser.add_argument(
+        "--replay-latency",
+        choices=("real", "zero"),
+        help="Sleep for the recorded duration of each call (default) or answer immediately",
     )
     return parser
 
@@ -23,11 +56,52 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: Sequence[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
+    # Settings travel through the environment so the lazily created daemon
+    # socket, backend and tracer pick them up. They must all be set before
+    # any project module is imported: the tracer starts at import time.
+    for value, name in (
+        (args.socket, "PWQS_SOCKET"),
+        (args.backend, "PWQS_BACKEND"),
+        (args.record, "PWQS_RECORD"),
+        (args.replay, "PWQS_REPLAY"),
+        (args.replay_latency, "PWQS_REPLAY_LATENCY"),
+        (args.trace, "PWQS_TRACE"),
+        ("1" if args.stream_dump else None, "PWQS_STREAM_DUMP"),
+        (",".join(args.remote or ()), "PWQS_REMOTES"),
+    ):
+        if value:
+            os.environ[name] = value
 
+    # Only the TUI lists several instances; the other modes would silently
+    # use the first. A recording holds the calls of one PipeWire instance,
+    # so it cannot capture or serve several remotes either.
+    remotes = [name for name in os.environ.get("PWQS_REMOTES", "").split(",") if name]
+    if len(remotes) > 1 and args.mode != "tui":
+        parser.error(f"--mode {args.mode} works with a single --remote (PWQS_REMOTES); only --mode tui takes several")
+    if len(remotes) > 1 and (os.environ.get("PWQS_RECORD") or os.environ.get("PWQS_REPLAY")):
+        parser.error("--record and --replay (PWQS_RECORD, PWQS_REPLAY) work with a single --remote")
+
+    # Import only what the chosen mode needs; the GUI pulls in Gtk.
     if args.mode == "cli":
+        from cli import cli_loop
+
         cli_loop()
+    elif args.mode == "tui":
+        import tui
+
+        sys.exit(tui.run())
+    elif args.mode == "daemon":
+        import pwqs_daemon
+
+        pwqs_daemon.serve()
+    elif args.mode == "waybar":
+        import waybar
+
+        sys.exit(waybar.run())
     else:
-        run_gui()
+        from gui import run_gui
+
+        run_gui(resident=args.resident)
 
 
 if __name__ == "__main__":
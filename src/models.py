@@ -0,0 +1,91 @@
+"""Compact records for the sinks and profiles shown by the front ends."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class SinkItem:
+    """Representation of a PipeWire sink for display."""
+
+    id: int
+    description: str
+    device_id: Optional[int]
+    volume: Optional[float]
+    volume_linear: Optional[float]
+    mute: Optional[bool]
+    name: Optional[str] = None
+    # The PipeWire instance the object lives on; ``None`` is the default one.
+    remote: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return self.description or self.name or f"Sink {self.id}"
+
+
+@dataclass(slots=True)
+class ProfileItem:
+    """Representation of a PipeWire profile for display."""
+
+    index: int
+    name: Optional[str]
+    description: Optional[str]
+    available: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return self.description or self.name or f"Profile {self.index}"
+
+
+@dataclass(slots=True)
+class SourceItem:
+    """Representation of a PipeWire source (microphone or monitor) for display."""
+
+    id: int
+    description: str
+    device_id: Optional[int]
+    volume: Optional[float]
+    volume_linear: Optional[float]
+    mute: Optional[bool]
+    name: Optional[str] = None
+    # The PipeWire instance the object lives on; ``None`` is the default one.
+    remote: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return self.description or self.name or f"Source {self.id}"
+
+
+@dataclass(slots=True)
+class StreamItem:
+    """Representation of an application playback stream for display."""
+
+    id: int
+    application: Optional[str]
+    description: Optional[str]
+    volume: Optional[float]
+    volume_linear: Optional[float]
+    mute: Optional[bool]
+    name: Optional[str] = None
+    # The PipeWire instance the object lives on; ``None`` is the default one.
+    remote: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return self.application or self.name or f"Stream {self.id}"
+
+
+@dataclass(slots=True)
+class DeviceItem:
+    """Representation of a PipeWire audio device (card) for display."""
+
+    id: int
+    description: str
+    profile_index: Optional[int]
+    profile: Optional[str]
+    name: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return self.description or self.name or f"Device {self.id}"
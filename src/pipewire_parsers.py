@@ -1,7 +1,86 @@
 """Utilities for extracting information from PipeWire dumps."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import itertools
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Tuple, Union
+
+from models import DeviceItem, ProfileItem, SinkItem, SourceItem, StreamItem
+from tracing import traced
+
+
+NODE_TYPE = "PipeWire:Interface:Node"
+DEVICE_TYPE = "PipeWire:Interface:Device"
+METADATA_TYPE = "PipeWire:Interface:Metadata"
+
+# The object types and ``info.params`` entries the parsers below read; pass
+# them to ``pw_client.pw_dump`` to skip everything else while decoding.
+PARSED_TYPES = frozenset({NODE_TYPE, DEVICE_TYPE, METADATA_TYPE})
+PARSED_PARAMS = frozenset({"Props", "EnumProfile", "Profile"})
+
+
+class DumpIndex:
+    """Lookup tables over a ``pw-dump`` object list, built in a single pass."""
+
+    @traced("DumpIndex", "parse")
+    def __init__(self, dump: List[Dict[str, Any]]) -> None:
+        self.objects = dump
+        self.by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.nodes_by_name: Dict[str, Dict[str, Any]] = {}
+        self.nodes_by_device: Dict[Any, List[Dict[str, Any]]] = {}
+        self.default_metadata: Dict[str, Any] = {}
+
+        for obj in dump:
+            obj_type = obj.get("type")
+            self.by_type.setdefault(obj_type, []).append(obj)
+            obj_id = obj.get("id")
+            if obj_id is not None:
+                self.by_id[obj_id] = obj
+
+            if obj_type == NODE_TYPE:
+                props = obj.get("info", {}).get("props", {})
+                name = props.get("node.name")
+                if name is not None:
+                    self.nodes_by_name.setdefault(name, obj)
+                device_id = props.get("device.id")
+                if device_id is not None:
+                    self.nodes_by_device.setdefault(device_id, []).append(obj)
+            elif obj_type == METADATA_TYPE:
+                if obj.get("props", {}).get("metadata.name") != "default":
+                    continue
+                for item in obj.get("metadata", []):
+                    key = item.get("key")
+                    if key is not None:
+                        self.default_metadata.setdefault(key, item.get("value"))
+
+    def of_type(self, obj_type: str) -> List[Dict[str, Any]]:
+        return self.by_type.get(obj_type, [])
+
+    def get(self, obj_id: Any, obj_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        obj = self.by_id.get(obj_id)
+        if obj is None or (obj_type is not None and obj.get("type") != obj_type):
+            return None
+        return obj
+
+    def node_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.nodes_by_name.get(name)
+
+    def default_name(self, key: str) -> Optional[str]:
+        """Return the node name stored under ``key`` in the ``default`` metadata."""
+        value = self.default_metadata.get(key)
+        if isinstance(value, dict):
+            return value.get("name")
+        return value
+
+
+Dump = Union[List[Dict[str, Any]], DumpIndex]
+
+
+def index_dump(dump: Dump) -> DumpIndex:
+    """Return ``dump`` as a :class:`DumpIndex`, building one if needed."""
+    if isinstance(dump, DumpIndex):
+        return dump
+    return DumpIndex(dump)
 
 
 def _coerce_float(value: Any) -> Optional[float]:
@@ -16,120 +95,373 @@ def _coerce_float(value: Any) -> Optional[float]:
     return None
 
 
-def _get_default_sink_name(dump: List[Dict[str, Any]]) -> Optional[str]:
+def _coerce_int(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_default_sink_name(dump: Dump) -> Optional[str]:
     """Return the default audio sink name from PipeWire metadata."""
-    for obj in dump:
-        if obj.get("type") != "PipeWire:Interface:Metadata":
-            continue
-        if obj.get("props", {}).get("metadata.name") != "default":
-            continue
-        for item in obj.get("metadata", []):
-            if item.get("key") == "default.audio.sink":
-                value = item.get("value")
-                if isinstance(value, dict):
-                    return value.get("name")
-                return value
-    return None
+    return index_dump(dump).default_name("default.audio.sink")
 
 
-def parse_sinks(dump: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Extract sinks (Audio/Sink nodes) from the given ``pw-dump`` output."""
-    sinks: List[Dict[str, Any]] = []
-    for obj in dump:
-        if obj.get("type") != "PipeWire:Interface:Node":
-            continue
-        props = obj.get("info", {}).get("props", {})
-        if not props.get("media.class", "").startswith("Audio/Sink"):
-            continue
-        params = obj.get("info", {}).get("params", {})
-        props_params = params.get("Props", [])
-        volume_info: Optional[Dict[str, Any]] = None
-        for item in props_params:
-            if isinstance(item, dict) and "volume" in item:
-                volume_info = item
+def _is_sink(obj: Dict[str, Any]) -> bool:
+    props = obj.get("info", {}).get("props", {})
+    return props.get("media.class", "").startswith("Audio/Sink")
+
+
+def _sink_volume(obj: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], Optional[bool]]:
+    """Return the cube-root volume, linear volume and mute state of a sink node."""
+    params = obj.get("info", {}).get("params", {})
+    props_params = params.get("Props", [])
+    volume_info: Optional[Dict[str, Any]] = None
+    for item in props_params:
+        if isinstance(item, dict) and "volume" in item:
+            volume_info = item
+            break
+
+    linear_volume: Optional[float] = None
+    mute_value: Optional[bool] = None
+    if volume_info is not None:
+        channel_volumes = volume_info.get("channelVolumes")
+        if isinstance(channel_volumes, list):
+            numeric_channels = [
+                coerced
+                for value in channel_volumes
+                for coerced in (_coerce_float(value),)
+                if coerced is not None
+            ]
+            if numeric_channels:
+                linear_volume = sum(numeric_channels) / len(numeric_channels)
+        if linear_volume is None:
+            volume_value = _coerce_float(volume_info.get("volume"))
+            if volume_value is not None:
+                linear_volume = volume_value
+
+        mute_raw = volume_info.get("mute")
+        if isinstance(mute_raw, bool):
+            mute_value = mute_raw
+        elif isinstance(mute_raw, str):
+            mute_value = mute_raw.lower() in {"1", "true", "yes", "on"}
+        else:
+            coerced = _coerce_float(mute_raw)
+            if coerced is not None:
+                mute_value = coerced != 0.0
+
+    user_volume: Optional[float] = None
+    if linear_volume is not None and linear_volume >= 0:
+        user_volume = 0.0 if linear_volume == 0 else linear_volume ** (1 / 3)
+    return user_volume, linear_volume, mute_value
+
+
+class ObjectView:
+    """A dump object with the parts selectors read, each looked up at most once."""
+
+    __slots__ = ("obj", "info", "props", "_volume")
+
+    def __init__(self, obj: Dict[str, Any]) -> None:
+        self.obj = obj
+        self.info: Dict[str, Any] = obj.get("info") or {}
+        self.props: Dict[str, Any] = self.info.get("props") or {}
+        self._volume: Optional[Tuple[Optional[float], Optional[float], Optional[bool]]] = None
+
+    @property
+    def media_class(self) -> str:
+        return self.props.get("media.class") or ""
+
+    @property
+    def volume(self) -> Tuple[Optional[float], Optional[float], Optional[bool]]:
+        """``(volume, volume_linear, mute)`` decoded from the ``Props`` param."""
+        if self._volume is None:
+            self._volume = _sink_volume(self.obj)
+        return self._volume
+
+
+Getter = Callable[[ObjectView], Any]
+
+
+def field(key: str, default: Any = None) -> Getter:
+    """Read a top-level key of the object, such as ``id``."""
+    return lambda view: view.obj.get(key, default)
+
+
+def info(key: str, default: Any = None) -> Getter:
+    """Read a key of ``info``, such as ``state``."""
+    return lambda view: view.info.get(key, default)
+
+
+def prop(*keys: str) -> Getter:
+    """Read the first non-empty of ``keys`` from ``info.props``."""
+
+    def get(view: ObjectView) -> Any:
+        value = None
+        for key in keys:
+            value = view.props.get(key)
+            if value:
                 break
+        return value
+
+    return get
+
+
+def as_int(getter: Getter) -> Getter:
+    """Coerce what ``getter`` returns to an ``int``, or ``None``."""
+    return lambda view: _coerce_int(getter(view))
+
+
+def volume(view: ObjectView) -> Optional[float]:
+    return view.volume[0]
+
+
+def volume_linear(view: ObjectView) -> Optional[float]:
+    return view.volume[1]
 
-        linear_volume: Optional[float] = None
-        mute_value: Optional[bool] = None
-        if volume_info is not None:
-            channel_volumes = volume_info.get("channelVolumes")
-            if isinstance(channel_volumes, list):
-                numeric_channels = [
-                    coerced
-                    for value in channel_volumes
-                    for coerced in (_coerce_float(value),)
-                    if coerced is not None
-                ]
-                if numeric_channels:
-                    linear_volume = sum(numeric_channels) / len(numeric_channels)
-            if linear_volume is None:
-                volume_value = _coerce_float(volume_info.get("volume"))
-                if volume_value is not None:
-                    linear_volume = volume_value
-
-            mute_raw = volume_info.get("mute")
-            if isinstance(mute_raw, bool):
-                mute_value = mute_raw
-            elif isinstance(mute_raw, str):
-                mute_value = mute_raw.lower() in {"1", "true", "yes", "on"}
-            else:
-                coerced = _coerce_float(mute_raw)
-                if coerced is not None:
-                    mute_value = coerced != 0.0
-
-        user_volume: Optional[float] = None
-        if linear_volume is not None and linear_volume >= 0:
-            user_volume = 0.0 if linear_volume == 0 else linear_volume ** (1 / 3)
-
-        sinks.append(
+
+def mute(view: ObjectView) -> Optional[bool]:
+    return view.volume[2]
+
+
+def _active_profile(view: ObjectView) -> Dict[str, Any]:
+    profiles = view.info.get("params", {}).get("Profile") or []
+    profile = profiles[0] if profiles else None
+    return profile if isinstance(profile, dict) else {}
+
+
+def _active_profile_index(view: ObjectView) -> Optional[int]:
+    return _coerce_int(_active_profile(view).get("index"))
+
+
+def _active_profile_description(view: ObjectView) -> Optional[str]:
+    profile = _active_profile(view)
+    return profile.get("description") or profile.get("name")
+
+
+def _described(getter: Getter, fallback: str) -> Getter:
+    """Stringify ``getter``'s value, falling back to ``"<fallback> <id>"``."""
+    return lambda view: str(getter(view) or f"{fallback} {view.obj.get('id')}")
+
+
+class Selector:
+    """Builds one kind of record from the dump objects it matches.
+
+    An object matches when its ``type`` is ``obj_type`` and, if
+    ``media_class`` is set, its ``media.class`` starts with it. Each getter
+    in ``fields`` fills the field of the same name; the values are passed to
+    ``factory`` as keyword arguments, or returned as a dict without one.
+    Objects for which a ``required`` field is ``None`` are skipped.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        obj_type: str,
+        fields: Dict[str, Getter],
+        media_class: Optional[str] = None,
+        factory: Optional[Callable[..., Any]] = None,
+        required: Collection[str] = (),
+    ) -> None:
+        self.kind = kind
+        self.obj_type = obj_type
+        self.fields = fields
+        self.media_class = media_class
+        self.factory = factory
+        self.required = tuple(required)
+
+    def matches(self, view: ObjectView) -> bool:
+        return self.media_class is None or view.media_class.startswith(self.media_class)
+
+    def build(self, view: ObjectView) -> Optional[Any]:
+        values = {name: getter(view) for name, getter in self.fields.items()}
+        for name in self.required:
+            if values[name] is None:
+                return None
+        return values if self.factory is None else self.factory(**values)
+
+
+class Extractor:
+    """A registry of selectors, all served by one pass over a dump."""
+
+    def __init__(self, selectors: Iterable[Selector] = ()) -> None:
+        self.selectors: Dict[str, Selector] = {}
+        for selector in selectors:
+            self.register(selector)
+
+    def register(self, selector: Selector) -> Selector:
+        if selector.kind in self.selectors:
+            raise ValueError(f"Entity kind '{selector.kind}' is already registered")
+        self.selectors[selector.kind] = selector
+        return selector
+
+    @traced(cat="parse")
+    def extract(self, dump: Dump, kinds: Optional[Collection[str]] = None) -> Dict[str, List[Any]]:
+        """Return the records of every registered kind (or only ``kinds``), keyed by kind."""
+        by_type: Dict[str, List[Selector]] = {}
+        results: Dict[str, List[Any]] = {}
+        for kind, selector in self.selectors.items():
+            if kinds is None or kind in kinds:
+                by_type.setdefault(selector.obj_type, []).append(selector)
+                results[kind] = []
+
+        objects: Iterable[Dict[str, Any]]
+        if isinstance(dump, DumpIndex):
+            objects = itertools.chain.from_iterable(dump.of_type(obj_type) for obj_type in by_type)
+        else:
+            objects = dump
+        for obj in objects:
+            selectors = by_type.get(obj.get("type"))
+            if not selectors:
+                continue
+            view = ObjectView(obj)
+            for selector in selectors:
+                if selector.matches(view):
+                    record = selector.build(view)
+                    if record is not None:
+                        results[selector.kind].append(record)
+        return results
+
+
+def _node_fields(fallback: str) -> Dict[str, Getter]:
+    return {
+        "id": as_int(field("id")),
+        "description": _described(prop("node.description", "node.name"), fallback),
+        "device_id": as_int(prop("device.id")),
+        "volume": volume,
+        "volume_linear": volume_linear,
+        "mute": mute,
+        "name": prop("node.name"),
+    }
+
+
+# The sink dictionaries of :func:`parse_sinks`, as shown by the CLI and daemon.
+_SINK_DICT = Selector(
+    "sinks",
+    NODE_TYPE,
+    {
+        "id": field("id"),
+        "name": prop("node.name"),
+        "description": prop("node.description", "node.name"),
+        "state": info("state", "unknown"),
+        "device.id": prop("device.id"),
+        "volume": volume,
+        "volume_linear": volume_linear,
+        "mute": mute,
+    },
+    media_class="Audio/Sink",
+)
+
+# Entity kinds available from :func:`extract`.
+EXTRACTOR = Extractor(
+    [
+        Selector("sinks", NODE_TYPE, _node_fields("Sink"), "Audio/Sink", SinkItem, ("id",)),
+        Selector("sources", NODE_TYPE, _node_fields("Source"), "Audio/Source", SourceItem, ("id",)),
+        Selector(
+            "streams",
+            NODE_TYPE,
             {
-                "id": obj["id"],
-                "name": props.get("node.name"),
-                "description": props.get("node.description") or props.get("node.name"),
-                "state": obj.get("info", {}).get("state", "unknown"),
-                "device.id": props.get("device.id"),
-                "volume": user_volume,
-                "volume_linear": linear_volume,
-                "mute": mute_value,
-            }
-        )
-    return sinks
+                "id": as_int(field("id")),
+                "application": prop("application.name", "application.process.binary", "node.name"),
+                "description": prop("media.name", "node.description"),
+                "volume": volume,
+                "volume_linear": volume_linear,
+                "mute": mute,
+                "name": prop("node.name"),
+            },
+            "Stream/Output/Audio",
+            StreamItem,
+            ("id",),
+        ),
+        Selector(
+            "devices",
+            DEVICE_TYPE,
+            {
+                "id": as_int(field("id")),
+                "description": _described(prop("device.description", "device.nick", "device.name"), "Device"),
+                "profile_index": _active_profile_index,
+                "profile": _active_profile_description,
+                "name": prop("device.name"),
+            },
+            "Audio/Device",
+            DeviceItem,
+            required=("id",),
+        ),
+    ]
+)
 
 
-def get_current_sink(dump: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-    """Return the currently configured default sink, if it can be identified."""
-    default_name = _get_default_sink_name(dump)
+def extract(dump: Dump, kinds: Optional[Collection[str]] = None) -> Dict[str, List[Any]]:
+    """Extract the records of the :data:`EXTRACTOR` kinds in one pass over ``dump``."""
+    return EXTRACTOR.extract(dump, kinds)
+
+
+def _parse_sink(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a single Audio/Sink node into the sink dictionary."""
+    return _SINK_DICT.build(ObjectView(obj))
+
+
+@traced(cat="parse")
+def parse_sinks(dump: Dump) -> List[Dict[str, Any]]:
+    """Extract sinks (Audio/Sink nodes) from the given ``pw-dump`` output."""
+    return [_parse_sink(obj) for obj in index_dump(dump).of_type(NODE_TYPE) if _is_sink(obj)]
+
+
+@traced(cat="parse")
+def parse_sink_items(dump: Dump) -> List[SinkItem]:
+    """Like :func:`parse_sinks`, but build :class:`SinkItem` records directly."""
+    return EXTRACTOR.extract(dump, ("sinks",))["sinks"]
+
+
+def _default_sink_node(index: DumpIndex) -> Optional[Dict[str, Any]]:
+    default_name = _get_default_sink_name(index)
     if default_name is None:
         return None
-    for sink in parse_sinks(dump):
-        if sink.get("name") == default_name:
-            return sink
-    return None
+    node = index.node_by_name(default_name)
+    if node is None or node.get("type") != NODE_TYPE or not _is_sink(node):
+        return None
+    return node
 
 
-def parse_card(dump: List[Dict[str, Any]], card_id: int) -> Optional[Dict[str, Any]]:
+@traced(cat="parse")
+def get_current_sink_id(dump: Dump) -> Optional[int]:
+    """Return the id of the default sink without converting the node."""
+    node = _default_sink_node(index_dump(dump))
+    return None if node is None else _coerce_int(node.get("id"))
+
+
+@traced(cat="parse")
+def get_current_sink(dump: Dump) -> Optional[Dict[str, Any]]:
+    """Return the currently configured default sink, if it can be identified."""
+    node = _default_sink_node(index_dump(dump))
+    return None if node is None else _parse_sink(node)
+
+
+@traced(cat="parse")
+def parse_card(dump: Dump, card_id: int) -> Optional[Dict[str, Any]]:
     """Return the card (device) identified by ``card_id`` from the dump, if present."""
-    for obj in dump:
-        if obj.get("id") != card_id or obj.get("type") != "PipeWire:Interface:Device":
-            continue
-        props = obj.get("info", {}).get("props", {})
-        params = obj.get("info", {}).get("params", {})
-        active_profile = None
-        active_profile_index = None
-        if params.get("Profile"):
-            profile = params["Profile"][0]
-            active_profile_index = profile.get("index")
-            active_profile = profile.get("description") or profile.get("name")
-        return {
-            "id": obj["id"],
-            "description": props.get("device.description") or props.get("device.nick"),
-            "profile": active_profile or "unknown",
-            "profile_index": active_profile_index,
-            "params": params,
-        }
-    return None
+    obj = index_dump(dump).get(card_id, DEVICE_TYPE)
+    if obj is None:
+        return None
+    props = obj.get("info", {}).get("props", {})
+    params = obj.get("info", {}).get("params", {})
+    active_profile = None
+    active_profile_index = None
+    if params.get("Profile"):
+        profile = params["Profile"][0]
+        active_profile_index = profile.get("index")
+        active_profile = profile.get("description") or profile.get("name")
+    return {
+        "id": obj["id"],
+        "description": props.get("device.description") or props.get("device.nick"),
+        "profile": active_profile or "unknown",
+        "profile_index": active_profile_index,
+        "params": params,
+    }
 
 
+@traced(cat="parse")
 def parse_profiles(card: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Extract profiles information from a card dictionary."""
     profiles: List[Dict[str, Any]] = []
@@ -145,6 +477,28 @@ def parse_profiles(card: Dict[str, Any]) -> List[Dict[str, Any]]:
     return profiles
 
 
+@traced(cat="parse")
+def parse_profile_items(enum_profile: List[Any]) -> List[ProfileItem]:
+    """Build :class:`ProfileItem` records from a device's ``EnumProfile`` param."""
+    items: List[ProfileItem] = []
+    for profile in enum_profile:
+        if not isinstance(profile, dict):
+            continue
+        index = _coerce_int(profile.get("index"))
+        if index is None:
+            continue
+        items.append(
+            ProfileItem(
+                index=index,
+                name=profile.get("name"),
+                description=profile.get("description"),
+                available=profile.get("available"),
+            )
+        )
+    return items
+
+
+@traced(cat="parse")
 def get_current_profile(card: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Return the active profile entry for the provided card, if available."""
     active_index = card.get("profile_index")
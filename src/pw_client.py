@@ -2,39 +2,389 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
-from typing import Any, Dict, List
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple, TypeVar
+
+from dump_decoder import iter_objects, prune_params
+from pipewire_parsers import PARSED_PARAMS, PARSED_TYPES
+from tracing import span
 
 
 PW_DUMP_CMD = ["pw-dump"]
 WPCTL_CMD = "wpctl"
+# ``wpctl`` has no option to pick the PipeWire instance; it honours this variable.
+REMOTE_ENV = "PIPEWIRE_REMOTE"
+# When set, filtered dumps are decoded as they are read (see :func:`pw_dump`).
+STREAM_DUMP_ENV = "PWQS_STREAM_DUMP"
+
+T = TypeVar("T")
+
+# Writes share a single worker so they reach WirePlumber in submission order;
+# reads may overlap with them and with each other. Both pools are created on
+# first use, so one-shot CLI runs never start their threads.
+_WRITE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_READ_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def pw_dump_command(remote: Optional[str] = None) -> List[str]:
+    """The ``pw-dump`` command line for ``remote``, or for the default instance."""
+    return [*PW_DUMP_CMD, "--remote", remote] if remote else list(PW_DUMP_CMD)
+
+
+def pw_dump(
+    types: Optional[Collection[str]] = None,
+    params: Optional[Collection[str]] = None,
+    remote: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return the JSON structure produced by ``pw-dump``.
+
+    With ``types`` only objects of those types are kept, and with ``params``
+    only those ``info.params`` entries. ``remote`` names the PipeWire
+    instance (a socket name or path) to read instead of the default one.
+
+    The output is loaded whole with :func:`json.loads` and filtered after.
+    With ``PWQS_STREAM_DUMP`` set, filtered dumps are instead decoded as they
+    are read by :func:`dump_decoder.iter_objects`, which is slower but holds
+    about half as much memory at its peak.
+    """
+    command = pw_dump_command(remote)
+    if (types is None and params is None) or not os.environ.get(STREAM_DUMP_ENV):
+        with span("pw-dump", "pw_client", remote=remote):
+            process = subprocess.run(command, capture_output=True, text=True, check=True)
+        with span("json.loads", "parse", chars=len(process.stdout)):
+            dump = json.loads(process.stdout)
+        if types is not None:
+            dump = [obj for obj in dump if obj.get("type") in types]
+        return [prune_params(obj, params) for obj in dump]
+
+    with span("pw-dump (streamed)", "pw_client", remote=remote), subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ) as process:
+        assert process.stdout is not None
+        objects = list(iter_objects(process.stdout, types, params))
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return objects
+
+
+class PipewireMonitor:
+    """Keeps a ``pw-dump --monitor`` process open and mirrors its objects by id.
+
+    The first JSON array emitted by the monitor is the full graph; every later
+    array only carries the objects that changed. An object whose ``info`` is
+    ``null`` has been removed.
+
+    Only objects of ``types`` are kept, with only the ``info.params`` entries
+    in ``params`` (the ones the parsers read, by default; ``None`` keeps
+    everything), so ports, links and format lists do not stay resident.
+    """
+
+    def __init__(
+        self,
+        command: Optional[List[str]] = None,
+        remote: Optional[str] = None,
+        types: Optional[Collection[str]] = PARSED_TYPES,
+        params: Optional[Collection[str]] = PARSED_PARAMS,
+    ) -> None:
+        self.remote = remote
+        self.command = command or [*pw_dump_command(remote), "--monitor"]
+        self.types = types
+        self.params = params
+        self.objects: Dict[int, Dict[str, Any]] = {}
+        # Type of every object in the graph, kept or not, so that removals
+        # of filtered objects still show up in ``last_update_types``.
+        self._object_types: Dict[int, str] = {}
+        self.generation = 0
+        # Types of the objects the latest update added, changed or removed;
+        # listeners run right after it is set, on the same thread.
+        self.last_update_types: Set[str] = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._listeners: List[Callable[[], None]] = []
+        self._process: Optional[subprocess.Popen[str]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Spawn the monitor process and start applying its updates.
+
+        Restarting a monitor whose process has exited drops the old objects;
+        the new process sends the whole graph again.
+        """
+        if self.running:
+            return
+        with self._lock:
+            self.objects = {}
+            self._object_types = {}
+            self._ready.clear()
+        self._process = subprocess.Popen(
+            self.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self._thread = threading.Thread(target=self._read_loop, name="pw-dump-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Terminate the monitor process."""
+        process = self._process
+        self._process = None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial graph has been received."""
+        return self._ready.wait(timeout)
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Register ``callback`` to run (on the reader thread) after each update."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def dump(self) -> List[Dict[str, Any]]:
+        """Return the current objects in the same shape as :func:`pw_dump`."""
+        with self._lock:
+            return list(self.objects.values())
+
+    def apply_update(self, update: List[Dict[str, Any]]) -> None:
+        """Merge one monitor update into the object store."""
+        types: Set[str] = set()
+        with span("monitor update", "pw_client", objects=len(update)), self._lock:
+            for obj in update:
+                if not isinstance(obj, dict) or "id" not in obj:
+                    continue
+                obj_id = obj["id"]
+                obj_type = obj.get("type") or self._object_types.get(obj_id)
+                if obj_type:
+                    types.add(obj_type)
+                if "info" in obj and obj["info"] is None:
+                    self.objects.pop(obj_id, None)
+                    self._object_types.pop(obj_id, None)
+                    continue
+                if obj_type:
+                    self._object_types[obj_id] = obj_type
+                if self.types is not None and obj_type not in self.types:
+                    continue
+                current = self.objects.get(obj_id)
+                merged = obj if current is None else _merge_object(current, obj)
+                self.objects[obj_id] = prune_params(merged, self.params)
+            self.generation += 1
+            self.last_update_types = types
+        self._ready.set()
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as exc:  # pragma: no cover - listeners must not kill the reader
+                print(f"PipeWire monitor listener failed: {exc}", file=sys.stderr)
+
+    def _read_loop(self) -> None:
+        process = self._process
+        if process is None or process.stdout is None:
+            return
+        decoder = json.JSONDecoder()
+        buffer: List[str] = []
+        for line in process.stdout:
+            buffer.append(line)
+            # pw-dump writes each update as a top-level array whose closing
+            # bracket is not indented; only then is the buffer worth decoding.
+            if not line.startswith("]") and not (line.startswith("[") and line.rstrip().endswith("]")):
+                continue
+            text = "".join(buffer).strip()
+            try:
+                update, _end = decoder.raw_decode(text)
+            except ValueError:
+                continue
+            buffer.clear()
+            if isinstance(update, list):
+                self.apply_update(update)
+
+
+def _merge_object(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Return ``current`` updated with the fields present in ``update``."""
+    merged = dict(current)
+    for key, value in update.items():
+        if key == "info" and isinstance(value, dict) and isinstance(merged.get("info"), dict):
+            info = dict(merged["info"])
+            info.update(value)
+            merged["info"] = info
+        elif key == "metadata" and isinstance(value, list) and isinstance(merged.get("metadata"), list):
+            merged["metadata"] = _merge_metadata(merged["metadata"], value)
+        else:
+            merged[key] = value
+    return merged
 
 
-def pw_dump() -> List[Dict[str, Any]]:
-    """Return the JSON structure produced by ``pw-dump``."""
-    process = subprocess.run(PW_DUMP_CMD, capture_output=True, text=True, check=True)
-    return json.loads(process.stdout)
+def _merge_metadata(current: List[Dict[str, Any]], update: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply metadata property changes; a ``null`` value removes the key."""
+    entries = {(item.get("subject"), item.get("key")): item for item in current}
+    for item in update:
+        key = (item.get("subject"), item.get("key"))
+        if item.get("value") is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = item
+    return list(entries.values())
 
 
-def set_default_sink(sink_id: int) -> None:
+_MONITOR: Optional[PipewireMonitor] = None
+
+
+def get_monitor() -> PipewireMonitor:
+    """Return the shared monitor, starting it on first use."""
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = PipewireMonitor()
+    if not _MONITOR.running:
+        _MONITOR.start()
+    return _MONITOR
+
+
+def current_monitor() -> Optional[PipewireMonitor]:
+    """Return the shared monitor if it has been started and is still running."""
+    if _MONITOR is not None and _MONITOR.running:
+        return _MONITOR
+    return None
+
+
+def _wpctl(*args: str, remote: Optional[str] = None) -> None:
+    env = {**os.environ, REMOTE_ENV: remote} if remote else None
+    with span(f"wpctl {args[0]}", "pw_client", args=list(args[1:]), remote=remote):
+        subprocess.run([WPCTL_CMD, *args], check=False, env=env)
+
+
+def set_default_sink(sink_id: int, remote: Optional[str] = None) -> None:
     """Set the default PipeWire sink via ``wpctl``."""
-    subprocess.run([WPCTL_CMD, "set-default", str(sink_id)], check=False)
+    _wpctl("set-default", str(sink_id), remote=remote)
 
 
-def set_profile(card_id: int, profile_index: int) -> None:
+def set_profile(card_id: int, profile_index: int, remote: Optional[str] = None) -> None:
     """Set the profile for a specific card via ``wpctl``."""
-    subprocess.run([WPCTL_CMD, "set-profile", str(card_id), str(profile_index)], check=False)
+    _wpctl("set-profile", str(card_id), str(profile_index), remote=remote)
 
 
-def set_volume(sink_id: int, volume: str) -> None:
+def set_volume(sink_id: int, volume: str, remote: Optional[str] = None) -> None:
     """Set the volume for a sink via ``wpctl``."""
-    subprocess.run([WPCTL_CMD, "set-volume", str(sink_id), volume], check=False)
+    _wpctl("set-volume", str(sink_id), volume, remote=remote)
 
 
-def set_mute(sink_id: int, mute: bool | str) -> None:
+def set_mute(sink_id: int, mute: bool | str, remote: Optional[str] = None) -> None:
     """Mute/unmute a sink via ``wpctl``."""
     if isinstance(mute, str):
         state = mute
     else:
         state = "1" if mute else "0"
-    subprocess.run([WPCTL_CMD, "set-mute", str(sink_id), state], check=False)
+    _wpctl("set-mute", str(sink_id), state, remote=remote)
+
+
+Command = Tuple[str, Tuple[Any, ...]]
+
+
+class CommandChannel:
+    """A persistent connection that pipelines writes and matches their replies.
+
+    ``wpctl`` has no interactive mode and ``pw-cli`` cannot change the default
+    metadata, so the channel keeps one native-protocol connection open
+    instead of a coprocess. If it cannot connect, commands fall back to one
+    ``wpctl`` call each, and it tries to reconnect ``RETRY_INTERVAL`` seconds
+    later. When the connection drops partway through a batch, only the
+    commands that were never sent fall back; the ones sent but not
+    acknowledged report an error rather than risk a second toggle.
+    """
+
+    RETRY_INTERVAL = 30.0
+
+    def __init__(self, remote: Optional[str] = None) -> None:
+        self.remote = remote
+        self._client: Any = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, commands: List[Command]) -> List[Optional[str]]:
+        """Send ``commands`` in one round-trip; return an error (or ``None``) per command."""
+        if not commands:
+            return []
+        from pw_native import NativeClient, NativeProtocolError, PipelineInterrupted
+
+        results: List[Optional[str]] = [None] * len(commands)
+        unsent = 0
+        with span("command channel", "pw_client", commands=len(commands)), self._lock:
+            if time.monotonic() >= self._retry_at:
+                try:
+                    if self._client is None:
+                        self._client = NativeClient(self.remote)
+                    return self._client.pipeline(commands)
+                except PipelineInterrupted as exc:
+                    results, unsent = exc.results, exc.sent
+                    self._disconnected(exc)
+                except (OSError, NativeProtocolError) as exc:
+                    self._disconnected(exc)
+        for position in range(unsent, len(commands)):
+            if results[position] is None:
+                name, args = commands[position]
+                _WPCTL_WRITES[name](*args, remote=self.remote)
+        return results
+
+    def _disconnected(self, exc: Exception) -> None:
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._retry_at = time.monotonic() + self.RETRY_INTERVAL
+        print(
+            f"PipeWire command channel unavailable, using wpctl for {self.RETRY_INTERVAL:.0f} s: {exc}",
+            file=sys.stderr,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_WPCTL_WRITES: Dict[str, Callable[..., None]] = {
+    "set_default_sink": set_default_sink,
+    "set_profile": set_profile,
+    "set_volume": set_volume,
+    "set_mute": set_mute,
+}
+
+
+def run_async(func: Callable[..., T], *args: Any) -> "Future[T]":
+    """Run a blocking read such as :func:`pw_dump` on the reader pool.
+
+    The returned :class:`concurrent.futures.Future` can be awaited from asyncio
+    with :func:`asyncio.wrap_future` or handed to the GLib main loop.
+    """
+    global _READ_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _READ_EXECUTOR is None:
+            _READ_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pw-client-read")
+    return _READ_EXECUTOR.submit(func, *args)
+
+
+def write_async(func: Callable[..., T], *args: Any) -> "Future[T]":
+    """Run a write on the single writer thread, after the writes submitted before it."""
+    global _WRITE_EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _WRITE_EXECUTOR is None:
+            _WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pw-client-write")
+    return _WRITE_EXECUTOR.submit(func, *args)
@@ -0,0 +1,25 @@
+"""Optional backend speaking the PipeWire native protocol instead of forking tools."""
+from __future__ import annotations
+
+from .client import (
+    NativeClient,
+    get_client,
+    pw_dump,
+    set_default_sink,
+    set_mute,
+    set_profile,
+    set_volume,
+)
+from .connection import NativeProtocolError, PipelineInterrupted
+
+__all__ = [
+    "NativeClient",
+    "NativeProtocolError",
+    "PipelineInterrupted",
+    "get_client",
+    "pw_dump",
+    "set_default_sink",
+    "set_mute",
+    "set_profile",
+    "set_volume",
+]
@@ -0,0 +1,581 @@
+"""A PipeWire client speaking the native protocol directly, without ``pw-dump``/``wpctl``."""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .connection import (
+    CLIENT_ID,
+    CLIENT_UPDATE_PROPERTIES,
+    CORE_DESTROY,
+    CORE_EVENT_DONE,
+    CORE_EVENT_ERROR,
+    CORE_EVENT_PING,
+    CORE_GET_REGISTRY,
+    CORE_HELLO,
+    CORE_ID,
+    CORE_PONG,
+    CORE_SYNC,
+    CORE_VERSION,
+    DEVICE_VERSION,
+    METADATA_EVENT_PROPERTY,
+    METADATA_SET_PROPERTY,
+    METADATA_VERSION,
+    NODE_VERSION,
+    OBJECT_EVENT_INFO,
+    OBJECT_EVENT_PARAM,
+    PARAMS_ENUM,
+    PARAMS_SET,
+    REGISTRY_BIND,
+    REGISTRY_EVENT_GLOBAL,
+    REGISTRY_EVENT_GLOBAL_REMOVE,
+    REGISTRY_VERSION,
+    Connection,
+    NativeProtocolError,
+    PipelineInterrupted,
+)
+from .pod import (
+    OBJECT_PARAM_PROFILE,
+    OBJECT_PROPS,
+    PARAM_IDS,
+    PARAM_NAMES,
+    Array,
+    Id,
+    PodObject,
+    TYPE_FLOAT,
+    decode_dict,
+    encode_dict,
+    param_to_dict,
+)
+
+
+NODE_TYPE = "PipeWire:Interface:Node"
+DEVICE_TYPE = "PipeWire:Interface:Device"
+METADATA_TYPE = "PipeWire:Interface:Metadata"
+
+# Interface versions this client implements, per bindable type.
+_BIND_VERSIONS = {NODE_TYPE: NODE_VERSION, DEVICE_TYPE: DEVICE_VERSION, METADATA_TYPE: METADATA_VERSION}
+
+NODE_STATES = {-1: "error", 0: "creating", 1: "suspended", 2: "idle", 3: "running"}
+
+_NODE_CHANGE_STATE = 1 << 2
+_NODE_CHANGE_PROPS = 1 << 3
+_DEVICE_CHANGE_PROPS = 1 << 0
+
+_NUMBER_RE = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?$")
+
+
+def _json_value(value: Any) -> Any:
+    """Type property strings the way ``pw-dump`` prints them."""
+    if not isinstance(value, str):
+        return value
+    if value in ("true", "false"):
+        return value == "true"
+    if _NUMBER_RE.match(value):
+        number = float(value)
+        return int(number) if number.is_integer() and "." not in value else number
+    return value
+
+
+def parse_volume(volume: str, current: Optional[float]) -> float:
+    """Interpret a ``wpctl set-volume`` argument (``0.5``, ``50%``, ``5%+``) on the user scale."""
+    text = volume.strip()
+    relative = 0
+    if text.endswith(("+", "-")):
+        relative = 1 if text.endswith("+") else -1
+        text = text[:-1]
+    if text.endswith("%"):
+        value = float(text[:-1]) / 100
+    else:
+        value = float(text)
+    if relative:
+        value = (current or 0.0) + relative * value
+    return max(0.0, value)
+
+
+def _reads_state(name: str, args: Tuple[Any, ...]) -> bool:
+    """Whether a write depends on the current value (toggles, relative volumes)."""
+    if name == "set_mute":
+        return args[1] == "toggle"
+    if name == "set_volume":
+        return str(args[1]).strip().endswith(("+", "-"))
+    return False
+
+
+class NativeClient:
+    """Talks to a PipeWire daemon over its ``pipewire-0`` Unix socket.
+
+    Requests are pipelined and fenced with a single ``core.sync``, so a whole
+    dump or a group of writes costs one socket round-trip.
+    """
+
+    def __init__(self, remote: Optional[str] = None, timeout: Optional[float] = 2.0) -> None:
+        self.remote = remote
+        self.timeout = timeout
+        self.globals: Dict[int, Dict[str, Any]] = {}
+        self._conn: Optional[Connection] = None
+        self._next_id = 2
+        self._registry_id: Optional[int] = None
+        self._sync_seq = 0
+        self._enum_seq = 0
+        self._proxies: Dict[int, int] = {}
+        self._proxy_globals: Dict[int, int] = {}
+        self._info: Dict[int, Dict[str, Any]] = {}
+        self._metadata: Dict[int, Dict[Tuple[Any, Any], Dict[str, Any]]] = {}
+        self._errors: List[Tuple[int, str]] = []
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "NativeClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def connect(self) -> None:
+        """Open the socket, say hello and load the registry."""
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = Connection.open(self.remote, self.timeout)
+            self._conn = conn
+            registry_id = self._new_id()
+            self._registry_id = registry_id
+            try:
+                self.roundtrip(
+                    [
+                        conn.encode_message(CORE_ID, CORE_HELLO, [CORE_VERSION]),
+                        conn.encode_message(
+                            CLIENT_ID,
+                            CLIENT_UPDATE_PROPERTIES,
+                            [encode_dict({"application.name": "pipewire-quick-settings"})],
+                        ),
+                        conn.encode_message(CORE_ID, CORE_GET_REGISTRY, [REGISTRY_VERSION, registry_id]),
+                    ]
+                )
+            except (OSError, NativeProtocolError):
+                self.close()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._next_id = 2
+            self._registry_id = None
+            self._proxies.clear()
+            self._proxy_globals.clear()
+            self._info.clear()
+            self._metadata.clear()
+            self.globals.clear()
+
+    def roundtrip(self, messages: Iterable[bytes] = (), raise_errors: bool = True) -> List[Tuple[int, str]]:
+        """Send ``messages`` plus a sync, dispatching events until the server catches up.
+
+        Errors reported meanwhile are raised, or returned as ``(seq, message)``
+        pairs when ``raise_errors`` is false.
+        """
+        with self._lock:
+            conn = self._require_connection()
+            self._sync_seq += 1
+            seq = self._sync_seq
+            try:
+                conn.send_many([*messages, conn.encode_message(CORE_ID, CORE_SYNC, [CORE_ID, seq])])
+                while True:
+                    obj_id, opcode, _msg_seq, args = conn.receive()
+                    if obj_id == CORE_ID and opcode == CORE_EVENT_DONE and args[1] == seq:
+                        break
+                    self._dispatch(obj_id, opcode, args)
+            except OSError as exc:
+                self.close()
+                raise NativeProtocolError(f"PipeWire connection failed: {exc}") from exc
+            errors, self._errors = self._errors, []
+            if errors and raise_errors:
+                raise NativeProtocolError("; ".join(message for _seq, message in errors))
+            return errors
+
+    def pipeline(self, commands: List[Tuple[str, Tuple[Any, ...]]]) -> List[Optional[str]]:
+        """Send several writes in one round-trip; return an error (or ``None``) per command.
+
+        ``commands`` holds ``(name, args)`` pairs naming the ``set_*`` methods.
+        Commands that must read current state first (``toggle``, relative
+        volumes) flush what is queued before them so they see its effect.
+
+        If the connection fails partway, :class:`PipelineInterrupted` tells
+        which commands were acknowledged and which were never sent, so a
+        caller can retry only the latter without applying a toggle twice.
+        """
+        builders = {
+            "set_default_sink": self.default_sink_messages,
+            "set_profile": self.profile_messages,
+            "set_volume": self.volume_messages,
+            "set_mute": self.mute_messages,
+        }
+        results: List[Optional[str]] = [None] * len(commands)
+        # Commands before ``acknowledged`` have been confirmed by a sync;
+        # those before ``sent`` have been handed to the connection.
+        acknowledged = 0
+        sent = 0
+        with self._lock:
+            try:
+                self.connect()
+                conn = self._require_connection()
+                pending: List[bytes] = []
+                spans: List[Tuple[int, int, int]] = []
+
+                def _flush() -> None:
+                    nonlocal acknowledged
+                    for seq, message in self.roundtrip(pending, raise_errors=False):
+                        for position, first, last in spans:
+                            if first <= seq <= last:
+                                results[position] = message
+                    pending.clear()
+                    spans.clear()
+                    acknowledged = sent
+
+                for position, (name, args) in enumerate(commands):
+                    builder = builders.get(name)
+                    if builder is None:
+                        results[position] = f"Unknown command {name!r}"
+                        sent = position + 1
+                        continue
+                    if _reads_state(name, args) and pending:
+                        _flush()
+                    first = conn.seq + 1
+                    try:
+                        messages = builder(*args)
+                    except (NativeProtocolError, ValueError) as exc:
+                        results[position] = str(exc)
+                        sent = position + 1
+                        continue
+                    pending.extend(messages)
+                    spans.append((position, first, conn.seq))
+                    sent = position + 1
+                _flush()
+            except (OSError, NativeProtocolError) as exc:
+                for position in range(acknowledged, sent):
+                    if results[position] is None:
+                        results[position] = f"Not acknowledged before the connection failed: {exc}"
+                raise PipelineInterrupted(str(exc), results, sent) from exc
+        return results
+
+    # -- reading ---------------------------------------------------------
+
+    def pw_dump(
+        self,
+        node_params: Iterable[str] = ("Props",),
+        device_params: Iterable[str] = ("EnumProfile", "Profile"),
+    ) -> List[Dict[str, Any]]:
+        """Return the graph in the same shape as ``pw_client.pw_dump()``."""
+        with self._lock:
+            self.connect()
+            messages: List[bytes] = []
+            for global_id, obj in list(self.globals.items()):
+                if obj["type"] == NODE_TYPE:
+                    messages.extend(self._bind_messages(global_id))
+                    messages.extend(self._enum_messages(global_id, node_params))
+                elif obj["type"] == DEVICE_TYPE:
+                    messages.extend(self._bind_messages(global_id))
+                    messages.extend(self._enum_messages(global_id, device_params))
+                elif obj["type"] == METADATA_TYPE:
+                    messages.extend(self._bind_messages(global_id))
+            self.roundtrip(messages)
+            return [self._dump_object(global_id) for global_id in self.globals]
+
+    def _dump_object(self, global_id: int) -> Dict[str, Any]:
+        obj = self.globals[global_id]
+        result: Dict[str, Any] = {
+            "id": global_id,
+            "type": obj["type"],
+            "version": obj["version"],
+            "permissions": obj["permissions"],
+        }
+        if obj["type"] == METADATA_TYPE:
+            result["props"] = dict(obj["props"])
+            result["metadata"] = list(self._metadata.get(global_id, {}).values())
+        else:
+            info = self._info.get(global_id) or {"props": dict(obj["props"]), "params": {}}
+            result["info"] = {**info, "params": dict(info.get("params", {}))}
+        return result
+
+    # -- writing ---------------------------------------------------------
+
+    def set_default_sink(self, sink_id: int) -> None:
+        with self._lock:
+            self.roundtrip(self.default_sink_messages(sink_id))
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        with self._lock:
+            self.roundtrip(self.profile_messages(card_id, profile_index))
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        with self._lock:
+            self.roundtrip(self.volume_messages(sink_id, volume))
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        with self._lock:
+            self.roundtrip(self.mute_messages(sink_id, mute))
+
+    def default_sink_messages(self, sink_id: int) -> List[bytes]:
+        """Encode the metadata update that makes ``sink_id`` the configured default."""
+        self.connect()
+        node = self._global(sink_id, NODE_TYPE)
+        name = node["props"].get("node.name")
+        if name is None:
+            raise NativeProtocolError(f"Node {sink_id} has no node.name")
+        metadata_id = self._default_metadata_id()
+        messages = self._bind_messages(metadata_id)
+        value = json.dumps({"name": name})
+        messages.append(
+            self._message(
+                self._proxies[metadata_id],
+                METADATA_SET_PROPERTY,
+                [0, "default.configured.audio.sink", "Spa:String:JSON", value],
+            )
+        )
+        return messages
+
+    def profile_messages(self, card_id: int, profile_index: int) -> List[bytes]:
+        self.connect()
+        self._global(card_id, DEVICE_TYPE)
+        messages = self._bind_messages(card_id)
+        param = PodObject(OBJECT_PARAM_PROFILE, PARAM_IDS["Profile"], {1: int(profile_index), 8: True})
+        messages.append(self._message(self._proxies[card_id], PARAMS_SET, [Id(PARAM_IDS["Profile"]), 0, param]))
+        return messages
+
+    def volume_messages(self, sink_id: int, volume: str) -> List[bytes]:
+        if _reads_state("set_volume", (sink_id, volume)):
+            props = self._current_props(sink_id)
+        else:
+            props = self._cached_props(sink_id) or self._current_props(sink_id)
+        channels = props.get("channelVolumes") or [props.get("volume", 1.0)]
+        current: Optional[float] = None
+        if channels:
+            linear = sum(float(value) for value in channels) / len(channels)
+            current = linear ** (1 / 3) if linear > 0 else 0.0
+        user = parse_volume(volume, current)
+        linear_target = user ** 3
+        param = PodObject(
+            OBJECT_PROPS,
+            PARAM_IDS["Props"],
+            {0x10008: Array(TYPE_FLOAT, [linear_target] * max(1, len(channels)))},
+        )
+        return [self._message(self._proxies[sink_id], PARAMS_SET, [Id(PARAM_IDS["Props"]), 0, param])]
+
+    def mute_messages(self, sink_id: int, mute: bool | str) -> List[bytes]:
+        self.connect()
+        self._global(sink_id, NODE_TYPE)
+        if mute == "toggle":
+            state = not bool(self._current_props(sink_id).get("mute"))
+        elif isinstance(mute, str):
+            state = mute.strip().lower() in {"1", "true", "yes", "on"}
+        else:
+            state = bool(mute)
+        messages = self._bind_messages(sink_id)
+        param = PodObject(OBJECT_PROPS, PARAM_IDS["Props"], {0x10004: state})
+        messages.append(self._message(self._proxies[sink_id], PARAMS_SET, [Id(PARAM_IDS["Props"]), 0, param]))
+        return messages
+
+    # -- internals -------------------------------------------------------
+
+    def _require_connection(self) -> Connection:
+        if self._conn is None:
+            raise NativeProtocolError("Not connected to PipeWire")
+        return self._conn
+
+    def _new_id(self) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def _message(self, obj_id: int, opcode: int, args: List[Any]) -> bytes:
+        return self._require_connection().encode_message(obj_id, opcode, args)
+
+    def _global(self, global_id: int, obj_type: str) -> Dict[str, Any]:
+        obj = self.globals.get(global_id)
+        if obj is None or obj["type"] != obj_type:
+            raise NativeProtocolError(f"No {obj_type.rsplit(':', 1)[-1].lower()} with id {global_id}")
+        return obj
+
+    def _default_metadata_id(self) -> int:
+        for global_id, obj in self.globals.items():
+            if obj["type"] == METADATA_TYPE and obj["props"].get("metadata.name") == "default":
+                return global_id
+        raise NativeProtocolError("No default metadata object")
+
+    def _current_props(self, node_id: int) -> Dict[str, Any]:
+        """Enumerate and return the node's ``Props`` param."""
+        self.connect()
+        self._global(node_id, NODE_TYPE)
+        messages = self._bind_messages(node_id)
+        messages.extend(self._enum_messages(node_id, ("Props",)))
+        self.roundtrip(messages)
+        for item in self._info.get(node_id, {}).get("params", {}).get("Props", []):
+            if isinstance(item, dict) and ("channelVolumes" in item or "volume" in item):
+                return item
+        return {}
+
+    def _cached_props(self, node_id: int) -> Optional[Dict[str, Any]]:
+        """Return the last enumerated ``Props`` param, if the node is bound."""
+        if node_id not in self._proxies:
+            return None
+        for item in self._info.get(node_id, {}).get("params", {}).get("Props", []):
+            if isinstance(item, dict) and ("channelVolumes" in item or "volume" in item):
+                return item
+        return None
+
+    def _bind_messages(self, global_id: int) -> List[bytes]:
+        if global_id in self._proxies:
+            return []
+        obj = self.globals[global_id]
+        proxy_id = self._new_id()
+        self._proxies[global_id] = proxy_id
+        self._proxy_globals[proxy_id] = global_id
+        version = min(int(obj["version"]), _BIND_VERSIONS[obj["type"]])
+        registry_id = self._registry_id
+        if registry_id is None:
+            raise NativeProtocolError("Registry not available")
+        return [self._message(registry_id, REGISTRY_BIND, [global_id, obj["type"], version, proxy_id])]
+
+    def _enum_messages(self, global_id: int, params: Iterable[str]) -> List[bytes]:
+        proxy_id = self._proxies[global_id]
+        info = self._info.setdefault(global_id, {"props": dict(self.globals[global_id]["props"]), "params": {}})
+        messages = []
+        for name in params:
+            param_id = PARAM_IDS.get(name)
+            if param_id is None:
+                continue
+            info["params"][name] = []
+            self._enum_seq += 1
+            messages.append(self._message(proxy_id, PARAMS_ENUM, [self._enum_seq, Id(param_id), 0, 0, None]))
+        return messages
+
+    def _dispatch(self, obj_id: int, opcode: int, args: Any) -> None:
+        if obj_id == CORE_ID:
+            if opcode == CORE_EVENT_PING:
+                self._require_connection().send(CORE_ID, CORE_PONG, [args[0], args[1]])
+            elif opcode == CORE_EVENT_ERROR:
+                self._errors.append((args[1], f"{args[3]} (object {args[0]}, code {args[2]})"))
+            return
+        if obj_id == self._registry_id:
+            if opcode == REGISTRY_EVENT_GLOBAL:
+                global_id, permissions, obj_type, version, props = args
+                self.globals[global_id] = {
+                    "type": obj_type,
+                    "version": version,
+                    "permissions": permissions,
+                    "props": {key: _json_value(value) for key, value in decode_dict(props).items()},
+                }
+            elif opcode == REGISTRY_EVENT_GLOBAL_REMOVE:
+                self._forget(args[0])
+            return
+
+        global_id = self._proxy_globals.get(obj_id)
+        if global_id is None or global_id not in self.globals:
+            return
+        obj_type = self.globals[global_id]["type"]
+        if obj_type == METADATA_TYPE and opcode == METADATA_EVENT_PROPERTY:
+            self._on_metadata_property(global_id, args)
+        elif opcode == OBJECT_EVENT_INFO:
+            self._on_info(global_id, obj_type, args)
+        elif opcode == OBJECT_EVENT_PARAM:
+            _seq, param_id, _index, _next, param = args
+            name = PARAM_NAMES.get(param_id, str(param_id))
+            info = self._info.setdefault(global_id, {"props": {}, "params": {}})
+            info["params"].setdefault(name, []).append(param_to_dict(param))
+
+    def _on_info(self, global_id: int, obj_type: str, args: List[Any]) -> None:
+        info = self._info.setdefault(global_id, {"props": dict(self.globals[global_id]["props"]), "params": {}})
+        if obj_type == NODE_TYPE:
+            _id, max_in, max_out, change_mask, n_in, n_out, state, error, props, _params = args[:10]
+            info.update(
+                {
+                    "max-input-ports": max_in,
+                    "max-output-ports": max_out,
+                    "n-input-ports": n_in,
+                    "n-output-ports": n_out,
+                }
+            )
+            if change_mask & _NODE_CHANGE_STATE or "state" not in info:
+                if state >= 1 << 31:
+                    state -= 1 << 32
+                info["state"] = NODE_STATES.get(state, "unknown")
+                info["error"] = error
+            if change_mask & _NODE_CHANGE_PROPS:
+                info["props"] = {key: _json_value(value) for key, value in decode_dict(props).items()}
+        elif obj_type == DEVICE_TYPE:
+            _id, change_mask, props, _params = args[:4]
+            if change_mask & _DEVICE_CHANGE_PROPS:
+                info["props"] = {key: _json_value(value) for key, value in decode_dict(props).items()}
+
+    def _on_metadata_property(self, global_id: int, args: List[Any]) -> None:
+        subject, key, value_type, value = args
+        entries = self._metadata.setdefault(global_id, {})
+        if key is None:
+            entries.clear()
+            return
+        if value is None:
+            entries.pop((subject, key), None)
+            return
+        if value_type == "Spa:String:JSON":
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        entries[(subject, key)] = {"subject": subject, "key": key, "type": value_type, "value": value}
+
+    def _forget(self, global_id: int) -> None:
+        self.globals.pop(global_id, None)
+        self._info.pop(global_id, None)
+        self._metadata.pop(global_id, None)
+        proxy_id = self._proxies.pop(global_id, None)
+        if proxy_id is not None:
+            self._proxy_globals.pop(proxy_id, None)
+            if self._conn is not None:
+                self._conn.send(CORE_ID, CORE_DESTROY, [proxy_id])
+
+
+_CLIENT: Optional[NativeClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> NativeClient:
+    """Return the shared, connected client."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = NativeClient()
+        _CLIENT.connect()
+        return _CLIENT
+
+
+def pw_dump() -> List[Dict[str, Any]]:
+    """Native-protocol equivalent of ``pw_client.pw_dump``."""
+    return get_client().pw_dump()
+
+
+def set_default_sink(sink_id: int) -> None:
+    """Native-protocol equivalent of ``pw_client.set_default_sink``."""
+    get_client().set_default_sink(sink_id)
+
+
+def set_profile(card_id: int, profile_index: int) -> None:
+    """Native-protocol equivalent of ``pw_client.set_profile``."""
+    get_client().set_profile(card_id, profile_index)
+
+
+def set_volume(sink_id: int, volume: str) -> None:
+    """Native-protocol equivalent of ``pw_client.set_volume``."""
+    get_client().set_volume(sink_id, volume)
+
+
+def set_mute(sink_id: int, mute: bool | str) -> None:
+    """Native-protocol equivalent of ``pw_client.set_mute``."""
+    get_client().set_mute(sink_id, mute)
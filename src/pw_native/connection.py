@@ -0,0 +1,140 @@
+"""Message framing for the PipeWire native protocol over a Unix socket."""
+from __future__ import annotations
+
+import os
+import socket
+import struct
+from typing import Any, List, Optional, Tuple
+
+from .pod import decode, encode
+
+
+HEADER = struct.Struct("<IIII")
+
+CORE_ID = 0
+CLIENT_ID = 1
+
+CORE_VERSION = 4
+REGISTRY_VERSION = 3
+NODE_VERSION = 3
+DEVICE_VERSION = 3
+METADATA_VERSION = 3
+
+# Method opcodes (client -> server).
+CORE_HELLO = 1
+CORE_SYNC = 2
+CORE_PONG = 3
+CORE_GET_REGISTRY = 5
+CORE_DESTROY = 7
+CLIENT_UPDATE_PROPERTIES = 2
+REGISTRY_BIND = 1
+PARAMS_ENUM = 2
+PARAMS_SET = 3
+METADATA_SET_PROPERTY = 1
+
+# Event opcodes (server -> client).
+CORE_EVENT_INFO = 0
+CORE_EVENT_DONE = 1
+CORE_EVENT_PING = 2
+CORE_EVENT_ERROR = 3
+CORE_EVENT_REMOVE_ID = 4
+REGISTRY_EVENT_GLOBAL = 0
+REGISTRY_EVENT_GLOBAL_REMOVE = 1
+OBJECT_EVENT_INFO = 0
+OBJECT_EVENT_PARAM = 1
+METADATA_EVENT_PROPERTY = 0
+
+Message = Tuple[int, int, int, Any]
+
+
+class NativeProtocolError(RuntimeError):
+    """Raised when the PipeWire server reports an error or the stream breaks."""
+
+
+class PipelineInterrupted(NativeProtocolError):
+    """Raised by :meth:`NativeClient.pipeline` when the connection fails partway.
+
+    ``results`` holds the outcome of every command acknowledged before the
+    failure and an error for each one sent but not acknowledged, which may
+    or may not have been applied. Commands from ``sent`` on never reached
+    the connection; their entries are ``None`` unless they failed to build.
+    """
+
+    def __init__(self, message: str, results: List[Optional[str]], sent: int) -> None:
+        super().__init__(message)
+        self.results = results
+        self.sent = sent
+
+
+def socket_path(remote: Optional[str] = None) -> str:
+    """Resolve the socket for ``remote`` the way libpipewire does."""
+    name = remote or os.environ.get("PIPEWIRE_REMOTE") or "pipewire-0"
+    if os.path.isabs(name):
+        return name
+    runtime_dir = (
+        os.environ.get("PIPEWIRE_RUNTIME_DIR")
+        or os.environ.get("XDG_RUNTIME_DIR")
+        or os.environ.get("USERPROFILE")
+    )
+    if not runtime_dir:
+        raise NativeProtocolError("No runtime directory set to locate the PipeWire socket")
+    return os.path.join(runtime_dir, name)
+
+
+class Connection:
+    """A framed, bidirectional message stream on a connected socket."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._buffer = bytearray()
+        self._seq = 0
+
+    @classmethod
+    def open(cls, remote: Optional[str] = None, timeout: Optional[float] = None) -> "Connection":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path(remote))
+        except OSError:
+            sock.close()
+            raise
+        return cls(sock)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the most recently encoded message."""
+        return self._seq
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def encode_message(self, obj_id: int, opcode: int, args: List[Any]) -> bytes:
+        payload = encode(args)
+        self._seq += 1
+        return HEADER.pack(obj_id, (opcode << 24) | len(payload), self._seq, 0) + payload
+
+    def send(self, obj_id: int, opcode: int, args: List[Any]) -> None:
+        self.sock.sendall(self.encode_message(obj_id, opcode, args))
+
+    def send_many(self, messages: List[bytes]) -> None:
+        """Write several pre-encoded messages with one system call."""
+        self.sock.sendall(b"".join(messages))
+
+    def receive(self) -> Message:
+        """Block until one message arrives; return ``(id, opcode, seq, args)``."""
+        header = self._read_exact(HEADER.size)
+        obj_id, op_size, seq, _n_fds = HEADER.unpack(header)
+        size = op_size & 0xFFFFFF
+        payload = self._read_exact(size)
+        args, _end = decode(payload) if size >= 8 else (None, 0)
+        return obj_id, op_size >> 24, seq, args
+
+    def _read_exact(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            chunk = self.sock.recv(max(65536, size))
+            if not chunk:
+                raise NativeProtocolError("PipeWire connection closed")
+            self._buffer.extend(chunk)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
@@ -0,0 +1,260 @@
+"""A local stand-in for the PipeWire daemon, serving a ``pw-dump`` style graph.
+
+It understands the subset of the native protocol that :class:`NativeClient`
+uses, which is enough to exercise the native backend without an audio stack.
+Writes update the served graph, and setting the configured default sink also
+updates ``default.audio.sink`` the way WirePlumber would.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import socket
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+from .connection import (
+    CORE_DESTROY,
+    CORE_EVENT_DONE,
+    CORE_EVENT_ERROR,
+    CORE_EVENT_REMOVE_ID,
+    CORE_GET_REGISTRY,
+    CORE_ID,
+    CORE_SYNC,
+    METADATA_EVENT_PROPERTY,
+    METADATA_SET_PROPERTY,
+    OBJECT_EVENT_INFO,
+    OBJECT_EVENT_PARAM,
+    PARAMS_ENUM,
+    PARAMS_SET,
+    REGISTRY_BIND,
+    REGISTRY_EVENT_GLOBAL,
+    Connection,
+    NativeProtocolError,
+)
+from .pod import (
+    OBJECT_PARAM_PROFILE,
+    OBJECT_PROPS,
+    PARAM_IDS,
+    PARAM_NAMES,
+    Id,
+    Long,
+    dict_to_param,
+    encode_dict,
+    param_to_dict,
+)
+
+_NODE_STATES = {"error": -1, "creating": 0, "suspended": 1, "idle": 2, "running": 3}
+_PARAM_OBJECT_TYPES = {
+    "Props": OBJECT_PROPS,
+    "EnumProfile": OBJECT_PARAM_PROFILE,
+    "Profile": OBJECT_PARAM_PROFILE,
+}
+
+
+def _prop_string(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+class FakePipewireServer:
+    """Serves ``dump`` on a Unix socket until :meth:`stop` is called."""
+
+    def __init__(self, dump: List[Dict[str, Any]], path: Optional[str] = None) -> None:
+        self.objects: Dict[int, Dict[str, Any]] = {obj["id"]: copy.deepcopy(obj) for obj in dump}
+        self._tmpdir: Optional[str] = None
+        if path is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="pw-fake-")
+            path = os.path.join(self._tmpdir, "pipewire-0")
+        self.path = path
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._sessions: List["_Session"] = []
+        self._sock: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+
+    def __enter__(self) -> "FakePipewireServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def dump(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(list(self.objects.values()))
+
+    def start(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        sock.listen()
+        self._sock = sock
+        thread = threading.Thread(target=self._accept_loop, name="pw-fake-server", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        if self._tmpdir is not None:
+            try:
+                os.rmdir(self._tmpdir)
+            except OSError:
+                pass
+
+    def _accept_loop(self) -> None:
+        while self._sock is not None:
+            try:
+                client, _addr = self._sock.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target=self._serve, args=(client,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _serve(self, client: socket.socket) -> None:
+        session = _Session(self, Connection(client))
+        with self._lock:
+            self._sessions.append(session)
+        try:
+            while True:
+                session.handle(*session.conn.receive())
+        except (OSError, NativeProtocolError):
+            pass
+        finally:
+            with self._lock:
+                self._sessions.remove(session)
+            client.close()
+
+
+class _Session:
+    """Per-connection proxy bookkeeping."""
+
+    def __init__(self, server: FakePipewireServer, conn: Connection) -> None:
+        self.server = server
+        self.conn = conn
+        self.registry_id: Optional[int] = None
+        self.proxies: Dict[int, int] = {}
+
+    def handle(self, obj_id: int, opcode: int, _seq: int, args: Any) -> None:
+        with self.server._lock:
+            self.server.requests += 1
+            if obj_id == CORE_ID:
+                self._core(opcode, args)
+            elif obj_id == self.registry_id and opcode == REGISTRY_BIND:
+                self._bind(*args)
+            elif obj_id in self.proxies:
+                self._object(self.proxies[obj_id], obj_id, opcode, args)
+
+    def _core(self, opcode: int, args: Any) -> None:
+        if opcode == CORE_SYNC:
+            self.conn.send(CORE_ID, CORE_EVENT_DONE, [args[0], args[1]])
+        elif opcode == CORE_GET_REGISTRY:
+            self.registry_id = args[1]
+            for obj in self.server.objects.values():
+                self._global(obj)
+        elif opcode == CORE_DESTROY:
+            self.proxies.pop(args[0], None)
+            self.conn.send(CORE_ID, CORE_EVENT_REMOVE_ID, [args[0]])
+
+    def _global(self, obj: Dict[str, Any]) -> None:
+        props = obj.get("props") or obj.get("info", {}).get("props", {})
+        encoded = encode_dict({key: _prop_string(value) for key, value in props.items()})
+        self.conn.send(
+            self.registry_id,  # type: ignore[arg-type]
+            REGISTRY_EVENT_GLOBAL,
+            [obj["id"], 0x1C8, obj["type"], int(obj.get("version", 3)), encoded],
+        )
+
+    def _bind(self, global_id: int, _obj_type: str, _version: int, new_id: int) -> None:
+        obj = self.server.objects.get(global_id)
+        if obj is None:
+            self.conn.send(CORE_ID, CORE_EVENT_ERROR, [new_id, 0, -2, f"unknown global {global_id}"])
+            return
+        self.proxies[new_id] = global_id
+        info = obj.get("info") or {}
+        props = encode_dict({key: _prop_string(value) for key, value in info.get("props", {}).items()})
+        params = [len(info.get("params", {}))]
+        for name in info.get("params", {}):
+            params.extend([Id(PARAM_IDS.get(name, 0)), 7])
+        if obj["type"] == "PipeWire:Interface:Node":
+            state = _NODE_STATES.get(info.get("state", "idle"), 2)
+            self.conn.send(
+                new_id,
+                OBJECT_EVENT_INFO,
+                [global_id, 0, 0, Long(0x1F), 0, 0, Id(state & 0xFFFFFFFF), info.get("error"), props, params],
+            )
+        elif obj["type"] == "PipeWire:Interface:Device":
+            self.conn.send(new_id, OBJECT_EVENT_INFO, [global_id, Long(0x3), props, params])
+        elif obj["type"] == "PipeWire:Interface:Metadata":
+            for item in obj.get("metadata", []):
+                self._send_property(new_id, item.get("subject", 0), item["key"], item.get("type"), item.get("value"))
+
+    def _send_property(self, proxy_id: int, subject: int, key: str, value_type: Optional[str], value: Any) -> None:
+        if not isinstance(value, str) and value is not None:
+            value = json.dumps(value)
+        self.conn.send(proxy_id, METADATA_EVENT_PROPERTY, [subject, key, value_type, value])
+
+    def _object(self, global_id: int, proxy_id: int, opcode: int, args: Any) -> None:
+        obj = self.server.objects.get(global_id)
+        if obj is None:
+            return
+        if obj["type"] == "PipeWire:Interface:Metadata":
+            if opcode == METADATA_SET_PROPERTY:
+                self._set_metadata(obj, *args)
+            return
+        params = obj.setdefault("info", {}).setdefault("params", {})
+        if opcode == PARAMS_ENUM:
+            seq, param_id = args[0], args[1]
+            name = PARAM_NAMES.get(param_id, str(param_id))
+            object_type = _PARAM_OBJECT_TYPES.get(name)
+            entries = params.get(name, [])
+            for index, entry in enumerate(entries):
+                param = dict_to_param(object_type, param_id, entry) if object_type is not None else None
+                self.conn.send(proxy_id, OBJECT_EVENT_PARAM, [seq, Id(param_id), index, index + 1, param])
+        elif opcode == PARAMS_SET:
+            param_id, _flags, param = args
+            update = param_to_dict(param)
+            if param_id == PARAM_IDS["Props"]:
+                current = params.setdefault("Props", [{}])
+                if not current:
+                    current.append({})
+                current[0].update(update)
+            elif param_id == PARAM_IDS["Profile"]:
+                for profile in params.get("EnumProfile", []):
+                    if profile.get("index") == update.get("index"):
+                        params["Profile"] = [dict(profile)]
+                        break
+
+    def _set_metadata(self, obj: Dict[str, Any], subject: int, key: str, value_type: str, value: Any) -> None:
+        if value_type == "Spa:String:JSON" and isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        keys = [key]
+        if key == "default.configured.audio.sink":
+            keys.append("default.audio.sink")
+        entries = obj.setdefault("metadata", [])
+        for name in keys:
+            entries[:] = [item for item in entries if item.get("key") != name or item.get("subject") != subject]
+            if value is not None:
+                entries.append({"subject": subject, "key": name, "type": value_type, "value": value})
+            for session in self.server._sessions:
+                for proxy_id, global_id in session.proxies.items():
+                    if global_id == obj["id"]:
+                        session._send_property(proxy_id, subject, name, value_type, value)
@@ -0,0 +1,311 @@
+"""Encoding and decoding of SPA POD values used by the PipeWire native protocol."""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+TYPE_NONE = 1
+TYPE_BOOL = 2
+TYPE_ID = 3
+TYPE_INT = 4
+TYPE_LONG = 5
+TYPE_FLOAT = 6
+TYPE_DOUBLE = 7
+TYPE_STRING = 8
+TYPE_BYTES = 9
+TYPE_RECTANGLE = 10
+TYPE_FRACTION = 11
+TYPE_BITMAP = 12
+TYPE_ARRAY = 13
+TYPE_STRUCT = 14
+TYPE_OBJECT = 15
+TYPE_SEQUENCE = 16
+TYPE_POINTER = 17
+TYPE_FD = 18
+TYPE_CHOICE = 19
+TYPE_POD = 20
+
+OBJECT_PROPS = 0x40002
+OBJECT_PARAM_PROFILE = 0x40007
+
+PARAM_IDS: Dict[str, int] = {
+    "PropInfo": 1,
+    "Props": 2,
+    "EnumFormat": 3,
+    "Format": 4,
+    "Buffers": 5,
+    "Meta": 6,
+    "IO": 7,
+    "EnumProfile": 8,
+    "Profile": 9,
+    "EnumPortConfig": 10,
+    "PortConfig": 11,
+    "EnumRoute": 12,
+    "Route": 13,
+    "Control": 14,
+    "Latency": 15,
+    "ProcessLatency": 16,
+}
+PARAM_NAMES: Dict[int, str] = {value: key for key, value in PARAM_IDS.items()}
+
+AVAILABILITY = ("unknown", "no", "yes")
+
+CHANNEL_NAMES: Dict[int, str] = {
+    0: "UNK", 1: "NA", 2: "MONO", 3: "FL", 4: "FR", 5: "FC", 6: "LFE", 7: "SL", 8: "SR",
+    9: "FLC", 10: "FRC", 11: "RC", 12: "RL", 13: "RR",
+}
+CHANNEL_IDS: Dict[str, int] = {value: key for key, value in CHANNEL_NAMES.items()}
+
+
+class Id(int):
+    """An ``Spa:Id`` value."""
+
+
+class Long(int):
+    """A 64-bit ``Spa:Long`` value."""
+
+
+class Double(float):
+    """A 64-bit ``Spa:Double`` value; plain floats encode as ``Spa:Float``."""
+
+
+class Array(list):
+    """An ``Spa:Array`` of primitive values sharing ``child_type``."""
+
+    def __init__(self, child_type: int, values: Iterable[Any] = ()) -> None:
+        super().__init__(values)
+        self.child_type = child_type
+
+
+@dataclass
+class PodObject:
+    """An ``Spa:Pod:Object`` such as a ``Props`` or ``Profile`` param."""
+
+    type: int
+    id: int
+    props: Dict[int, Any] = field(default_factory=dict)
+
+
+# Keys and value types of the object properties this tool reads and writes,
+# named the way ``pw-dump`` names them.
+_FIELDS: Dict[int, Dict[str, Tuple[int, int]]] = {
+    OBJECT_PROPS: {
+        "volume": (0x10003, TYPE_FLOAT),
+        "mute": (0x10004, TYPE_BOOL),
+        "channelVolumes": (0x10008, TYPE_ARRAY),
+        "volumeBase": (0x10009, TYPE_FLOAT),
+        "volumeStep": (0x1000A, TYPE_FLOAT),
+        "channelMap": (0x1000B, TYPE_ARRAY),
+        "monitorMute": (0x1000C, TYPE_BOOL),
+        "monitorVolumes": (0x1000D, TYPE_ARRAY),
+        "softMute": (0x1000F, TYPE_BOOL),
+        "softVolumes": (0x10010, TYPE_ARRAY),
+    },
+    OBJECT_PARAM_PROFILE: {
+        "index": (1, TYPE_INT),
+        "name": (2, TYPE_STRING),
+        "description": (3, TYPE_STRING),
+        "priority": (4, TYPE_INT),
+        "available": (5, TYPE_ID),
+        "save": (8, TYPE_BOOL),
+    },
+}
+_FIELD_NAMES: Dict[int, Dict[int, str]] = {
+    obj_type: {key: name for name, (key, _pod_type) in fields.items()}
+    for obj_type, fields in _FIELDS.items()
+}
+
+
+def _pad(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _pod(pod_type: int, body: bytes) -> bytes:
+    return struct.pack("<II", len(body), pod_type) + body + b"\0" * (_pad(len(body)) - len(body))
+
+
+def _primitive_body(pod_type: int, value: Any) -> bytes:
+    if pod_type == TYPE_BOOL:
+        return struct.pack("<i", 1 if value else 0)
+    if pod_type == TYPE_ID:
+        return struct.pack("<I", int(value))
+    if pod_type == TYPE_INT:
+        return struct.pack("<i", int(value))
+    if pod_type in (TYPE_LONG, TYPE_FD):
+        return struct.pack("<q", int(value))
+    if pod_type == TYPE_FLOAT:
+        return struct.pack("<f", float(value))
+    if pod_type == TYPE_DOUBLE:
+        return struct.pack("<d", float(value))
+    raise TypeError(f"Unsupported POD array child type {pod_type}")
+
+
+def encode(value: Any) -> bytes:
+    """Encode a Python value as a POD, choosing the POD type from the Python type."""
+    if value is None:
+        return _pod(TYPE_NONE, b"")
+    if isinstance(value, bool):
+        return _pod(TYPE_BOOL, _primitive_body(TYPE_BOOL, value))
+    if isinstance(value, Id):
+        return _pod(TYPE_ID, _primitive_body(TYPE_ID, value))
+    if isinstance(value, Long):
+        return _pod(TYPE_LONG, _primitive_body(TYPE_LONG, value))
+    if isinstance(value, int):
+        return _pod(TYPE_INT, _primitive_body(TYPE_INT, value))
+    if isinstance(value, Double):
+        return _pod(TYPE_DOUBLE, _primitive_body(TYPE_DOUBLE, value))
+    if isinstance(value, float):
+        return _pod(TYPE_FLOAT, _primitive_body(TYPE_FLOAT, value))
+    if isinstance(value, str):
+        return _pod(TYPE_STRING, value.encode("utf-8") + b"\0")
+    if isinstance(value, bytes):
+        return _pod(TYPE_BYTES, value)
+    if isinstance(value, Array):
+        children = [_primitive_body(value.child_type, item) for item in value]
+        child_size = len(children[0]) if children else len(_primitive_body(value.child_type, 0))
+        return _pod(TYPE_ARRAY, struct.pack("<II", child_size, value.child_type) + b"".join(children))
+    if isinstance(value, (list, tuple)):
+        return _pod(TYPE_STRUCT, b"".join(encode(item) for item in value))
+    if isinstance(value, PodObject):
+        body = [struct.pack("<II", value.type, value.id)]
+        for key, prop in value.props.items():
+            body.append(struct.pack("<II", key, 0))
+            body.append(encode(prop))
+        return _pod(TYPE_OBJECT, b"".join(body))
+    raise TypeError(f"Cannot encode {type(value).__name__} as a POD")
+
+
+def _decode_primitive(pod_type: int, body: bytes) -> Any:
+    if pod_type == TYPE_BOOL:
+        return struct.unpack_from("<i", body)[0] != 0
+    if pod_type == TYPE_ID:
+        return Id(struct.unpack_from("<I", body)[0])
+    if pod_type == TYPE_INT:
+        return struct.unpack_from("<i", body)[0]
+    if pod_type in (TYPE_LONG, TYPE_FD):
+        return Long(struct.unpack_from("<q", body)[0])
+    if pod_type == TYPE_FLOAT:
+        return struct.unpack_from("<f", body)[0]
+    if pod_type == TYPE_DOUBLE:
+        return Double(struct.unpack_from("<d", body)[0])
+    return None
+
+
+def decode(data: bytes, offset: int = 0) -> Tuple[Any, int]:
+    """Decode the POD at ``offset``; return the value and the offset after it."""
+    size, pod_type = struct.unpack_from("<II", data, offset)
+    start = offset + 8
+    body = data[start:start + size]
+    end = start + _pad(size)
+
+    if pod_type == TYPE_NONE:
+        return None, end
+    if pod_type in (TYPE_BOOL, TYPE_ID, TYPE_INT, TYPE_LONG, TYPE_FD, TYPE_FLOAT, TYPE_DOUBLE):
+        return _decode_primitive(pod_type, body), end
+    if pod_type == TYPE_STRING:
+        return body.split(b"\0", 1)[0].decode("utf-8", errors="replace"), end
+    if pod_type in (TYPE_BYTES, TYPE_BITMAP):
+        return bytes(body), end
+    if pod_type in (TYPE_RECTANGLE, TYPE_FRACTION):
+        return struct.unpack_from("<II", body), end
+    if pod_type == TYPE_ARRAY:
+        child_size, child_type = struct.unpack_from("<II", body)
+        values = Array(child_type)
+        if child_size:
+            for pos in range(8, size - child_size + 1, child_size):
+                values.append(_decode_primitive(child_type, body[pos:pos + child_size]))
+        return values, end
+    if pod_type == TYPE_CHOICE:
+        # Report the default (first) value, as pw-dump does for plain params.
+        _choice, _flags, child_size, child_type = struct.unpack_from("<IIII", body)
+        if child_size == 0 or size < 16 + child_size:
+            return None, end
+        return _decode_primitive(child_type, body[16:16 + child_size]), end
+    if pod_type == TYPE_STRUCT:
+        items: List[Any] = []
+        pos = 0
+        while pos + 8 <= size:
+            item, pos = decode(body, pos)
+            items.append(item)
+        return items, end
+    if pod_type == TYPE_OBJECT:
+        obj_type, obj_id = struct.unpack_from("<II", body)
+        obj = PodObject(obj_type, obj_id)
+        pos = 8
+        while pos + 16 <= size:
+            key, _flags = struct.unpack_from("<II", body, pos)
+            obj.props[key], pos = decode(body, pos + 8)
+        return obj, end
+    return None, end
+
+
+def param_to_dict(obj: Any) -> Any:
+    """Convert a decoded param object into the dictionary ``pw-dump`` prints."""
+    if not isinstance(obj, PodObject):
+        return obj
+    names = _FIELD_NAMES.get(obj.type, {})
+    result: Dict[str, Any] = {}
+    for key, value in obj.props.items():
+        name = names.get(key, str(key))
+        if name == "available" and isinstance(value, int) and 0 <= value < len(AVAILABILITY):
+            value = AVAILABILITY[value]
+        elif name == "channelMap" and isinstance(value, list):
+            value = [CHANNEL_NAMES.get(item, item) for item in value]
+        elif isinstance(value, PodObject):
+            value = param_to_dict(value)
+        elif isinstance(value, Array):
+            value = list(value)
+        result[name] = value
+    return result
+
+
+def dict_to_param(obj_type: int, param_id: int, values: Dict[str, Any]) -> PodObject:
+    """Build a param object from ``pw-dump`` style keys; unknown keys are skipped."""
+    fields = _FIELDS.get(obj_type, {})
+    obj = PodObject(obj_type, param_id)
+    for name, value in values.items():
+        spec: Optional[Tuple[int, int]] = fields.get(name)
+        if spec is None or value is None:
+            continue
+        key, pod_type = spec
+        if pod_type == TYPE_ARRAY:
+            if name == "channelMap":
+                channels = [CHANNEL_IDS.get(item, 0) if isinstance(item, str) else item for item in value]
+                obj.props[key] = Array(TYPE_ID, channels)
+            else:
+                obj.props[key] = Array(TYPE_FLOAT, [float(item) for item in value])
+        elif pod_type == TYPE_ID:
+            if isinstance(value, str):
+                value = AVAILABILITY.index(value) if value in AVAILABILITY else 0
+            obj.props[key] = Id(value)
+        elif pod_type == TYPE_BOOL:
+            obj.props[key] = bool(value)
+        elif pod_type == TYPE_FLOAT:
+            obj.props[key] = float(value)
+        elif pod_type == TYPE_INT:
+            obj.props[key] = int(value)
+        else:
+            obj.props[key] = str(value)
+    return obj
+
+
+def encode_dict(props: Dict[str, Any]) -> List[Any]:
+    """Encode a property dictionary the way the protocol marshals ``spa_dict``."""
+    items: List[Any] = [len(props)]
+    for key, value in props.items():
+        items.append(str(key))
+        items.append(None if value is None else str(value))
+    return items
+
+
+def decode_dict(items: List[Any]) -> Dict[str, Any]:
+    """Inverse of :func:`encode_dict`."""
+    result: Dict[str, Any] = {}
+    if not items:
+        return result
+    pairs = items[1:]
+    for pos in range(0, len(pairs) - 1, 2):
+        result[pairs[pos]] = pairs[pos + 1]
+    return result
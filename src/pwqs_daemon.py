@@ -0,0 +1,299 @@
+"""Resident daemon that keeps PipeWire state warm and serves it over a Unix socket.
+
+Requests and replies are single JSON lines: ``{"cmd": "sinks"}`` is answered
+with ``{"ok": true, "result": [...]}`` or ``{"ok": false, "error": "..."}``.
+``{"cmd": "batch", "commands": [["set_volume", [50, "0.5"]], ...]}`` applies
+several writes in one backend batch and returns an error (or ``null``) for each.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from backends import Backend, batch, get_backend
+from gui.snapshot import PipewireSnapshot
+from pipewire_parsers import get_current_sink, parse_card, parse_sinks
+from pw_client import Command, PipewireMonitor, current_monitor
+
+
+SOCKET_NAME = "pipewire-quick-settings.sock"
+SOCKET_ENV = "PWQS_SOCKET"
+
+
+def default_socket_path() -> str:
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    return os.path.join(_private_tmp_dir(), SOCKET_NAME)
+
+
+def _private_tmp_dir() -> str:
+    """Return ``/tmp/pipewire-quick-settings-<uid>``, created with mode 0700.
+
+    Refuses a directory that another user owns or that others can enter, so
+    nobody else can plant or reach the socket.
+    """
+    path = os.path.join("/tmp", f"pipewire-quick-settings-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} is not a private directory of the current user")
+    return path
+
+
+class LocalState:
+    """Answers queries from a :class:`PipewireSnapshot` in this process.
+
+    With a monitor the snapshot is rebuilt only when the monitor has applied
+    an update since the last query; without one it keeps the dump taken when
+    the state was created. A monitor that has exited, as ``pw-dump
+    --monitor`` does when PipeWire restarts, is started again on the next
+    query, which reads a one-shot dump if it cannot.
+    """
+
+    def __init__(self, monitor: Optional[PipewireMonitor] = None, backend: Optional[Backend] = None) -> None:
+        self.monitor = monitor
+        self.backend = backend or get_backend()
+        self.snapshot = PipewireSnapshot(monitor, backend=self.backend, keep_index=True)
+        self._lock = threading.Lock()
+        self._generation = monitor.generation if monitor is not None else None
+        self._sinks: Optional[List[Dict[str, Any]]] = None
+        self._current: Optional[Dict[str, Any]] = None
+        self._current_loaded = False
+
+    def __enter__(self) -> "LocalState":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the snapshot's reader threads; the backend stays open."""
+        self.snapshot.close()
+
+    def _sync(self) -> None:
+        monitor = self.monitor
+        if monitor is None:
+            return
+        if not monitor.running:
+            try:
+                monitor.start()
+            except OSError as exc:
+                print(f"Cannot restart pw-dump --monitor, reading pw-dump instead: {exc}", file=sys.stderr)
+        elif monitor.generation == self._generation:
+            return
+        # Without a running monitor the snapshot falls back to a one-shot dump.
+        generation = monitor.generation
+        self.snapshot.refresh()
+        self._generation = generation
+        self._sinks = None
+        self._current_loaded = False
+
+    def sinks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            if self._sinks is None:
+                self._sinks = parse_sinks(self.snapshot.index)
+            return self._sinks
+
+    def current_sink(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            if not self._current_loaded:
+                self._current = get_current_sink(self.snapshot.index)
+                self._current_loaded = True
+            return self._current
+
+    def card(self, card_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            return parse_card(self.snapshot.index, card_id)
+
+    def streams(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            return [asdict(stream) for stream in self.snapshot.streams]
+
+    def set_default_sink(self, sink_id: int) -> None:
+        self.backend.set_default_sink(sink_id)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self.backend.set_profile(card_id, profile_index)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self.backend.set_volume(sink_id, volume)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self.backend.set_mute(sink_id, mute)
+
+    def run_commands(self, commands: List[Command]) -> List[Optional[str]]:
+        """Apply several ``(name, args)`` writes in one backend batch."""
+        with batch(self.backend) as pending:
+            for name, args in commands:
+                pending.add(name, *args)
+        return pending.errors
+
+
+class DaemonClient:
+    """Talks to a running daemon; offers the same methods as :class:`LocalState`."""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 2.0) -> None:
+        self.path = path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.path)
+        except OSError:
+            self.sock.close()
+            raise
+        self._reader = self.sock.makefile("r", encoding="utf-8")
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._reader.close()
+        self.sock.close()
+
+    def request(self, cmd: str, **args: Any) -> Any:
+        self.sock.sendall((json.dumps({"cmd": cmd, **args}) + "\n").encode("utf-8"))
+        line = self._reader.readline()
+        if not line:
+            raise RuntimeError("PipeWire quick settings daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error") or f"Daemon request '{cmd}' failed")
+        return reply.get("result")
+
+    def sinks(self) -> List[Dict[str, Any]]:
+        return self.request("sinks")
+
+    def current_sink(self) -> Optional[Dict[str, Any]]:
+        return self.request("current-sink")
+
+    def card(self, card_id: int) -> Optional[Dict[str, Any]]:
+        return self.request("card", card_id=card_id)
+
+    def streams(self) -> List[Dict[str, Any]]:
+        return self.request("streams")
+
+    def set_default_sink(self, sink_id: int) -> None:
+        self.request("set-default-sink", sink_id=sink_id)
+
+    def set_profile(self, card_id: int, profile_index: int) -> None:
+        self.request("set-profile", card_id=card_id, profile_index=profile_index)
+
+    def set_volume(self, sink_id: int, volume: str) -> None:
+        self.request("set-volume", sink_id=sink_id, volume=volume)
+
+    def set_mute(self, sink_id: int, mute: bool | str) -> None:
+        self.request("set-mute", sink_id=sink_id, mute=mute)
+
+    def run_commands(self, commands: List[Command]) -> List[Optional[str]]:
+        return self.request("batch", commands=[[name, list(args)] for name, args in commands])
+
+
+def connect(path: Optional[str] = None) -> Optional[DaemonClient]:
+    """Return a client for the running daemon, or ``None`` if there is none."""
+    try:
+        return DaemonClient(path)
+    except OSError:
+        return None
+
+
+def load_state() -> DaemonClient | LocalState:
+    """Use the daemon when one is running, otherwise read PipeWire directly."""
+    client = connect()
+    if client is not None:
+        return client
+    return LocalState(current_monitor())
+
+
+_COMMANDS: Dict[str, Callable[..., Any]] = {
+    "ping": lambda _state: "pong",
+    "sinks": lambda state: state.sinks(),
+    "current-sink": lambda state: state.current_sink(),
+    "card": lambda state, card_id: state.card(int(card_id)),
+    "streams": lambda state: state.streams(),
+    "set-default-sink": lambda state, sink_id: state.set_default_sink(int(sink_id)),
+    "set-profile": lambda state, card_id, profile_index: state.set_profile(int(card_id), int(profile_index)),
+    "set-volume": lambda state, sink_id, volume: state.set_volume(int(sink_id), str(volume)),
+    "set-mute": lambda state, sink_id, mute: state.set_mute(int(sink_id), mute),
+    "batch": lambda state, commands: state.run_commands([(str(name), tuple(args)) for name, args in commands]),
+}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                handler = _COMMANDS.get(request.pop("cmd", None))
+                if handler is None:
+                    raise ValueError("Unknown command")
+                reply = {"ok": True, "result": handler(self.server.state, **request)}
+            except Exception as exc:
+                reply = {"ok": False, "error": str(exc)}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, state: LocalState) -> None:
+        self.state = state
+        super().__init__(path, _RequestHandler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+
+def serve(path: Optional[str] = None) -> None:
+    """Run the daemon in the foreground until interrupted."""
+    path = path or default_socket_path()
+    if os.path.exists(path):
+        probe = connect(path)
+        if probe is not None:
+            probe.close()
+            raise RuntimeError(f"A daemon is already listening on {path}")
+        os.unlink(path)
+
+    backend = get_backend()
+    monitor = backend.monitor()
+    if monitor is not None:
+        monitor.wait_ready(5.0)
+    server = _DaemonServer(path, LocalState(monitor, backend))
+    print(f"Serving PipeWire state on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if monitor is not None:
+            monitor.stop()
+        backend.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,135 @@
+"""Typed change events between two successive PipeWire snapshots.
+
+:meth:`gui.snapshot.PipewireSnapshot.apply` compares each refresh with the
+previous one and reports what changed as a list of these events, so the
+front ends can update only what they show of it. Sinks are compared by
+:func:`sink_fingerprint` first; an unchanged sink costs one tuple
+comparison and keeps its previous :class:`SinkItem`. Playback streams are
+compared as whole items and reported as added, removed or changed.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Union
+
+from models import ProfileItem, SinkItem, StreamItem
+
+
+# Sinks, devices and streams are identified by ``(remote, id)``: ids are per PipeWire instance.
+SinkKey = Tuple[Optional[str], int]
+DeviceKey = Tuple[Optional[str], int]
+StreamKey = Tuple[Optional[str], int]
+Fingerprint = Tuple[Any, ...]
+
+
+def sink_fingerprint(sink: SinkItem) -> Fingerprint:
+    """The fields of ``sink`` that can change while it exists; equal means unchanged."""
+    return (sink.description, sink.name, sink.device_id, sink.volume, sink.volume_linear, sink.mute)
+
+
+@dataclass(slots=True)
+class SinkAdded:
+    sink: SinkItem
+
+
+@dataclass(slots=True)
+class SinkRemoved:
+    sink: SinkItem
+
+
+@dataclass(slots=True)
+class SinkChanged:
+    """The description, name or device of a sink changed."""
+
+    old: SinkItem
+    sink: SinkItem
+
+
+@dataclass(slots=True)
+class VolumeChanged:
+    sink: SinkItem
+    old: Optional[float]
+    new: Optional[float]
+
+
+@dataclass(slots=True)
+class MuteChanged:
+    sink: SinkItem
+    old: Optional[bool]
+    new: Optional[bool]
+
+
+@dataclass(slots=True)
+class DefaultSinkChanged:
+    remote: Optional[str]
+    old: Optional[int]
+    new: Optional[int]
+
+
+@dataclass(slots=True)
+class ProfileChanged:
+    """The active profile of a device behind a sink changed."""
+
+    remote: Optional[str]
+    device_id: int
+    old: Optional[int]
+    new: Optional[int]
+
+
+@dataclass(slots=True)
+class ProfileListChanged:
+    """The profiles a device offers changed; ``profiles`` is the new list."""
+
+    remote: Optional[str]
+    device_id: int
+    profiles: List[ProfileItem]
+
+
+@dataclass(slots=True)
+class StreamAdded:
+    stream: StreamItem
+
+
+@dataclass(slots=True)
+class StreamRemoved:
+    stream: StreamItem
+
+
+@dataclass(slots=True)
+class StreamChanged:
+    """The volume, mute state or labels of a playback stream changed."""
+
+    old: StreamItem
+    stream: StreamItem
+
+
+SnapshotChange = Union[
+    SinkAdded,
+    SinkRemoved,
+    SinkChanged,
+    VolumeChanged,
+    MuteChanged,
+    DefaultSinkChanged,
+    ProfileChanged,
+    ProfileListChanged,
+    StreamAdded,
+    StreamRemoved,
+    StreamChanged,
+]
+
+# Changes to the sink list itself, as opposed to the controls of one sink.
+SINK_LIST_CHANGES = (SinkAdded, SinkRemoved, SinkChanged, DefaultSinkChanged)
+# Changes the stream mixer has to show.
+STREAM_CHANGES = (StreamAdded, StreamRemoved, StreamChanged)
+
+
+def diff_sink(old: SinkItem, new: SinkItem) -> List[SnapshotChange]:
+    """The events that turn ``old`` into ``new``, two states of the same sink."""
+    changes: List[SnapshotChange] = []
+    if (old.description, old.name, old.device_id) != (new.description, new.name, new.device_id):
+        changes.append(SinkChanged(old, new))
+    if old.volume != new.volume or old.volume_linear != new.volume_linear:
+        changes.append(VolumeChanged(new, old.volume, new.volume))
+    if old.mute != new.mute:
+        changes.append(MuteChanged(new, old.mute, new.mute))
+    return changes
@@ -0,0 +1,200 @@
+"""Optional timing spans written in Chrome trace event format.
+
+Set ``PWQS_TRACE`` to a file name (or pass ``--trace FILE``) and every span
+recorded during the session is streamed there; open the file in Perfetto or
+``chrome://tracing``. Events are buffered in small batches and the file is
+flushed at exit, including on ``SIGTERM`` and ``SIGHUP``. A trace cut short
+by a crash lacks the closing bracket, which both viewers accept. When
+tracing is off, :func:`span` and :func:`traced` cost one global lookup per
+call.
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar, cast
+
+
+TRACE_ENV = "PWQS_TRACE"
+# Events held in memory before they are written out.
+FLUSH_EVERY = 64
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """Streams complete (``"ph": "X"``) events to ``path`` as a JSON array."""
+
+    def __init__(self, path: str, flush_every: int = FLUSH_EVERY) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self._pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+        self._threads: Dict[int, str] = {}
+        self._pending: List[str] = []
+        self._written = 0
+        self._lock = threading.Lock()
+        self._file: Optional[Any] = open(path, "w", encoding="utf-8")
+        self._file.write("[")
+
+    def now(self) -> int:
+        return time.perf_counter_ns()
+
+    def complete(self, name: str, cat: str, start_ns: int, args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a span named ``name`` from ``start_ns`` until now."""
+        end_ns = time.perf_counter_ns()
+        thread = threading.current_thread()
+        tid = thread.native_id or thread.ident or 0
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if tid not in self._threads:
+                self._threads[tid] = thread.name
+                metadata = {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": thread.name}}
+                self._pending.append(json.dumps(metadata))
+            self._pending.append(json.dumps(event, default=str))
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write the buffered events to the file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._file is None or not self._pending:
+            return
+        separator = ",\n" if self._written else "\n"
+        self._file.write(separator + ",\n".join(self._pending))
+        self._file.flush()
+        self._written += len(self._pending)
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Write the remaining events and terminate the array."""
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None:
+                self._file.write("\n]\n")
+                self._file.close()
+                self._file = None
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def start(path: str) -> Tracer:
+    """Start streaming spans to ``path``; the file is completed at exit."""
+    global _TRACER
+    if _TRACER is None:
+        _TRACER = Tracer(path)
+        atexit.register(_TRACER.close)
+        _exit_on_signals()
+    return _TRACER
+
+
+def _exit_on_signals() -> None:
+    """Turn ``SIGTERM``/``SIGHUP`` into a normal exit so the atexit flush runs.
+
+    Handlers the application installed itself are left alone; signals can
+    only be hooked from the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for signum in (signal.SIGTERM, signal.SIGHUP):
+        if signal.getsignal(signum) == signal.SIG_DFL:
+            signal.signal(signum, _raise_exit)
+
+
+def _raise_exit(signum: int, _frame: Any) -> None:
+    raise SystemExit(128 + signum)
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = self.tracer.now()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.tracer.complete(self.name, self.cat, self.start, self.args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, cat: str = "app", **args: Any) -> Any:
+    """Context manager timing the enclosed block as one event."""
+    tracer = _TRACER
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def record(name: str, start_ns: int, cat: str = "app", **args: Any) -> None:
+    """Record a span from ``start_ns`` (a ``time.perf_counter_ns()`` value) until now."""
+    tracer = _TRACER
+    if tracer is not None:
+        tracer.complete(name, cat, start_ns, args)
+
+
+def traced(name: Optional[str] = None, cat: str = "app") -> Callable[[F], F]:
+    """Decorator timing each call of the function as one event."""
+
+    def decorate(func: F) -> F:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+            started = tracer.now()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.complete(label, cat, started)
+
+        return cast(F, wrapper)
+
+    return decorate
+
+
+if os.environ.get(TRACE_ENV):
+    start(os.environ[TRACE_ENV])
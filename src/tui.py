@@ -0,0 +1,361 @@
+"""Full-screen terminal interface for ``--mode tui``.
+
+One live screen shows the sinks with their volume and mute state and the
+profiles of the selected sink. State comes from the monitor when there is
+one, so key presses never wait for ``pw-dump``: volume keys fade through a
+:class:`VolumeRamp` and are shown at once, and the screen is rebuilt only
+when PipeWire reports a change. :class:`ScreenBuffer` remembers what is on
+screen and rewrites only the cells that differ, which keeps the terminal
+traffic small over slow SSH links.
+
+With several remotes the sinks of every PipeWire instance are listed
+together, each labelled with its remote, and changes go to the instance
+the selected sink lives on.
+"""
+from __future__ import annotations
+
+import curses
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backends import Backend, configured_remotes, get_backend
+from gui.snapshot import PipewireSnapshot
+from models import ProfileItem, SinkItem
+from pw_client import PipewireMonitor, write_async
+from volume_ramp import VolumeRamp
+from volume_writer import VolumeWriter
+
+
+VOLUME_STEP = 0.05
+MAX_VOLUME = 1.5
+BAR_WIDTH = 20
+# How long ``getch`` waits before the loop checks for PipeWire updates.
+POLL_TIMEOUT_MS = 100
+
+HELP = "up/down select  left/right volume  m mute  enter apply  tab sinks/profiles  r refresh  q quit"
+
+Line = Tuple[str, int]
+SinkKey = Tuple[Optional[str], int]
+
+
+class ScreenBuffer:
+    """Draws lists of ``(text, attr)`` rows, writing only the cells that changed."""
+
+    def __init__(self, window: Any) -> None:
+        self.window = window
+        self.rows: List[Line] = []
+
+    def invalidate(self) -> None:
+        """Forget the screen contents, e.g. after a resize."""
+        self.rows = []
+        self.window.erase()
+
+    def draw(self, lines: List[Line]) -> int:
+        """Bring the screen up to date with ``lines``; return how many rows changed."""
+        height, width = self.window.getmaxyx()
+        # Writing the bottom-right cell moves the cursor off screen, which curses reports as an error.
+        width = max(width - 1, 0)
+        rows = [(text[:width], attr) for text, attr in lines[:height]]
+        changed = 0
+        for y, (text, attr) in enumerate(rows):
+            old = self.rows[y] if y < len(self.rows) else None
+            if old == (text, attr):
+                continue
+            changed += 1
+            start = 0
+            if old is not None and old[1] == attr:
+                old_text = old[0]
+                limit = min(len(old_text), len(text))
+                while start < limit and old_text[start] == text[start]:
+                    start += 1
+                if len(old_text) == len(text):
+                    end = len(text)
+                    while end > start and old_text[end - 1] == text[end - 1]:
+                        end -= 1
+                    self.window.addstr(y, start, text[start:end], attr)
+                    continue
+            self.window.addstr(y, start, text[start:], attr)
+            self.window.clrtoeol()
+        for y in range(len(rows), min(len(self.rows), height)):
+            self.window.move(y, 0)
+            self.window.clrtoeol()
+            changed += 1
+        self.rows = rows
+        self.window.noutrefresh()
+        curses.doupdate()
+        return changed
+
+
+def volume_bar(volume: Optional[float], width: int = BAR_WIDTH) -> str:
+    """Render ``volume`` as ``[####----] 50%``; 100% fills the bar."""
+    if volume is None:
+        return "[" + "?" * width + "]    ?"
+    filled = round(min(max(volume, 0.0), 1.0) * width)
+    return f"[{'#' * filled}{'-' * (width - filled)}] {round(volume * 100):>3}%"
+
+
+class Tui:
+    """The state and key handling of the live screen."""
+
+    def __init__(
+        self,
+        window: Any,
+        backend: Backend,
+        monitor: Optional[PipewireMonitor],
+        remotes: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.window = window
+        self.backend = backend
+        self.monitor = monitor
+        self.screen = ScreenBuffer(window)
+        self.snapshot = PipewireSnapshot(monitor, backend=backend, remotes=remotes)
+        # Every remote gets its own monitor, so changes on any of them show up;
+        # those of the other remotes stop when the snapshot closes their backends.
+        self.monitors: List[PipewireMonitor] = [monitor] if monitor is not None else []
+        for remote, remote_backend in self.snapshot.backends.items():
+            if remote_backend is backend:
+                continue
+            remote_monitor = remote_backend.monitor()
+            if remote_monitor is not None:
+                self.snapshot.add_monitor(remote_monitor)
+                self.monitors.append(remote_monitor)
+        # Sink ids are per instance, so every remote gets its own writer and ramp.
+        self.ramps: Dict[Optional[str], VolumeRamp] = {
+            remote: VolumeRamp(
+                VolumeWriter(run_commands=remote_backend.run_commands, on_written=self._on_volume_written),
+                mute=remote_backend.set_mute,
+            )
+            for remote, remote_backend in self.snapshot.backends.items()
+        }
+        # Volumes set from the keyboard, shown until the writer has sent them.
+        self.pending_volume: Dict[SinkKey, float] = {}
+        self.focus = "sinks"
+        self.sink_pos = self._default_position()
+        self.profile_pos = 0
+        self.message = ""
+        self._changed = threading.Event()
+        self._dirty = True
+        for each in self.monitors:
+            each.add_listener(self._changed.set)
+        self._show_failures()
+
+    def _default_position(self) -> int:
+        for pos, sink in enumerate(self.snapshot.sinks):
+            if self.is_default(sink):
+                return pos
+        return 0
+
+    def is_default(self, sink: SinkItem) -> bool:
+        return sink.id == self.snapshot.default_sink_by_remote.get(sink.remote)
+
+    def _on_volume_written(self, _sink_id: int, _volume: float) -> None:
+        """Called on the writer thread after each volume write."""
+        self._changed.set()
+
+    def _write(self, future: "Future[Any]") -> None:
+        def _done(done: "Future[Any]") -> None:
+            exc = done.exception()
+            if exc is not None:
+                self.message = f"PipeWire write failed: {exc}"
+                self._dirty = True
+            self._changed.set()
+
+        future.add_done_callback(_done)
+
+    def selected_sink(self) -> Optional[SinkItem]:
+        sinks = self.snapshot.sinks
+        if not sinks:
+            return None
+        self.sink_pos = min(self.sink_pos, len(sinks) - 1)
+        return sinks[self.sink_pos]
+
+    def profiles(self) -> Tuple[List[ProfileItem], Optional[int]]:
+        sink = self.selected_sink()
+        if sink is None:
+            return [], None
+        return self.snapshot.get_profiles(sink.id, sink.remote)
+
+    def refresh(self) -> None:
+        # Redraw only if the snapshot reports a change or a pending volume is done.
+        if self.snapshot.refresh():
+            self._dirty = True
+        for remote, sink_id in list(self.pending_volume):
+            ramp = self.ramps[remote]
+            if not ramp.busy(sink_id) and not ramp.writer.busy(sink_id):
+                del self.pending_volume[(remote, sink_id)]
+                self._dirty = True
+        self._show_failures()
+
+    def _show_failures(self) -> None:
+        """Put an unreadable remote or a stopped monitor on the status line."""
+        # The sinks of a remote that could not be read drop out of the list; say why.
+        failed = next(iter(self.snapshot.remote_errors.items()), None)
+        if failed is not None:
+            message = f"PipeWire remote {failed[0] or 'default'} unavailable: {failed[1]}"
+            if self.message != message:
+                self.message = message
+                self._dirty = True
+            return
+        stopped = [each for each in self.monitors if not each.running]
+        if stopped:
+            remote = stopped[0].remote
+            where = f" for {remote}" if remote and len(self.snapshot.remotes) > 1 else ""
+            self.message = f"pw-dump --monitor{where} exited; press r to reload"
+            self._dirty = True
+
+    def render(self) -> List[Line]:
+        lines: List[Line] = [("PipeWire Quick Settings", curses.A_BOLD), ("", 0)]
+        sinks = self.snapshot.sinks
+        sinks_title = "Output sinks" + ("" if self.focus != "sinks" else " <")
+        lines.append((sinks_title, curses.A_UNDERLINE))
+        labels = [self._sink_label(sink) for sink in sinks]
+        name_width = max((len(label) for label in labels), default=0)
+        name_width = min(max(name_width, 10), 40)
+        for pos, (sink, label) in enumerate(zip(sinks, labels)):
+            default = "*" if self.is_default(sink) else " "
+            volume = self.pending_volume.get((sink.remote, sink.id), sink.volume)
+            mute = " muted" if sink.mute else ""
+            text = f"{default} {label[:name_width]:<{name_width}}  {volume_bar(volume)}{mute}"
+            attr = curses.A_BOLD if default == "*" else 0
+            if self.focus == "sinks" and pos == self.sink_pos:
+                attr |= curses.A_REVERSE
+            lines.append((text, attr))
+        if not sinks:
+            lines.append(("  No sinks found", curses.A_DIM))
+
+        lines.append(("", 0))
+        lines.append(("Profiles" + ("" if self.focus != "profiles" else " <"), curses.A_UNDERLINE))
+        profiles, active = self.profiles()
+        self.profile_pos = min(self.profile_pos, max(len(profiles) - 1, 0))
+        for pos, profile in enumerate(profiles):
+            marker = "*" if profile.index == active else " "
+            attr = curses.A_BOLD if marker == "*" else 0
+            if self.focus == "profiles" and pos == self.profile_pos:
+                attr |= curses.A_REVERSE
+            lines.append((f"{marker} {profile.display_name}", attr))
+        if not profiles:
+            lines.append(("  No profiles", curses.A_DIM))
+
+        lines.append(("", 0))
+        lines.append((HELP, curses.A_DIM))
+        if self.message:
+            lines.append((self.message, curses.A_BOLD))
+        return lines
+
+    def _sink_label(self, sink: SinkItem) -> str:
+        if len(self.snapshot.remotes) > 1:
+            return f"{sink.display_name} @{sink.remote or 'default'}"
+        return sink.display_name
+
+    def change_volume(self, delta: float) -> None:
+        sink = self.selected_sink()
+        if sink is None:
+            return
+        key = (sink.remote, sink.id)
+        current = self.pending_volume.get(key, sink.volume)
+        if current is None:
+            self.message = "Volume unavailable"
+            return
+        volume = round(min(max(current + delta, 0.0), MAX_VOLUME), 2)
+        self.pending_volume[key] = volume
+        ramp = self.ramps[sink.remote]
+        start = ramp.current(sink.id)
+        ramp.ramp(sink.id, current if start is None else start, volume)
+
+    def activate(self) -> None:
+        sink = self.selected_sink()
+        if sink is None:
+            return
+        backend = self.snapshot.backend_for(sink.remote)
+        if self.focus == "sinks":
+            self._write(write_async(backend.set_default_sink, sink.id))
+            return
+        profiles, _active = self.profiles()
+        if sink.device_id is not None and profiles:
+            profile = profiles[self.profile_pos]
+            self._write(write_async(backend.set_profile, sink.device_id, profile.index))
+
+    def move(self, delta: int) -> None:
+        if self.focus == "sinks":
+            count = len(self.snapshot.sinks)
+            if count:
+                self.sink_pos = (self.sink_pos + delta) % count
+                self.profile_pos = 0
+        else:
+            count = len(self.profiles()[0])
+            if count:
+                self.profile_pos = (self.profile_pos + delta) % count
+
+    def handle_key(self, key: int) -> bool:
+        """Apply one key press; return ``False`` to quit."""
+        self.message = ""
+        if key == ord("q"):
+            return False
+        if key in (curses.KEY_UP, ord("k")):
+            self.move(-1)
+        elif key in (curses.KEY_DOWN, ord("j")):
+            self.move(1)
+        elif key in (curses.KEY_LEFT, ord("h"), ord("-")):
+            self.change_volume(-VOLUME_STEP)
+        elif key in (curses.KEY_RIGHT, ord("l"), ord("+")):
+            self.change_volume(VOLUME_STEP)
+        elif key == ord("m"):
+            sink = self.selected_sink()
+            if sink is not None:
+                self._write(write_async(self.snapshot.backend_for(sink.remote).set_mute, sink.id, "toggle"))
+        elif key in (curses.KEY_ENTER, 10, 13, ord(" ")):
+            self.activate()
+        elif key == 9:
+            self.focus = "profiles" if self.focus == "sinks" else "sinks"
+        elif key == ord("r"):
+            self._changed.set()
+        elif key == curses.KEY_RESIZE:
+            self.screen.invalidate()
+        self._dirty = True
+        return True
+
+    def loop(self) -> int:
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.window.timeout(POLL_TIMEOUT_MS)
+        try:
+            while True:
+                if self._changed.is_set():
+                    self._changed.clear()
+                    self.refresh()
+                if self._dirty:
+                    self._dirty = False
+                    self.screen.draw(self.render())
+                key = self.window.getch()
+                if key != -1 and not self.handle_key(key):
+                    return 0
+        finally:
+            for each in self.monitors:
+                each.remove_listener(self._changed.set)
+            for ramp in self.ramps.values():
+                ramp.wait(timeout=1.0)
+                ramp.close()
+                ramp.writer.flush(timeout=2.0)
+                ramp.writer.close()
+            self.snapshot.close()
+
+
+def run(backend: Optional[Backend] = None, remotes: Optional[Sequence[str]] = None) -> int:
+    """Show the live screen until the user quits; return a process exit code.
+
+    ``remotes`` defaults to the instances named in ``PWQS_REMOTES``.
+    """
+    backend = backend or get_backend()
+    remotes = remotes if remotes is not None else configured_remotes()
+    monitor = backend.monitor()
+    try:
+        return curses.wrapper(lambda window: Tui(window, backend, monitor, remotes).loop())
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if monitor is not None:
+            monitor.stop()
+        backend.close()
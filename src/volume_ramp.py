@@ -0,0 +1,213 @@
+"""Volume fades written at a fixed frame rate through a :class:`VolumeWriter`."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from pw_client import set_mute
+from volume_writer import VolumeWriter
+
+
+DEFAULT_DURATION = 0.3
+
+
+class _Ramp:
+    __slots__ = ("start", "target", "started", "duration", "on_start", "on_done")
+
+    def __init__(
+        self,
+        start: float,
+        target: float,
+        duration: float,
+        on_start: Optional[Callable[[], None]],
+        on_done: Optional[Callable[[], None]],
+    ) -> None:
+        self.start = start
+        self.target = target
+        self.started: Optional[float] = None
+        self.duration = duration
+        self.on_start = on_start
+        self.on_done = on_done
+
+    def value_at(self, now: float) -> float:
+        if self.started is None or self.duration <= 0:
+            return self.start if self.started is None else self.target
+        progress = min((now - self.started) / self.duration, 1.0)
+        return self.start + (self.target - self.start) * progress
+
+    def finished(self, now: float) -> bool:
+        return self.started is not None and now - self.started >= self.duration
+
+
+class VolumeRamp:
+    """Fades sink volumes, one frame every ``1 / frame_rate`` seconds.
+
+    Volumes are on the cube-root user scale that :func:`parse_sinks` reports
+    and ``wpctl`` accepts, so fades sound even. Every frame goes through
+    ``writer`` as one batched write covering all the sinks being faded.
+    Starting a ramp on a sink that is already ramping cancels the old ramp,
+    without running its ``on_done``, and continues from the volume it had reached.
+    Callbacks run on the ramp thread.
+    """
+
+    def __init__(
+        self,
+        writer: VolumeWriter,
+        frame_rate: float = 20.0,
+        mute: Callable[[int, bool | str], None] = set_mute,
+    ) -> None:
+        self.writer = writer
+        self.frame_interval = 1.0 / frame_rate if frame_rate > 0 else 0.0
+        self._mute = mute
+        self._ramps: Dict[int, _Ramp] = {}
+        self._current: Dict[int, float] = {}
+        # Finished ramps whose ``on_done`` is still running.
+        self._finishing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="volume-ramp", daemon=True)
+        self._thread.start()
+
+    def ramp(
+        self,
+        sink_id: int,
+        start: float,
+        target: float,
+        duration: float = DEFAULT_DURATION,
+        on_start: Optional[Callable[[], None]] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Fade ``sink_id`` from ``start`` (or where a running ramp is) to ``target``."""
+        with self._cond:
+            if sink_id in self._ramps:
+                start = self._current.get(sink_id, start)
+            self._ramps[sink_id] = _Ramp(start, target, duration, on_start, on_done)
+            self._cond.notify_all()
+
+    def fade_mute(
+        self,
+        sink_id: int,
+        mute: bool,
+        volume: float,
+        duration: float = DEFAULT_DURATION,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Fade out and then mute, or unmute at zero and fade in, around ``volume``.
+
+        Reversing a fade that is still running continues from the volume it
+        had reached, over the share of ``duration`` that distance takes; the
+        sink is then not muted yet, so unmuting does not drop it to zero first.
+        """
+        with self._cond:
+            running = self._ramps.get(sink_id)
+            reached = self._current.get(sink_id, running.start) if running is not None else None
+        if reached is not None and volume > 0:
+            remaining = reached if mute else volume - reached
+            duration *= min(max(remaining, 0.0) / volume, 1.0)
+
+        if mute:
+
+            def _mute() -> None:
+                self.writer.flush(timeout=1.0)
+                self._mute(sink_id, True)
+                # Leave the volume where it was so unmuting restores it.
+                self.writer.submit(sink_id, volume)
+                if on_done is not None:
+                    on_done()
+
+            self.ramp(sink_id, volume if reached is None else reached, 0.0, duration, on_done=_mute)
+        else:
+
+            def _unmute() -> None:
+                if reached is None:
+                    # Muted at its old volume: start the fade from silence.
+                    self.writer.submit(sink_id, 0.0)
+                    self.writer.flush(timeout=1.0)
+                self._mute(sink_id, False)
+
+            self.ramp(sink_id, 0.0 if reached is None else reached, volume, duration, on_start=_unmute, on_done=on_done)
+
+    def cancel(self, sink_id: int) -> None:
+        """Stop ramping ``sink_id`` where it is; its ``on_done`` is not run."""
+        with self._cond:
+            self._ramps.pop(sink_id, None)
+            self._current.pop(sink_id, None)
+            self._cond.notify_all()
+
+    def current(self, sink_id: int) -> Optional[float]:
+        """The volume last written by a ramp still running on ``sink_id``."""
+        with self._cond:
+            return self._current.get(sink_id) if sink_id in self._ramps else None
+
+    def busy(self, sink_id: Optional[int] = None) -> bool:
+        with self._cond:
+            if sink_id is None:
+                return bool(self._ramps) or self._finishing > 0
+            return sink_id in self._ramps
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every ramp has finished."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._ramps or self._finishing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Stop the ramp thread; running ramps are abandoned."""
+        with self._cond:
+            self._closed = True
+            self._ramps.clear()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        next_frame = 0.0
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._ramps:
+                        self._cond.wait()
+                        continue
+                    remaining = next_frame - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                starting = {ramp for ramp in self._ramps.values() if ramp.started is None}
+            for ramp in starting:
+                if ramp.on_start is not None:
+                    ramp.on_start()
+
+            with self._cond:
+                now = time.monotonic()
+                next_frame = now + self.frame_interval
+                frames: Dict[int, float] = {}
+                finished = []
+                for sink_id, ramp in list(self._ramps.items()):
+                    if ramp.started is None:
+                        if ramp not in starting:
+                            # Replaced while on_start ran; it starts next frame.
+                            continue
+                        ramp.started = now
+                    value = ramp.value_at(now)
+                    frames[sink_id] = value
+                    self._current[sink_id] = value
+                    if ramp.finished(now):
+                        del self._ramps[sink_id]
+                        self._current.pop(sink_id, None)
+                        finished.append(ramp)
+                self._finishing += len(finished)
+
+            if frames:
+                self.writer.submit_many(frames)
+            for ramp in finished:
+                if ramp.on_done is not None:
+                    ramp.on_done()
+            with self._cond:
+                self._finishing -= len(finished)
+                self._cond.notify_all()
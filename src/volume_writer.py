@@ -0,0 +1,129 @@
+"""Coalescing volume writes so rapid changes do not spawn a process each."""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from pw_client import Command
+
+
+class VolumeWriter:
+    """Writes sink volumes on a background thread, latest value wins.
+
+    Values submitted while a write is in flight replace each other, so at most
+    one write per sink is running and only the newest value is sent next. Each
+    sink is written at most ``max_writes_per_second`` times per second.
+
+    The sinks that are due together are written in one ``run_commands`` call,
+    normally :meth:`Backend.run_commands`, which the ``cli`` and ``native``
+    backends send over one persistent connection instead of a ``wpctl`` each.
+    """
+
+    def __init__(
+        self,
+        max_writes_per_second: float = 20.0,
+        run_commands: Optional[Callable[[List[Command]], List[Optional[str]]]] = None,
+        on_written: Optional[Callable[[int, float], None]] = None,
+    ) -> None:
+        if run_commands is None:
+            from backends import get_backend
+
+            run_commands = get_backend().run_commands
+        self.min_interval = 1.0 / max_writes_per_second if max_writes_per_second > 0 else 0.0
+        self._run_commands = run_commands
+        self._on_written = on_written
+        self._pending: Dict[int, float] = {}
+        self._last_write: Dict[int, float] = {}
+        self._in_flight: Set[int] = set()
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="volume-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sink_id: int, volume: float) -> None:
+        """Queue ``volume`` for ``sink_id``, replacing any value not yet written."""
+        with self._cond:
+            self._pending[sink_id] = volume
+            self._cond.notify()
+
+    def submit_many(self, volumes: Dict[int, float]) -> None:
+        """Queue several sinks at once, so they go out in the same write."""
+        with self._cond:
+            self._pending.update(volumes)
+            self._cond.notify()
+
+    def busy(self, sink_id: Optional[int] = None) -> bool:
+        """Return whether a write is queued or running (for ``sink_id`` if given)."""
+        with self._cond:
+            if sink_id is None:
+                return bool(self._pending) or bool(self._in_flight)
+            return sink_id in self._pending or sink_id in self._in_flight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued value has been written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """Stop the writer thread once the queue is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _ready(self, now: float) -> Tuple[List[int], float]:
+        """Return the sinks that may be written now, or how long to wait."""
+        ready: List[int] = []
+        wait = float("inf")
+        for sink_id in self._pending:
+            ready_at = self._last_write.get(sink_id, float("-inf")) + self.min_interval
+            if ready_at <= now:
+                ready.append(sink_id)
+            else:
+                wait = min(wait, ready_at - now)
+        return ready, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending:
+                        if self._closed:
+                            return
+                        self._cond.wait()
+                        continue
+                    ready, wait = self._ready(time.monotonic())
+                    if ready:
+                        break
+                    self._cond.wait(wait)
+                volumes = {sink_id: self._pending.pop(sink_id) for sink_id in ready}
+                self._in_flight = set(volumes)
+
+            commands: List[Command] = [
+                ("set_volume", (sink_id, f"{volume:.4f}")) for sink_id, volume in volumes.items()
+            ]
+            try:
+                errors = self._run_commands(commands)
+            except Exception as exc:  # pragma: no cover - keep the writer alive
+                errors = [str(exc)] * len(commands)
+            for sink_id, error in zip(volumes, errors):
+                if error is not None:
+                    print(f"Failed to set volume for sink {sink_id}: {error}", file=sys.stderr)
+
+            with self._cond:
+                written = time.monotonic()
+                for sink_id in volumes:
+                    self._last_write[sink_id] = written
+                self._in_flight = set()
+                self._cond.notify_all()
+
+            if self._on_written is not None:
+                for sink_id, volume in volumes.items():
+                    self._on_written(sink_id, volume)
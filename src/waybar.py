@@ -0,0 +1,98 @@
+"""Status output for a waybar ``custom`` module.
+
+Run with ``--mode waybar`` and configure the module with ``"return-type":
+"json"``. A line is printed only when the default sink, its volume or its mute
+state changes; between updates the process sleeps on the monitor.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from typing import Any, Dict, Optional, TextIO
+
+from backends import Backend, get_backend
+from pipewire_parsers import get_current_sink
+from pw_client import PipewireMonitor
+
+
+# How often to check that ``pw-dump --monitor`` is still alive while idle.
+LIVENESS_INTERVAL = 5.0
+# Only these objects can change the default sink, its volume or its mute state.
+RELEVANT_TYPES = frozenset({"PipeWire:Interface:Node", "PipeWire:Interface:Metadata"})
+
+
+def status(sink: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the waybar JSON object for the current default sink."""
+    if sink is None:
+        return {"text": "", "tooltip": "No default sink", "class": "disconnected"}
+
+    description = sink.get("description") or sink.get("name") or f"Sink {sink['id']}"
+    volume = sink.get("volume")
+    percentage = round(volume * 100) if volume is not None else None
+    muted = bool(sink.get("mute"))
+
+    text = f"{percentage}%" if percentage is not None else "?"
+    tooltip = f"{description}\nVolume: {text}"
+    if muted:
+        tooltip += " (muted)"
+    result: Dict[str, Any] = {"text": text, "tooltip": tooltip, "class": "muted" if muted else ""}
+    if percentage is not None:
+        result["percentage"] = percentage
+    return result
+
+
+def error_status(message: str) -> Dict[str, Any]:
+    """Build the waybar JSON object shown when PipeWire cannot be read."""
+    return {"text": "", "tooltip": message, "class": "error"}
+
+
+def run(
+    monitor: Optional[PipewireMonitor] = None,
+    out: TextIO = sys.stdout,
+    backend: Optional[Backend] = None,
+) -> int:
+    """Print status lines until the monitor exits; return a process exit code.
+
+    Without ``monitor``, the one of ``backend`` (the shared backend, with the
+    configured ``--backend`` and ``--remote``) is used.
+    """
+    if monitor is None:
+        backend = backend or get_backend()
+        monitor = backend.monitor()
+        if monitor is None:
+            where = f" for {backend.remote}" if backend.remote else ""
+            message = f"Cannot start pw-dump --monitor{where} with the {backend.name} backend"
+            out.write(json.dumps(error_status(message)) + "\n")
+            out.flush()
+            return 1
+    changed = threading.Event()
+
+    def _on_update() -> None:
+        if monitor.last_update_types & RELEVANT_TYPES:
+            changed.set()
+
+    monitor.add_listener(_on_update)
+    if monitor.wait_ready(0):
+        changed.set()
+    last_line: Optional[str] = None
+    try:
+        while True:
+            if not changed.wait(LIVENESS_INTERVAL):
+                if not monitor.running:
+                    print("pw-dump --monitor exited", file=sys.stderr)
+                    out.write(json.dumps(error_status("pw-dump --monitor exited")) + "\n")
+                    out.flush()
+                    return 1
+                continue
+            changed.clear()
+            line = json.dumps(status(get_current_sink(monitor.dump())))
+            if line != last_line:
+                last_line = line
+                out.write(line + "\n")
+                out.flush()
+    except (KeyboardInterrupt, BrokenPipeError):
+        return 0
+    finally:
+        monitor.remove_listener(_on_update)
+        monitor.stop()
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+# The synthetic graphs in benchmarks/fixtures.py double as test data.
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,75 @@
+"""iter_objects against json.loads on the benchmark fixtures."""
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any, Collection, Dict, List, Optional
+
+import pytest
+
+from dump_decoder import iter_objects, prune_params
+from fixtures import DEVICE, NODE, make_scale
+from pipewire_parsers import PARSED_PARAMS, PARSED_TYPES
+
+
+FILTERS = [
+    pytest.param(None, None, id="unfiltered"),
+    pytest.param(PARSED_TYPES, None, id="types"),
+    pytest.param(None, PARSED_PARAMS, id="params"),
+    pytest.param(PARSED_TYPES, PARSED_PARAMS, id="parsed"),
+    pytest.param({NODE}, {"Props"}, id="nodes-props"),
+    pytest.param({DEVICE}, set(), id="devices-no-params"),
+]
+
+
+def _expected(
+    dump: List[Dict[str, Any]],
+    types: Optional[Collection[str]],
+    params: Optional[Collection[str]],
+) -> List[Dict[str, Any]]:
+    loaded = json.loads(json.dumps(dump))
+    return [prune_params(obj, params) for obj in loaded if types is None or obj.get("type") in types]
+
+
+@pytest.mark.parametrize("scale", ["10", "1k"])
+@pytest.mark.parametrize("types, params", FILTERS)
+def test_matches_json_loads_on_pw_dump_layout(scale: str, types: Any, params: Any) -> None:
+    dump = make_scale(scale)
+    lines = json.dumps(dump, indent=2).splitlines(keepends=True)
+
+    assert list(iter_objects(lines, types, params)) == _expected(dump, types, params)
+
+
+@pytest.mark.parametrize("indent", [None, 4, "\t"], ids=["compact", "indent-4", "tabs"])
+@pytest.mark.parametrize("types, params", FILTERS)
+def test_matches_json_loads_on_other_layouts(indent: Any, types: Any, params: Any) -> None:
+    dump = make_scale("10")
+    lines = json.dumps(dump, indent=indent).splitlines(keepends=True)
+
+    assert list(iter_objects(lines, types, params)) == _expected(dump, types, params)
+
+
+def test_skipped_params_keep_the_object_valid() -> None:
+    # A dropped param in the middle of info.params must not leave a stray comma.
+    dump = [
+        {
+            "id": 1,
+            "type": NODE,
+            "info": {"params": {"EnumFormat": [{"a": 1}], "Props": [{"volume": 1.0}], "PropInfo": [{"b": [2]}]}},
+        }
+    ]
+    lines = json.dumps(dump, indent=2).splitlines(keepends=True)
+
+    assert list(iter_objects(lines, None, {"Props"})) == [
+        {"id": 1, "type": NODE, "info": {"params": {"Props": [{"volume": 1.0}]}}}
+    ]
+
+
+def test_prune_params_copy_leaves_the_object_alone() -> None:
+    obj = {"id": 1, "info": {"params": {"Props": [], "EnumFormat": []}}}
+    original = copy.deepcopy(obj)
+
+    pruned = prune_params(obj, {"Props"}, copy=True)
+
+    assert pruned["info"]["params"] == {"Props": []}
+    assert obj == original
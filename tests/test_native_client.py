@@ -0,0 +1,195 @@
+"""NativeClient against the in-process FakePipewireServer."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+import pw_client
+from pw_native import NativeClient, NativeProtocolError, PipelineInterrupted
+from pw_native.fake_server import FakePipewireServer
+
+
+NODE = "PipeWire:Interface:Node"
+DEVICE = "PipeWire:Interface:Device"
+METADATA = "PipeWire:Interface:Metadata"
+
+
+def _profile(index: int, name: str, description: str) -> Dict[str, Any]:
+    return {"index": index, "name": name, "description": description, "available": "yes", "priority": index}
+
+
+def _sink(obj_id: int, name: str, volume: float, mute: bool) -> Dict[str, Any]:
+    return {
+        "id": obj_id,
+        "type": NODE,
+        "version": 3,
+        "info": {
+            "state": "idle",
+            "props": {"node.name": name, "node.description": name.title(), "media.class": "Audio/Sink", "device.id": 40},
+            "params": {"Props": [{"volume": 1.0, "mute": mute, "channelVolumes": [volume, volume]}]},
+        },
+    }
+
+
+def make_dump() -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": 40,
+            "type": DEVICE,
+            "version": 3,
+            "info": {
+                "props": {"device.name": "card", "device.description": "Card"},
+                "params": {
+                    "EnumProfile": [_profile(0, "off", "Off"), _profile(1, "stereo", "Analog Stereo")],
+                    "Profile": [_profile(1, "stereo", "Analog Stereo")],
+                },
+            },
+        },
+        _sink(50, "speakers", 0.125, False),
+        _sink(51, "hdmi", 1.0, True),
+        {
+            "id": 30,
+            "type": METADATA,
+            "version": 3,
+            "props": {"metadata.name": "default"},
+            "metadata": [
+                {"subject": 0, "key": "default.audio.sink", "type": "Spa:String:JSON", "value": {"name": "speakers"}},
+            ],
+        },
+    ]
+
+
+@pytest.fixture
+def server() -> Iterator[FakePipewireServer]:
+    with FakePipewireServer(make_dump()) as fake:
+        yield fake
+
+
+@pytest.fixture
+def client(server: FakePipewireServer) -> Iterator[NativeClient]:
+    with NativeClient(server.path) as native:
+        yield native
+
+
+def _by_id(dump: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    return {obj["id"]: obj for obj in dump}
+
+
+def _props(dump: List[Dict[str, Any]], node_id: int) -> Dict[str, Any]:
+    return _by_id(dump)[node_id]["info"]["params"]["Props"][0]
+
+
+def _default_sink(dump: List[Dict[str, Any]]) -> Any:
+    for item in _by_id(dump)[30]["metadata"]:
+        if item["key"] == "default.audio.sink":
+            return item["value"]
+    return None
+
+
+def test_dump_matches_served_graph(client: NativeClient) -> None:
+    dump = _by_id(client.pw_dump())
+
+    assert set(dump) == {30, 40, 50, 51}
+    assert dump[50]["info"]["props"]["node.name"] == "speakers"
+    assert dump[50]["info"]["props"]["media.class"] == "Audio/Sink"
+    assert dump[50]["info"]["params"]["Props"][0]["channelVolumes"] == pytest.approx([0.125, 0.125])
+    assert dump[51]["info"]["params"]["Props"][0]["mute"] is True
+    assert [profile["index"] for profile in dump[40]["info"]["params"]["EnumProfile"]] == [0, 1]
+    assert dump[40]["info"]["params"]["Profile"][0]["index"] == 1
+    assert _default_sink(list(dump.values())) == {"name": "speakers"}
+
+
+def test_set_volume_writes_cubic_channel_volumes(client: NativeClient, server: FakePipewireServer) -> None:
+    client.pw_dump()
+    client.set_volume(50, "0.8")
+
+    assert _props(server.dump(), 50)["channelVolumes"] == pytest.approx([0.512, 0.512])
+    assert _props(client.pw_dump(), 50)["channelVolumes"] == pytest.approx([0.512, 0.512])
+
+
+def test_set_volume_relative_reads_current_value(client: NativeClient, server: FakePipewireServer) -> None:
+    client.set_volume(50, "10%+")
+
+    assert _props(server.dump(), 50)["channelVolumes"] == pytest.approx([0.6 ** 3] * 2)
+
+
+def test_set_mute_and_toggle(client: NativeClient, server: FakePipewireServer) -> None:
+    client.set_mute(50, True)
+    assert _props(server.dump(), 50)["mute"] is True
+
+    client.set_mute(51, "toggle")
+    assert _props(server.dump(), 51)["mute"] is False
+
+
+def test_set_default_sink_updates_metadata(client: NativeClient, server: FakePipewireServer) -> None:
+    client.set_default_sink(51)
+
+    assert _default_sink(server.dump()) == {"name": "hdmi"}
+    assert _default_sink(client.pw_dump()) == {"name": "hdmi"}
+
+
+def test_set_profile_selects_enumerated_profile(client: NativeClient, server: FakePipewireServer) -> None:
+    client.set_profile(40, 0)
+
+    profile = _by_id(server.dump())[40]["info"]["params"]["Profile"]
+    assert [entry["name"] for entry in profile] == ["off"]
+    assert _by_id(client.pw_dump())[40]["info"]["params"]["Profile"][0]["index"] == 0
+
+
+def _fail_roundtrip(client: NativeClient, monkeypatch: pytest.MonkeyPatch, after: int) -> None:
+    """Make the connection drop on the round-trip after ``after`` successful ones."""
+    roundtrip = client.roundtrip
+    calls = []
+
+    def _roundtrip(messages: Any = (), raise_errors: bool = True) -> Any:
+        calls.append(messages)
+        if len(calls) > after:
+            client.close()
+            raise NativeProtocolError("PipeWire connection failed: broken pipe")
+        return roundtrip(messages, raise_errors)
+
+    monkeypatch.setattr(client, "roundtrip", _roundtrip)
+
+
+COMMANDS = [("set_volume", (50, "0.5")), ("set_mute", (51, "toggle")), ("set_volume", (50, "0.25"))]
+
+
+def test_pipeline_interrupted_reports_unacknowledged_and_unsent(
+    client: NativeClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client.pw_dump()
+    # The toggle flushes the first volume before it is queued, so the first
+    # round-trip carries command 0 only.
+    _fail_roundtrip(client, monkeypatch, after=0)
+
+    with pytest.raises(PipelineInterrupted) as info:
+        client.pipeline(COMMANDS)
+
+    assert info.value.sent == 1
+    assert info.value.results[0] is not None
+    assert info.value.results[1:] == [None, None]
+
+
+def test_command_channel_falls_back_only_for_unsent_commands(
+    client: NativeClient, server: FakePipewireServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client.pw_dump()
+    _fail_roundtrip(client, monkeypatch, after=1)
+    wpctl: List[Any] = []
+    for name in pw_client._WPCTL_WRITES:
+        monkeypatch.setitem(pw_client._WPCTL_WRITES, name, lambda *args, name=name, **_kw: wpctl.append((name, args)))
+    channel = pw_client.CommandChannel(server.path)
+    channel._client = client
+
+    results = channel.run(COMMANDS)
+
+    # The first volume was acknowledged and the toggle and second volume were
+    # sent unacknowledged: nothing is replayed through wpctl.
+    assert results[0] is None
+    assert results[1] is not None and results[2] is not None
+    assert wpctl == []
+
+    # Until the retry interval has passed, batches go straight to wpctl.
+    assert channel.run([("set_volume", (50, "0.3"))]) == [None]
+    assert wpctl == [("set_volume", (50, "0.3"))]
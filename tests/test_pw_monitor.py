@@ -0,0 +1,142 @@
+"""PipewireMonitor merging ``pw-dump --monitor`` updates into its object store."""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List
+
+import pytest
+
+from fixtures import DEVICE, METADATA, NODE
+from pw_client import PipewireMonitor
+
+
+LINK = "PipeWire:Interface:Link"
+
+
+def _node(obj_id: int, description: str, volume: float = 0.5) -> Dict[str, Any]:
+    return {
+        "id": obj_id,
+        "type": NODE,
+        "info": {
+            "props": {"node.name": f"node{obj_id}", "node.description": description, "media.class": "Audio/Sink"},
+            "params": {"Props": [{"volume": volume}], "EnumFormat": [{"mediaType": "audio"}]},
+        },
+    }
+
+
+def _entry(key: str, value: Any) -> Dict[str, Any]:
+    return {"subject": 0, "key": key, "type": "Spa:String:JSON", "value": value}
+
+
+def _graph() -> List[Dict[str, Any]]:
+    return [
+        {"id": 40, "type": DEVICE, "info": {"props": {"device.name": "card"}, "params": {"Profile": [{"index": 1}]}}},
+        _node(50, "Speakers"),
+        _node(51, "HDMI"),
+        {"id": 60, "type": LINK, "info": {"state": "active"}},
+        {
+            "id": 30,
+            "type": METADATA,
+            "props": {"metadata.name": "default"},
+            "metadata": [_entry("default.audio.sink", {"name": "node50"})],
+        },
+    ]
+
+
+@pytest.fixture
+def monitor() -> PipewireMonitor:
+    monitor = PipewireMonitor(command=["true"])
+    monitor.apply_update(_graph())
+    return monitor
+
+
+def _metadata(monitor: PipewireMonitor) -> Dict[str, Any]:
+    return {item["key"]: item["value"] for item in monitor.objects[30]["metadata"]}
+
+
+def test_initial_graph_keeps_parsed_types_and_params(monitor: PipewireMonitor) -> None:
+    assert set(monitor.objects) == {30, 40, 50, 51}
+    assert monitor.objects[50]["info"]["params"] == {"Props": [{"volume": 0.5}]}
+    assert monitor.last_update_types == {DEVICE, NODE, LINK, METADATA}
+    assert monitor.wait_ready(0)
+
+
+def test_unfiltered_monitor_keeps_everything() -> None:
+    monitor = PipewireMonitor(command=["true"], types=None, params=None)
+    monitor.apply_update(_graph())
+
+    assert monitor.dump() == _graph()
+
+
+def test_changed_object_is_merged(monitor: PipewireMonitor) -> None:
+    changed = _node(50, "Speakers", volume=0.8)
+    generation = monitor.generation
+
+    monitor.apply_update([changed])
+
+    assert monitor.objects[50]["info"]["params"]["Props"] == [{"volume": 0.8}]
+    assert monitor.generation == generation + 1
+    assert monitor.last_update_types == {NODE}
+
+
+def test_partial_info_keeps_other_fields(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([{"id": 50, "info": {"state": "running"}}])
+
+    info = monitor.objects[50]["info"]
+    assert info["state"] == "running"
+    assert info["props"]["node.description"] == "Speakers"
+    assert info["params"] == {"Props": [{"volume": 0.5}]}
+    assert monitor.last_update_types == {NODE}
+
+
+def test_null_info_removes_object(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([{"id": 51, "info": None}])
+
+    assert 51 not in monitor.objects
+    assert monitor.last_update_types == {NODE}
+
+
+def test_removing_a_filtered_object_reports_its_type(monitor: PipewireMonitor) -> None:
+    before = copy.deepcopy(monitor.objects)
+
+    monitor.apply_update([{"id": 60, "info": None}])
+
+    assert monitor.objects == before
+    assert monitor.last_update_types == {LINK}
+
+
+def test_new_object_is_added(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([_node(52, "Headphones")])
+
+    assert monitor.objects[52]["info"]["props"]["node.description"] == "Headphones"
+    assert "EnumFormat" not in monitor.objects[52]["info"]["params"]
+
+
+def test_metadata_key_added(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([{"id": 30, "metadata": [_entry("default.audio.source", {"name": "mic"})]}])
+
+    assert _metadata(monitor) == {"default.audio.sink": {"name": "node50"}, "default.audio.source": {"name": "mic"}}
+    assert monitor.last_update_types == {METADATA}
+
+
+def test_metadata_key_changed(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([{"id": 30, "metadata": [_entry("default.audio.sink", {"name": "node51"})]}])
+
+    assert _metadata(monitor) == {"default.audio.sink": {"name": "node51"}}
+
+
+def test_metadata_key_deleted(monitor: PipewireMonitor) -> None:
+    monitor.apply_update([{"id": 30, "metadata": [{"subject": 0, "key": "default.audio.sink", "value": None}]}])
+
+    assert _metadata(monitor) == {}
+    assert monitor.objects[30]["props"] == {"metadata.name": "default"}
+
+
+def test_listeners_run_after_each_update(monitor: PipewireMonitor) -> None:
+    seen: List[Any] = []
+    monitor.add_listener(lambda: seen.append(set(monitor.last_update_types)))
+
+    monitor.apply_update([_node(50, "Speakers", volume=0.9)])
+    monitor.apply_update([{"id": 60, "info": None}])
+
+    assert seen == [{NODE}, {LINK}]